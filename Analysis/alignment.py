@@ -0,0 +1,210 @@
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from log_files import read_log
+from throughput import cumulative_departures
+
+
+# Union of the ML and static interval columns, in one order
+UNIFIED_COLUMNS = ['SimulationTime', 'Episode', 'Step', 'TotalVehicles', 'VehiclesWaiting',
+                   'QueueLength', 'AverageWaitTime', 'Throughput', 'CurrentPhase', 'GreenLightTime',
+                   'PhaseDuration', 'CumulativeReward', 'CurrentReward', 'FuelConsumed',
+                   'VehiclesDeparted', 'TrafficDensity']
+# Same quantity under a controller-specific name
+COLUMN_ALIASES = {'PhaseGreenTime': 'GreenLightTime'}
+# Logged states hold until the next row; counters and rates can be interpolated
+METHODS = ('asof', 'nearest', 'linear')
+
+
+def unify(df):
+    """
+    Map one interval log onto UNIFIED_COLUMNS
+
+    Aliased columns are renamed, VehiclesDeparted is derived the same way for
+    every controller (throughput.cumulative_departures), and columns a
+    controller never wrote are NaN.
+    """
+    df = df.rename(columns={k: v for k, v in COLUMN_ALIASES.items() if v not in df.columns})
+    try:
+        df = df.assign(VehiclesDeparted=cumulative_departures(df))
+    except ValueError:
+        pass
+    extra = [c for c in df.columns if c not in UNIFIED_COLUMNS]
+    return df.reindex(columns=UNIFIED_COLUMNS + extra).sort_values('SimulationTime', kind='stable')
+
+
+def common_grid(frames, step=None, start=None, end=None):
+    """
+    Evenly spaced SimulationTime grid over the span every run covers
+
+    Args:
+        frames: Interval DataFrames
+        step: Grid spacing in seconds (default: the coarsest median logging interval)
+    """
+    times = [df['SimulationTime'].to_numpy(dtype=np.float64) for df in frames]
+    start = max(t[0] for t in times) if start is None else start
+    end = min(t[-1] for t in times) if end is None else end
+    if step is None:
+        step = max(float(np.median(np.diff(t))) for t in times if len(t) > 1)
+    if not end > start:
+        raise ValueError("The runs do not overlap in SimulationTime")
+    return np.arange(start, end + step / 2, step)
+
+
+def resample(df, grid, method='asof', tolerance=None):
+    """
+    Values of every numeric column at the grid times, as a (len(grid), n_columns) array
+
+    'asof' takes the last row at or before each grid time (merge_asof,
+    direction='backward'), 'nearest' the closest row, and 'linear'
+    interpolates between neighbours. Grid points further than tolerance
+    seconds from the row they draw on are NaN.
+    """
+    if method not in METHODS:
+        raise ValueError(f"method must be one of {METHODS}")
+    times = df['SimulationTime'].to_numpy(dtype=np.float64)
+    values = df.to_numpy(dtype=np.float64)
+
+    if method == 'linear':
+        out = np.column_stack([np.interp(grid, times, col, left=np.nan, right=np.nan) for col in values.T])
+        source = np.searchsorted(times, grid, side='right') - 1
+    else:
+        source = np.searchsorted(times, grid, side='right') - 1
+        if method == 'nearest':
+            after = np.minimum(source + 1, len(times) - 1)
+            use_after = (source < 0) | (np.abs(times[after] - grid) < np.abs(grid - times[np.maximum(source, 0)]))
+            source = np.where(use_after, after, source)
+        out = values[np.clip(source, 0, len(times) - 1)]
+        out[source < 0] = np.nan
+
+    if tolerance is not None:
+        gap = np.abs(grid - times[np.clip(source, 0, len(times) - 1)])
+        out[gap > tolerance] = np.nan
+    return out
+
+
+class AlignedRuns:
+    """
+    Several runs resampled onto one time grid
+
+    values is a (n_runs, n_times, n_metrics) array, so paired differences and
+    windowed statistics are single array expressions across runs.
+    """
+
+    def __init__(self, grid, runs, metrics, values):
+        self.grid = grid
+        self.runs = list(runs)
+        self.metrics = list(metrics)
+        self.values = values
+
+    def __len__(self):
+        return len(self.grid)
+
+    def metric(self, name):
+        """(n_times, n_runs) DataFrame of one metric indexed by SimulationTime"""
+        return pd.DataFrame(self.values[:, :, self.metrics.index(name)].T,
+                            index=pd.Index(self.grid, name='SimulationTime'), columns=self.runs)
+
+    def difference(self, name, run, baseline):
+        """Time-matched run - baseline for one metric"""
+        m = self.metrics.index(name)
+        diff = self.values[self.runs.index(run), :, m] - self.values[self.runs.index(baseline), :, m]
+        return pd.Series(diff, index=pd.Index(self.grid, name='SimulationTime'), name=f'{name}Difference')
+
+    def window(self, start=None, end=None):
+        """Grid points with start <= SimulationTime < end"""
+        lo = 0 if start is None else np.searchsorted(self.grid, start, side='left')
+        hi = len(self.grid) if end is None else np.searchsorted(self.grid, end, side='left')
+        return AlignedRuns(self.grid[lo:hi], self.runs, self.metrics, self.values[:, lo:hi])
+
+    def first_half(self):
+        """First half of the common time span"""
+        return self.window(None, self.grid[0] + (self.grid[-1] - self.grid[0]) / 2)
+
+    def windowed_means(self, width):
+        """
+        Mean of every run and metric per time window of width seconds
+
+        Returns:
+            DataFrame indexed by (WindowStart, Run) with one column per metric
+        """
+        bins = ((self.grid - self.grid[0]) // width).astype(np.int64)
+        starts = np.flatnonzero(np.r_[True, bins[1:] != bins[:-1]])
+        valid = ~np.isnan(self.values)
+        sums = np.add.reduceat(np.where(valid, self.values, 0), starts, axis=1)
+        counts = np.add.reduceat(valid, starts, axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = sums / counts
+        index = pd.MultiIndex.from_product([self.grid[0] + bins[starts] * width, self.runs],
+                                           names=['WindowStart', 'Run'])
+        return pd.DataFrame(means.transpose(1, 0, 2).reshape(-1, len(self.metrics)),
+                            index=index, columns=self.metrics)
+
+    def frame(self):
+        """Long DataFrame: SimulationTime, Run and the unified metric columns"""
+        n_runs, n_times, _ = self.values.shape
+        table = pd.DataFrame(self.values.reshape(n_runs * n_times, -1), columns=self.metrics)
+        table.insert(0, 'Run', np.repeat(self.runs, n_times))
+        table.insert(0, 'SimulationTime', np.tile(self.grid, n_runs))
+        return table
+
+
+def align_runs(runs, step=None, method='asof', tolerance=None, metrics=None, start=None, end=None):
+    """
+    Resample any number of interval logs onto a common time grid
+
+    Args:
+        runs: Dict of run name -> interval DataFrame
+        step: Grid spacing in seconds (default: coarsest median logging interval)
+        method: 'asof', 'nearest' or 'linear' (see resample)
+        tolerance: Max seconds between a grid point and its source row
+            (default: 1.5 grid steps)
+        metrics: Unified columns to keep (default: every numeric column)
+
+    Returns:
+        AlignedRuns
+    """
+    frames = {name: unify(df) for name, df in runs.items()}
+    grid = common_grid(list(frames.values()), step, start, end)
+    tolerance = 1.5 * (grid[1] - grid[0] if len(grid) > 1 else 1.0) if tolerance is None else tolerance
+    metrics = [m for m in (metrics or UNIFIED_COLUMNS) if m != 'SimulationTime']
+    values = np.stack([resample(df[['SimulationTime'] + metrics], grid, method, tolerance)[:, 1:]
+                       for df in frames.values()])
+    return AlignedRuns(grid, frames.keys(), metrics, values)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Resample interval logs onto a common time grid')
+    parser.add_argument('csvs', nargs='*', default=['interval_data.csv', 'static_interval_data.csv'])
+    parser.add_argument('--step', type=float, default=None, help='Grid spacing in seconds')
+    parser.add_argument('--method', choices=METHODS, default='asof')
+    parser.add_argument('--window', type=float, default=1000.0, help='Window width for windowed means')
+    parser.add_argument('--output', default='aligned_intervals.csv')
+    parser.add_argument('--intersection', type=int, default=None,
+                        help='Only align this IntersectionId of multi-intersection runs')
+    args = parser.parse_args()
+
+    runs = {}
+    for path in map(Path, args.csvs):
+        df = read_log(path.parent, path.name, intersection=args.intersection)
+        if 'IntersectionId' not in df.columns or df['IntersectionId'].nunique() <= 1:
+            runs[str(path)] = df
+            continue
+        # Each intersection is its own run: their clocks overlap
+        for intersection_id, group in df.groupby('IntersectionId', sort=True):
+            runs[f'{path}@{intersection_id}'] = group.reset_index(drop=True)
+    aligned = align_runs(runs, args.step, args.method)
+    aligned.frame().to_csv(args.output, index=False)
+    print(f"📊 {len(runs)} runs aligned on {len(aligned)} grid points "
+          f"({aligned.grid[0]:.1f}s - {aligned.grid[-1]:.1f}s), saved to {args.output}")
+
+    means = aligned.windowed_means(args.window)[['VehiclesWaiting', 'QueueLength']]
+    print(f"\nWindowed means ({args.window:.0f}s):")
+    print(means.unstack('Run').to_string(float_format='%.2f'))
+
+
+if __name__ == "__main__":
+    main()
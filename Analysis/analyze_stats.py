@@ -1,41 +1,294 @@
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 from pathlib import Path
 import warnings
+from alignment import align_runs
+from binary_log import BINARY_SUFFIX, read_binary_log
+from csv_cache import read_csv_cached
+from log_files import log_paths, read_log
+from significance import DEFAULT_RESAMPLES, compare_metrics, moments
+from downsample import downsample_for_axes
+from incremental import IncrementalAnalysis
+from metrics_graph import MetricsGraph
+from profiling import StageProfiler, profiled
+from run_catalog import CatalogTable, RunCatalog
+from streaming_stats import DEFAULT_CHUNKSIZE, StreamSummary, stream_csvs
 warnings.filterwarnings('ignore')
 
+# matplotlib.pyplot and seaborn, imported by _load_plotting on the first plot so
+# text-only analyses never pay for them
+plt = None
+sns = None
+
+# Episode metrics compared between the ML agent and the static controller
+COMPARISON_METRICS = ['TotalVehicles', 'VehiclesWaiting']
+# Metrics where a higher value means the controller did better
+HIGHER_IS_BETTER = {'TotalVehicles'}
+# Steps of run_complete_analysis: (name, progress message, method). Plot steps
+# share their names with render_pipeline.FIGURE_JOBS.
+ANALYSIS_STEPS = [
+    ('episodes', "📊 Generating episode performance comparison...", 'compare_episode_performance'),
+    ('intervals', "📈 Generating interval data comparison...", 'compare_interval_data'),
+    ('waiting_half', "🚗 Generating detailed vehicles waiting comparison (first half)...",
+     'create_vehicles_waiting_comparison_half'),
+    ('queue_half', "🚦 Generating detailed queue length comparison (first half)...",
+     'create_queue_length_comparison_half'),
+    ('stats', "🔍 Performing statistical analysis...", 'statistical_comparison'),
+    ('report', "📋 Generating performance report...", 'generate_performance_report'),
+    ('dashboard', "📊 Creating comprehensive dashboard...", 'create_dashboard'),
+    ('full_queue', "📊 Generating full simulation queue length comparison...", 'plot_full_queue_length'),
+    ('full_queue_separate', "📊 Generating full simulation queue length for both seperately...",
+     'plot_both_full_queue'),
+]
+# Steps that only print or write CSVs, no figures
+TEXT_STEPS = ('stats', 'report')
+
+
+def improvement_percent(metric, ml_mean, static_mean):
+    """
+    Improvement of ML over static in percent, positive when ML is better
+
+    Works element-wise on arrays, e.g. bootstrap resample means.
+    """
+    static_mean = np.asarray(static_mean, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        improvement = np.where(static_mean != 0, ((static_mean - ml_mean) / static_mean) * 100, np.nan)
+    if metric in HIGHER_IS_BETTER:
+        improvement = improvement * -1
+    return improvement if improvement.ndim else float(improvement)
+
+
+def metric_summary(df, metric):
+    """Return mean/std/median/min/max of a metric from a DataFrame, StreamSummary or CatalogTable"""
+    if isinstance(df, (StreamSummary, CatalogTable)):
+        return df.summary(metric)
+    values = df[metric].dropna()
+    return {
+        'mean': values.mean(),
+        'std': values.std(),
+        'median': values.median(),
+        'min': values.min(),
+        'max': values.max()
+    }
+
+
+def time_range(df):
+    """(first, last) SimulationTime of a DataFrame, StreamSummary or CatalogTable"""
+    if isinstance(df, CatalogTable):
+        return df.time_range()
+    if isinstance(df, StreamSummary):
+        stats = df.stats['SimulationTime']
+        return stats.min, stats.max
+    times = df['SimulationTime']
+    return times.min(), times.max()
+
+
+# Nodes of the metrics graph (see metrics_graph.MetricsGraph). Inputs are
+# named '<controller>_<file type>', e.g. 'ml_episodes' or 'static_intervals'.
+
+def _columns_node(graph, controller, file_type):
+    return frozenset(graph.input(f'{controller}_{file_type}').columns)
+
+
+def _available_node(graph, file_type, metric):
+    """Whether both controllers logged the metric"""
+    return all(metric in graph.get('columns', c, file_type) for c in ('ml', 'static'))
+
+
+def _summary_node(graph, controller, file_type, metric):
+    return metric_summary(graph.input(f'{controller}_{file_type}'), metric)
+
+
+def _values_node(graph, controller, metric):
+    """Raw episode observations (the reservoir sample in streaming mode)"""
+    df = graph.input(f'{controller}_episodes')
+    if isinstance(df, StreamSummary):
+        return df.stats[metric].sample
+    return df[metric].dropna().to_numpy()
+
+
+def _moments_node(graph, controller, metric):
+    """Exact (count, mean, sample variance) of the episode column, also in streaming mode"""
+    df = graph.input(f'{controller}_episodes')
+    if isinstance(df, StreamSummary):
+        stats = df.stats[metric]
+        return stats.count, stats.mean, stats.var
+    return moments(graph.get('values', controller, metric))
+
+
+def _improvement_node(graph, metric):
+    ml = graph.get('summary', 'ml', 'episodes', metric)['mean']
+    static = graph.get('summary', 'static', 'episodes', metric)['mean']
+    return improvement_percent(metric, ml, static)
+
+
+def _better_node(graph, metric):
+    """'ML' or 'Static', whichever has the better episode mean"""
+    ml = graph.get('summary', 'ml', 'episodes', metric)['mean']
+    static = graph.get('summary', 'static', 'episodes', metric)['mean']
+    if metric in HIGHER_IS_BETTER:
+        return 'ML' if ml > static else 'Static'
+    return 'ML' if ml < static else 'Static'
+
+
+def _normalized_means_node(graph, metrics):
+    """(ML, static) episode means per available metric, each row scaled by its max"""
+    labels = [m for m in metrics if graph.get('available', 'episodes', m)]
+    rows = np.array([[graph.get('summary', c, 'episodes', m)['mean'] for c in ('ml', 'static')]
+                     for m in labels], dtype=np.float64)
+    for i in range(len(rows)):
+        max_val = max(rows[i])
+        if max_val > 0:
+            rows[i] = rows[i] / max_val
+    return rows, labels
+
+
+def _reward_trend_node(graph):
+    """Slope per episode, final and best CumulativeReward of the ML agent (None under 2 episodes)"""
+    episodes = graph.input('ml_episodes')
+    if len(episodes) < 2:
+        return None
+    if isinstance(episodes, StreamSummary):
+        return {'trend': episodes.trend('CumulativeReward'), 'final': episodes.last['CumulativeReward'],
+                'best': episodes.stats['CumulativeReward'].max}
+    rewards = episodes['CumulativeReward']
+    return {'trend': np.polyfit(range(len(rewards)), rewards, 1)[0], 'final': rewards.iloc[-1],
+            'best': rewards.max()}
+
+
+def _time_range_node(graph, controller):
+    return time_range(graph.input(f'{controller}_intervals'))
+
+
+def _half_time_node(graph):
+    """Midpoint of the SimulationTime span both interval logs cover"""
+    ranges = [graph.get('time_range', c) for c in ('ml', 'static')]
+    start = max(first for first, _ in ranges)
+    end = min(last for _, last in ranges)
+    return start + (end - start) / 2
+
+
+METRIC_NODES = {
+    'columns': _columns_node,
+    'available': _available_node,
+    'summary': _summary_node,
+    'values': _values_node,
+    'moments': _moments_node,
+    'improvement': _improvement_node,
+    'better': _better_node,
+    'normalized_means': _normalized_means_node,
+    'reward_trend': _reward_trend_node,
+    'time_range': _time_range_node,
+    'half_time': _half_time_node,
+}
+
+
+def _load_plotting():
+    """Import matplotlib and seaborn and set up the plotting style, once"""
+    global plt, sns
+    if plt is None:
+        import matplotlib.pyplot as pyplot
+        import seaborn
+
+        pyplot.style.use('seaborn-v0_8')
+        # seaborn.set_palette("husl")
+        seaborn.set_palette(["#2E86AB", "#F24236", "#A23B72", "#F18F01", "#C73E1D"])
+        plt, sns = pyplot, seaborn
+    return plt, sns
+
 
 class TrafficSignalComparison:
-    def __init__(self, data_directory="./"):
+    # ML file names per file type; the static controller writes them with a 'static_' prefix
+    DATA_FILES = {
+        'episodes': 'episode_results.csv',
+        'rewards': 'reward_progress.csv',
+        'intervals': 'interval_data.csv',
+    }
+
+    def __init__(self, data_directory="./", streaming=False, chunksize=DEFAULT_CHUNKSIZE,
+                 incremental=False, downsample='minmax', output_dir=None, show=True,
+                 catalog=None, run=None, profile=None, intersection=None):
         """
         Initialize the comparison class
         
         Args:
             data_directory: Directory containing the CSV files
+            streaming: Aggregate the CSVs chunk by chunk instead of loading them whole
+            chunksize: Rows per chunk in streaming mode
+            incremental: Keep aggregate state between runs and only ingest
+                rows appended since the last run (implies streaming)
+            downsample: 'minmax' or 'lttb' to reduce time series to the saved
+                figure's pixel width before plotting, None to plot every point
+            output_dir: Directory for the PNG/CSV outputs (default: current directory)
+            show: Call plt.show() after each figure; False closes it instead
+            catalog: RunCatalog (or its SQLite path) to query instead of the CSVs;
+                tables stay in the catalog and are read lazily
+            run: Catalog run name, without the '/ml' or '/static' suffix
+            profile: 'timing' to record wall/CPU time and RSS per method,
+                'cprofile' or 'sampling' to profile functions as well (see
+                profiling.StageProfiler); defaults to $TRAFFIC_ANALYSIS_PROFILE
+            intersection: Only this IntersectionId of a multi-intersection run;
+                by default the intersection_<id>/ logs are pooled
         """
         self.data_dir = Path(data_directory)
+        self.streaming = streaming or incremental
+        self.incremental = incremental
+        self.chunksize = chunksize
+        self.downsample = downsample
+        self.output_dir = Path(output_dir) if output_dir is not None else Path('.')
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.show = show
+        self.catalog = RunCatalog(catalog) if isinstance(catalog, (str, Path)) else catalog
+        self.run = run
+        self.intersection = intersection
         self.ml_data = {}
         self.static_data = {}
+        self.profiler = StageProfiler(profile)
+        # Derived metrics shared by every report and figure, each computed once per input data
+        self.metrics = MetricsGraph(METRIC_NODES, self._metric_input)
         
-        # Set up plotting style
-        plt.style.use('seaborn-v0_8')
-        # sns.set_palette("husl")
-        sns.set_palette(["#2E86AB", "#F24236", "#A23B72", "#F18F01", "#C73E1D"])
-        
-    def load_data(self):
-        """Load all CSV files for both ML and static approaches"""
+    @profiled
+    def load_data(self, columns=None, use_cache=True, file_types=None):
+        """
+        Load all CSV files for both ML and static approaches
+
+        Args:
+            columns: Optional dict mapping 'episodes', 'rewards' or 'intervals'
+                to the list of columns to read for that file type
+            use_cache: Read through the typed Parquet cache next to each CSV
+            file_types: File types to read (default: all of DATA_FILES)
+
+        A .tslog file written by BinaryLogger next to a CSV is preferred over it.
+        Runs of a multi-intersection scene are read from their intersection_<id>/
+        directories (log_files.read_log), pooled or only self.intersection.
+        """
+        columns = columns or {}
         try:
-            # Load ML data
-            self.ml_data['episodes'] = pd.read_csv(self.data_dir / 'episode_results.csv')
-            self.ml_data['rewards'] = pd.read_csv(self.data_dir / 'reward_progress.csv')
-            self.ml_data['intervals'] = pd.read_csv(self.data_dir / 'interval_data.csv')
-            
-            # Load Static data
-            self.static_data['episodes'] = pd.read_csv(self.data_dir / 'static_episode_results.csv')
-            self.static_data['rewards'] = pd.read_csv(self.data_dir / 'static_reward_progress.csv')
-            self.static_data['intervals'] = pd.read_csv(self.data_dir / 'static_interval_data.csv')
+            if self.incremental:
+                self._load_incremental()
+                return
+            if self.catalog is not None:
+                self._load_catalog()
+                return
+
+            for file_type, file_name in self.DATA_FILES.items():
+                if file_types is not None and file_type not in file_types:
+                    continue
+                for data, prefix in ((self.ml_data, ''), (self.static_data, 'static_')):
+                    name = f'{prefix}{file_name}'
+                    with self.profiler.stage('parse'):
+                        if self.streaming:
+                            paths = [path for _, path in log_paths(self.data_dir, name, self.intersection)]
+                            if not paths:
+                                raise FileNotFoundError(f"No {name} in {self.data_dir}")
+                            data[file_type] = stream_csvs(paths, columns.get(file_type), self.chunksize,
+                                                          self.intersection)
+                        else:
+                            data[file_type] = read_log(self.data_dir, name, columns.get(file_type), use_cache,
+                                                       self.intersection, self._read_log_file)
+                    intersections = len(log_paths(self.data_dir, name, self.intersection))
+                    if intersections > 1:
+                        print(f"🔄 {name}: pooled {intersections} intersection logs")
             
             print("✅ All CSV files loaded successfully!")
             self.print_data_summary()
@@ -44,6 +297,38 @@ class TrafficSignalComparison:
             print(f"❌ Error loading files: {e}")
             print("Make sure all CSV files are in the specified directory")
             
+    @staticmethod
+    def _read_log_file(path, columns, use_cache):
+        binary_path = path.with_suffix(BINARY_SUFFIX)
+        if binary_path.exists():
+            # Fixed-record log from BinaryLogger: mapped, not parsed
+            print(f"📦 Reading {binary_path} (binary log) instead of {path.name}")
+            return read_binary_log(binary_path).to_frame(columns)
+        return read_csv_cached(path, columns, use_cache)
+
+    def _load_incremental(self):
+        """Refresh the persisted aggregates with rows appended since the last run"""
+        file_names = [f'{prefix}{name}' for name in self.DATA_FILES.values() for prefix in ('', 'static_')]
+        state = IncrementalAnalysis.load(self.data_dir, file_names, intersection=self.intersection)
+        new_rows = state.refresh()
+        state.save()
+
+        for file_type, file_name in self.DATA_FILES.items():
+            self.ml_data[file_type] = state.summary(file_name)
+            self.static_data[file_type] = state.summary(f'static_{file_name}')
+
+        print(f"✅ Ingested {sum(new_rows.values())} new rows incrementally")
+        self.print_data_summary()
+
+    def _load_catalog(self):
+        """Point every file type at a lazy catalog view; nothing is read yet"""
+        run = self.run or self.data_dir.resolve().name
+        for file_type in self.DATA_FILES:
+            self.ml_data[file_type] = self.catalog.table(file_type, f'{run}/ml')
+            self.static_data[file_type] = self.catalog.table(file_type, f'{run}/static')
+        print(f"✅ Using run '{run}' from catalog {self.catalog.path}")
+        self.print_data_summary()
+
     def print_data_summary(self):
         """Print summary of loaded data"""
         print("\n" + "="*50)
@@ -56,9 +341,73 @@ class TrafficSignalComparison:
             
             for file_type, df in data.items():
                 print(f"  {file_type}: {len(df)} rows, {len(df.columns)} columns")
-                
+
+    def _metric_input(self, name):
+        """Metrics graph input 'ml_<file type>' or 'static_<file type>'"""
+        controller, file_type = name.split('_', 1)
+        return (self.ml_data if controller == 'ml' else self.static_data)[file_type]
+
+    def _episode_summary(self, controller, metric):
+        """Memoized mean/std/median/min/max of an episode metric for 'ml' or 'static'"""
+        return self.metrics.get('summary', controller, 'episodes', metric)
+
+    def _time_series(self, df, metric):
+        """
+        Return (SimulationTime, metric) arrays, time-bucketed in streaming and catalog mode
+
+        Buckets are drawn as their min and max, interleaved like the 'minmax'
+        downsampler does, so spikes averaged away by the bucket mean stay visible.
+        """
+        if isinstance(df, (StreamSummary, CatalogTable)):
+            times, _, mins, maxs = df.series(metric)
+            return np.repeat(times, 2), np.column_stack([mins, maxs]).ravel()
+        return df['SimulationTime'], df[metric]
+
+    def _plot(self, ax, x, y, **kwargs):
+        """ax.plot a time series, downsampled to the axes' pixel width"""
+        if self.downsample:
+            x, y = downsample_for_axes(ax, x, y, self.downsample)
+        return ax.plot(x, y, **kwargs)
+
+    def _show(self):
+        """Show the current figure, or close it when running non-interactively"""
+        if self.show:
+            plt.show()
+        else:
+            plt.close()
+
+    def _tight_layout(self):
+        """plt.tight_layout, timed as its own stage"""
+        with self.profiler.stage('layout'):
+            plt.tight_layout()
+
+    def _savefig(self, file_name):
+        """Save the current figure into output_dir at the report resolution"""
+        with self.profiler.stage('savefig'):
+            plt.savefig(self.output_dir / file_name, dpi=300, bbox_inches='tight')
+
+    def write_timing_report(self):
+        """Print the stage timings and write them (and any profile) into output_dir"""
+        paths = self.profiler.write_report(self.output_dir)
+        if paths:
+            self.profiler.print_summary()
+            print(f"\n📊 Timing report saved to {', '.join(str(p) for p in paths)}")
+        return paths
+
+    def _first_half(self, df, metric, cutoff):
+        """Time series up to cutoff seconds, so both controllers cover the same time span"""
+        if isinstance(df, CatalogTable):
+            # The time filter runs inside SQLite, the second half is never read
+            return self._time_series(df.window(None, cutoff), metric)
+        times, values = self._time_series(df, metric)
+        times, values = np.asarray(times), np.asarray(values)
+        keep = times < cutoff
+        return times[keep], values[keep]
+
+    @profiled
     def compare_episode_performance(self):
         """Compare episode-level performance metrics"""
+        _load_plotting()
         fig, axes = plt.subplots(2, 3, figsize=(18, 12))
         fig.suptitle('Episode Performance Comparison: ML vs Static', fontsize=16, fontweight='bold')
         
@@ -80,12 +429,18 @@ class TrafficSignalComparison:
                 ax = axes[row, col]
                 
                 # Check if metric exists in both datasets
-                if metric in ml_episodes.columns and metric in static_episodes.columns:
+                if self.metrics.get('available', 'episodes', metric):
                     # Box plot comparison
-                    data_to_plot = [ml_episodes[metric].dropna(), static_episodes[metric].dropna()]
                     labels = ['ML Agent', 'Static Controller']
-                    
-                    bp = ax.boxplot(data_to_plot, labels=labels, patch_artist=True)
+                    if self.streaming:
+                        box_stats = [ml_episodes.stats[metric].box_stats(labels[0]),
+                                     static_episodes.stats[metric].box_stats(labels[1])]
+                        bp = ax.bxp(box_stats, patch_artist=True)
+                    else:
+                        data_to_plot = [ml_episodes[metric].dropna(), static_episodes[metric].dropna()]
+                        # labels= was removed in matplotlib 3.11 (tick_labels= needs >= 3.9)
+                        bp = ax.boxplot(data_to_plot, patch_artist=True)
+                        ax.set_xticklabels(labels)
                     bp['boxes'][0].set_facecolor('#2E86AB')  # Dark blue for ML Agent
                     bp['boxes'][1].set_facecolor('#F24236')  # Bright red for Static Controller
                     
@@ -93,8 +448,8 @@ class TrafficSignalComparison:
                     ax.grid(True, alpha=0.3)
                     
                     # Add mean values as text
-                    ml_mean = ml_episodes[metric].mean()
-                    static_mean = static_episodes[metric].mean()
+                    ml_mean = self._episode_summary('ml', metric)['mean']
+                    static_mean = self._episode_summary('static', metric)['mean']
                     ax.text(0.02, 0.98, f'ML Mean: {ml_mean:.2f}\nStatic Mean: {static_mean:.2f}', 
                            transform=ax.transAxes, verticalalignment='top', 
                            bbox=dict(boxstyle='round', facecolor='white', alpha=0.8))
@@ -106,26 +461,29 @@ class TrafficSignalComparison:
         # Hide the last subplot since we removed one metric
         axes[1, 2].set_visible(False)
         
-        plt.tight_layout()
-        plt.savefig('episode_performance_comparison.png', dpi=300, bbox_inches='tight')
-        plt.show()
+        self._tight_layout()
+        self._savefig('episode_performance_comparison.png')
+        self._show()
 
+    @profiled
     def create_vehicles_waiting_comparison_half(self):
         """Create a detailed comparison of vehicles waiting over time for the first half of data"""
+        _load_plotting()
         fig, ax = plt.subplots(1, 1, figsize=(16, 8))  # Larger figure size
         
         ml_intervals = self.ml_data['intervals']
         static_intervals = self.static_data['intervals']
         
-        # Slice to first half of the data
-        ml_half = ml_intervals.iloc[:len(ml_intervals)//2]
-        static_half = static_intervals.iloc[:len(static_intervals)//2]
-        
-        if 'VehiclesWaiting' in ml_half.columns and 'VehiclesWaiting' in static_half.columns:
+        if 'VehiclesWaiting' in ml_intervals.columns and 'VehiclesWaiting' in static_intervals.columns:
+            # Slice both to the first half of the simulated time they share
+            cutoff = self.metrics.get('half_time')
+            ml_times, ml_values = self._first_half(ml_intervals, 'VehiclesWaiting', cutoff)
+            static_times, static_values = self._first_half(static_intervals, 'VehiclesWaiting', cutoff)
+
             # Plot time series with thicker lines
-            ax.plot(ml_half['SimulationTime'], ml_half['VehiclesWaiting'], 
+            self._plot(ax, ml_times, ml_values, 
                     label='ML Agent', linewidth=3, alpha=0.8, color='#2E86AB')  # Dark blue
-            ax.plot(static_half['SimulationTime'], static_half['VehiclesWaiting'], 
+            self._plot(ax, static_times, static_values, 
                     label='Static Controller', linewidth=3, alpha=0.8, color='#F24236')  # Bright red
             
             ax.set_xlabel('Simulation Time (s)', fontsize=14)
@@ -135,37 +493,40 @@ class TrafficSignalComparison:
             ax.grid(True, alpha=0.3)
             
             # Add statistics text box
-            ml_mean = ml_half['VehiclesWaiting'].mean()
-            static_mean = static_half['VehiclesWaiting'].mean()
+            ml_mean = np.nanmean(ml_values)
+            static_mean = np.nanmean(static_values)
             improvement = ((static_mean - ml_mean) / static_mean) * 100 if static_mean != 0 else 0
             
             stats_text = f'ML Agent Mean: {ml_mean:.2f}\nStatic Controller Mean: {static_mean:.2f}\nImprovement: {improvement:.1f}%'
             ax.text(0.02, 0.98, stats_text, transform=ax.transAxes, verticalalignment='top',
                     bbox=dict(boxstyle='round', facecolor='white', alpha=0.8), fontsize=11)
             
-            plt.tight_layout()
-            plt.savefig('vehicles_waiting_comparison_first_half.png', dpi=300, bbox_inches='tight')
-            plt.show()
+            self._tight_layout()
+            self._savefig('vehicles_waiting_comparison_first_half.png')
+            self._show()
             print("✅ Vehicles waiting comparison (first half) saved as 'vehicles_waiting_comparison_first_half.png'")
         else:
             print("❌ VehiclesWaiting data not available in interval data")
 
+    @profiled
     def create_queue_length_comparison_half(self):
         """Create a detailed comparison of queue length over time for the first half of data"""
+        _load_plotting()
         fig, ax = plt.subplots(1, 1, figsize=(16, 8))  # Larger figure size
         
         ml_intervals = self.ml_data['intervals']
         static_intervals = self.static_data['intervals']
         
-        # Slice to first half of the data
-        ml_half = ml_intervals.iloc[:len(ml_intervals)//2]
-        static_half = static_intervals.iloc[:len(static_intervals)//2]
-        
-        if 'QueueLength' in ml_half.columns and 'QueueLength' in static_half.columns:
+        if 'QueueLength' in ml_intervals.columns and 'QueueLength' in static_intervals.columns:
+            # Slice both to the first half of the simulated time they share
+            cutoff = self.metrics.get('half_time')
+            ml_times, ml_values = self._first_half(ml_intervals, 'QueueLength', cutoff)
+            static_times, static_values = self._first_half(static_intervals, 'QueueLength', cutoff)
+
             # Plot time series with thicker lines
-            ax.plot(ml_half['SimulationTime'], ml_half['QueueLength'], 
+            self._plot(ax, ml_times, ml_values, 
                     label='ML Agent', linewidth=3, alpha=0.8, color='#2E86AB')  # Dark blue
-            ax.plot(static_half['SimulationTime'], static_half['QueueLength'], 
+            self._plot(ax, static_times, static_values, 
                     label='Static Controller', linewidth=3, alpha=0.8, color='#F24236')  # Bright red
             
             ax.set_xlabel('Simulation Time (s)', fontsize=14)
@@ -175,23 +536,25 @@ class TrafficSignalComparison:
             ax.grid(True, alpha=0.3)
             
             # Add statistics text box
-            ml_mean = ml_half['QueueLength'].mean()
-            static_mean = static_half['QueueLength'].mean()
+            ml_mean = np.nanmean(ml_values)
+            static_mean = np.nanmean(static_values)
             improvement = ((static_mean - ml_mean) / static_mean) * 100 if static_mean != 0 else 0
             
             stats_text = f'ML Agent Mean: {ml_mean:.2f}\nStatic Controller Mean: {static_mean:.2f}\nImprovement: {improvement:.1f}%'
             ax.text(0.02, 0.98, stats_text, transform=ax.transAxes, verticalalignment='top',
                     bbox=dict(boxstyle='round', facecolor='white', alpha=0.8), fontsize=11)
             
-            plt.tight_layout()
-            plt.savefig('queue_length_comparison_first_half.png', dpi=300, bbox_inches='tight')
-            plt.show()
+            self._tight_layout()
+            self._savefig('queue_length_comparison_first_half.png')
+            self._show()
             print("✅ Queue length comparison (first half) saved as 'queue_length_comparison_first_half.png'")
         else:
             print("❌ QueueLength data not available in interval data")
         
+    @profiled
     def compare_interval_data(self):
         """Compare interval-based performance over time"""
+        _load_plotting()
         fig, axes = plt.subplots(1, 3, figsize=(24, 8))  # Changed to 1x3 since we removed fuel
         fig.suptitle('Interval Data Comparison: ML vs Static Over Time', fontsize=16, fontweight='bold')
         
@@ -209,9 +572,9 @@ class TrafficSignalComparison:
             ax = axes[i]
             
             if metric in ml_intervals.columns and metric in static_intervals.columns:
-                ax.plot(ml_intervals['SimulationTime'], ml_intervals[metric], 
+                self._plot(ax, *self._time_series(ml_intervals, metric), 
                         label='ML Agent', linewidth=2, alpha=0.8, color='#2E86AB')  # Dark blue
-                ax.plot(static_intervals['SimulationTime'], static_intervals[metric], 
+                self._plot(ax, *self._time_series(static_intervals, metric), 
                         label='Static Controller', linewidth=2, alpha=0.8, color='#F24236')  # Bright red
                 
                 ax.set_xlabel('Simulation Time (s)')
@@ -224,27 +587,29 @@ class TrafficSignalComparison:
                        ha='center', va='center', transform=ax.transAxes)
                 ax.set_title(f'{title} - Data Not Available')
         
-        plt.tight_layout()
-        plt.savefig('interval_data_comparison.png', dpi=300, bbox_inches='tight')
-        plt.show()
+        self._tight_layout()
+        self._savefig('interval_data_comparison.png')
+        self._show()
 
+    @profiled
     def plot_full_queue_length(self):
         """Plot queue length over the full simulation for both ML and Static."""
+        _load_plotting()
         ml_intervals = self.ml_data['intervals']
         static_intervals = self.static_data['intervals']
         fig, ax = plt.subplots(figsize=(16, 6))
 
         # Plot full time series
-        ax.plot(
-            ml_intervals['SimulationTime'],
-            ml_intervals['QueueLength'],
+        self._plot(
+            ax,
+            *self._time_series(ml_intervals, 'QueueLength'),
             label='PPO Agent',
             color='#2E86AB',
             linewidth=2
         )
-        ax.plot(
-            static_intervals['SimulationTime'],
-            static_intervals['QueueLength'],
+        self._plot(
+            ax,
+            *self._time_series(static_intervals, 'QueueLength'),
             label='Static Controller',
             color='#F24236',
             linewidth=2
@@ -256,29 +621,34 @@ class TrafficSignalComparison:
         ax.legend(fontsize=12)
         ax.grid(True, alpha=0.3)
 
-        plt.tight_layout()
+        self._tight_layout()
         out_path = 'full_queue_length_comparison.png'
-        plt.savefig(out_path, dpi=300, bbox_inches='tight')
-        plt.show()
+        self._savefig(out_path)
+        self._show()
         print(f"✅ Full simulation queue length plot saved as '{out_path}'")
     
+    @profiled
     def plot_both_full_queue(self):
         """Plot queue length over the full simulation separately for ML and Static with equal axes and large bold fonts."""
+        _load_plotting()
         ml = self.ml_data['intervals']
         st = self.static_data['intervals']
 
+        ml_times, ml_queue = self._time_series(ml, 'QueueLength')
+        st_times, st_queue = self._time_series(st, 'QueueLength')
+
         # Compute global x and y limits
-        all_times = pd.concat([ml['SimulationTime'], st['SimulationTime']])
-        all_queues = pd.concat([ml['QueueLength'], st['QueueLength']])
-        xmin, xmax = all_times.min(), all_times.max()
-        ymin, ymax = all_queues.min(), all_queues.max()
+        all_times = np.concatenate([np.asarray(ml_times), np.asarray(st_times)])
+        all_queues = np.concatenate([np.asarray(ml_queue), np.asarray(st_queue)])
+        xmin, xmax = np.nanmin(all_times), np.nanmax(all_times)
+        ymin, ymax = np.nanmin(all_queues), np.nanmax(all_queues)
 
         axis_font = {'fontsize': 22, 'fontweight': 'bold'}
         tick_font = {'fontsize': 20, 'fontweight': 'bold'}
 
         # PPO Agent plot
         plt.figure(figsize=(16, 6))
-        plt.plot(ml['SimulationTime'], ml['QueueLength'], color='#2E86AB', linewidth=2)
+        self._plot(plt.gca(), ml_times, ml_queue, color='#2E86AB', linewidth=2)
         plt.title('Full Simulation Queue Length: PPO Agent', fontsize=24, fontweight='bold')
         plt.xlabel('Simulation Time (s)', **axis_font)
         plt.ylabel('Queue Length', **axis_font)
@@ -287,15 +657,15 @@ class TrafficSignalComparison:
         plt.grid(True, alpha=0.3)
         plt.xticks(fontsize=tick_font['fontsize'], fontweight=tick_font['fontweight'])
         plt.yticks(fontsize=tick_font['fontsize'], fontweight=tick_font['fontweight'])
-        plt.tight_layout()
+        self._tight_layout()
         ppo_path = 'full_queue_length_ppo.png'
-        plt.savefig(ppo_path, dpi=300, bbox_inches='tight')
-        plt.show()
+        self._savefig(ppo_path)
+        self._show()
         print(f"✅ Saved PPO queue length plot as '{ppo_path}'")
 
         # Static Controller plot
         plt.figure(figsize=(16, 6))
-        plt.plot(st['SimulationTime'], st['QueueLength'], color='#F24236', linewidth=2)
+        self._plot(plt.gca(), st_times, st_queue, color='#F24236', linewidth=2)
         plt.title('Full Simulation Queue Length: Static Controller', fontsize=24, fontweight='bold')
         plt.xlabel('Simulation Time (s)', **axis_font)
         plt.ylabel('Queue Length', **axis_font)
@@ -304,55 +674,92 @@ class TrafficSignalComparison:
         plt.grid(True, alpha=0.3)
         plt.xticks(fontsize=tick_font['fontsize'], fontweight=tick_font['fontweight'])
         plt.yticks(fontsize=tick_font['fontsize'], fontweight=tick_font['fontweight'])
-        plt.tight_layout()
+        self._tight_layout()
         static_path = 'full_queue_length_static.png'
-        plt.savefig(static_path, dpi=300, bbox_inches='tight')
-        plt.show()
+        self._savefig(static_path)
+        self._show()
         print(f"✅ Saved Static queue length plot as '{static_path}'")
 
         
-    def statistical_comparison(self):
-        """Perform statistical comparison between ML and Static approaches"""
+    @profiled
+    def compare_aligned_intervals(self, metrics=('VehiclesWaiting', 'QueueLength'), window=1000.0, step=None):
+        """
+        Time-matched ML vs static interval comparison
+
+        Both interval logs are resampled onto one time grid, so differences are
+        taken between the two controllers at the same SimulationTime rather
+        than at the same row number.
+
+        Args:
+            metrics: Interval metrics to compare
+            window: Width in seconds of the windows the means are reported for
+            step: Grid spacing in seconds (default: coarsest logging interval)
+
+        Returns:
+            DataFrame of per-window ML mean, static mean and mean paired difference
+        """
+        ml_intervals = self.ml_data['intervals']
+        static_intervals = self.static_data['intervals']
+        if isinstance(ml_intervals, StreamSummary):
+            print("❌ Time alignment needs the interval rows; not available in streaming mode")
+            return None
+        if isinstance(ml_intervals, CatalogTable):
+            ml_intervals, static_intervals = ml_intervals.frame(), static_intervals.frame()
+
+        aligned = align_runs({'ML': ml_intervals, 'Static': static_intervals}, step=step, metrics=list(metrics))
+        means = aligned.windowed_means(window)
+        results = []
+        for metric in metrics:
+            per_window = means[metric].unstack('Run')
+            difference = aligned.difference(metric, 'ML', 'Static')
+            paired = difference.groupby((difference.index - aligned.grid[0]) // window * window
+                                        + aligned.grid[0]).mean()
+            results.append(pd.DataFrame({
+                'Metric': metric,
+                'WindowStart': per_window.index,
+                'ML_Mean': per_window['ML'].to_numpy(),
+                'Static_Mean': per_window['Static'].to_numpy(),
+                'Mean_Paired_Difference': paired.reindex(per_window.index).to_numpy(),
+            }))
+            print(f"\n{metric}: mean time-matched difference (ML - Static) = {difference.mean():.3f} "
+                  f"over {difference.notna().sum()} grid points")
+
+        summary_df = pd.concat(results, ignore_index=True)
+        summary_df.to_csv(self.output_dir / 'aligned_interval_comparison.csv', index=False)
+        print(f"\n📊 Time-aligned comparison saved to 'aligned_interval_comparison.csv'")
+        return summary_df
+
+    @profiled
+    def statistical_comparison(self, n_resamples=DEFAULT_RESAMPLES):
+        """
+        Perform statistical comparison between ML and Static approaches
+
+        Adds bootstrap confidence intervals, Welch and Mann-Whitney tests and
+        effect sizes to the summary. In streaming mode these are computed
+        from each column's reservoir sample.
+
+        Args:
+            n_resamples: Bootstrap resamples per metric and controller (0 to skip)
+        """
         print("\n" + "="*60)
         print("STATISTICAL COMPARISON")
         print("="*60)
         
-        ml_episodes = self.ml_data['episodes']
-        static_episodes = self.static_data['episodes']
-        
         # Compare key metrics - REMOVED EpisodeDuration and FuelConsumed as requested
-        comparison_metrics = ['TotalVehicles', 'VehiclesWaiting']
+        comparison_metrics = COMPARISON_METRICS
         
         results = []
+        samples = {}
+        sample_moments = {}
         
         for metric in comparison_metrics:
-            if metric in ml_episodes.columns and metric in static_episodes.columns:
-                ml_values = ml_episodes[metric].dropna()
-                static_values = static_episodes[metric].dropna()
-                
+            if self.metrics.get('available', 'episodes', metric):
                 # Calculate statistics
-                ml_stats = {
-                    'mean': ml_values.mean(),
-                    'std': ml_values.std(),
-                    'median': ml_values.median(),
-                    'min': ml_values.min(),
-                    'max': ml_values.max()
-                }
-                
-                static_stats = {
-                    'mean': static_values.mean(),
-                    'std': static_values.std(),
-                    'median': static_values.median(),
-                    'min': static_values.min(),
-                    'max': static_values.max()
-                }
+                ml_stats = self._episode_summary('ml', metric)
+                static_stats = self._episode_summary('static', metric)
                 
-                # Calculate improvement percentage
-                improvement = ((static_stats['mean'] - ml_stats['mean']) / static_stats['mean']) * 100
-                
-                # MODIFICATION: Multiply TotalVehicles improvement by -1
-                if metric == 'TotalVehicles':
-                    improvement = improvement * -1
+                # Calculate improvement percentage (sign flipped for TotalVehicles)
+                improvement = self.metrics.get('improvement', metric)
                 
                 results.append({
                     'Metric': metric,
@@ -362,6 +769,10 @@ class TrafficSignalComparison:
                     'Static_Std': static_stats['std'],
                     'Improvement_%': improvement
                 })
+                samples[metric] = (self.metrics.get('values', 'ml', metric),
+                                   self.metrics.get('values', 'static', metric))
+                sample_moments[metric] = (self.metrics.get('moments', 'ml', metric),
+                                          self.metrics.get('moments', 'static', metric))
                 
                 print(f"\n{metric}:")
                 print(f"  ML Agent    - Mean: {ml_stats['mean']:.2f}, Std: {ml_stats['std']:.2f}")
@@ -370,26 +781,34 @@ class TrafficSignalComparison:
         
         # Create summary DataFrame
         summary_df = pd.DataFrame(results)
+        if n_resamples and samples:
+            significance_df = compare_metrics(samples, improvement_percent, n_resamples,
+                                              moments=sample_moments, higher_is_better=HIGHER_IS_BETTER)
+            summary_df = summary_df.merge(significance_df, on='Metric', how='left')
+            print(f"\nSignificance ({n_resamples} bootstrap resamples, 95% CI):")
+            for _, row in summary_df.iterrows():
+                print(f"  {row['Metric']}: Improvement CI [{row['Improvement_CI_Low']:.2f}%, "
+                      f"{row['Improvement_CI_High']:.2f}%], Welch p={row['Welch_p']:.4f}, "
+                      f"Mann-Whitney p={row['MannWhitney_p']:.4f}, Cohen's d={row['Cohens_d']:.3f}"
+                      f"{' (CIs and rank test from a reservoir sample)' if row['Sampled'] else ''}")
         print(f"\n{'='*60}")
         print("SUMMARY TABLE")
         print("="*60)
         print(summary_df.to_string(index=False, float_format='%.2f'))
         
         # Save summary to CSV
-        summary_df.to_csv('performance_comparison_summary.csv', index=False)
+        summary_df.to_csv(self.output_dir / 'performance_comparison_summary.csv', index=False)
         print(f"\n📊 Summary saved to 'performance_comparison_summary.csv'")
         
         return summary_df
     
+    @profiled
     def generate_performance_report(self):
         """Generate a comprehensive performance report"""
         print("\n" + "="*70)
         print("COMPREHENSIVE PERFORMANCE REPORT")
         print("="*70)
         
-        ml_episodes = self.ml_data['episodes']
-        static_episodes = self.static_data['episodes']
-        
         # Overall performance metrics - REMOVED EpisodeDuration and FuelConsumed as requested
         metrics_to_analyze = ['TotalVehicles', 'VehiclesWaiting']
         
@@ -397,15 +816,9 @@ class TrafficSignalComparison:
         static_better_count = 0
         
         for metric in metrics_to_analyze:
-            if metric in ml_episodes.columns and metric in static_episodes.columns:
-                ml_mean = ml_episodes[metric].mean()
-                static_mean = static_episodes[metric].mean()
-                
+            if self.metrics.get('available', 'episodes', metric):
                 # For most metrics, lower is better (except TotalVehicles which might indicate throughput)
-                if metric == 'TotalVehicles':
-                    better = 'ML' if ml_mean > static_mean else 'Static'
-                else:
-                    better = 'ML' if ml_mean < static_mean else 'Static'
+                better = self.metrics.get('better', metric)
                 
                 if better == 'ML':
                     ml_better_count += 1
@@ -424,17 +837,19 @@ class TrafficSignalComparison:
             print(f"\n🤝 Both approaches show comparable performance!")
             
         # Learning curve analysis (if reward data available)
-        if 'CumulativeReward' in ml_episodes.columns:
+        if 'CumulativeReward' in self.metrics.get('columns', 'ml', 'episodes'):
             print(f"\nML Learning Analysis:")
-            rewards = ml_episodes['CumulativeReward']
-            if len(rewards) > 1:
-                trend = np.polyfit(range(len(rewards)), rewards, 1)[0]
+            rewards = self.metrics.get('reward_trend')
+            if rewards is not None:
+                trend = rewards['trend']
                 print(f"  Reward trend: {'Improving' if trend > 0 else 'Declining'} ({trend:.4f}/episode)")
-                print(f"  Final reward: {rewards.iloc[-1]:.2f}")
-                print(f"  Best reward: {rewards.max():.2f}")
+                print(f"  Final reward: {rewards['final']:.2f}")
+                print(f"  Best reward: {rewards['best']:.2f}")
 
+    @profiled
     def create_dashboard(self):
         """Create a comprehensive dashboard with all comparisons"""
+        _load_plotting()
         fig = plt.figure(figsize=(20, 12))  # Reduced height since we removed one section
         gs = fig.add_gridspec(3, 4, hspace=0.3, wspace=0.3)  # Changed to 3 rows instead of 4
         
@@ -442,8 +857,6 @@ class TrafficSignalComparison:
         fig.suptitle('Traffic Signal Control: ML vs Static Performance Dashboard', 
                     fontsize=20, fontweight='bold')
         
-        ml_episodes = self.ml_data['episodes']
-        static_episodes = self.static_data['episodes']
         ml_intervals = self.ml_data['intervals']
         static_intervals = self.static_data['intervals']
         
@@ -453,8 +866,10 @@ class TrafficSignalComparison:
         x = np.arange(len(metrics))
         width = 0.35
         
-        ml_means = [ml_episodes[m].mean() if m in ml_episodes.columns else 0 for m in metrics]
-        static_means = [static_episodes[m].mean() if m in static_episodes.columns else 0 for m in metrics]
+        ml_means = [self._episode_summary('ml', m)['mean'] if m in self.metrics.get('columns', 'ml', 'episodes')
+                    else 0 for m in metrics]
+        static_means = [self._episode_summary('static', m)['mean'] if m in self.metrics.get('columns', 'static', 'episodes')
+                        else 0 for m in metrics]
         
         ax1.bar(x - width/2, ml_means, width, label='ML Agent', alpha=0.8, color='#2E86AB')
         ax1.bar(x + width/2, static_means, width, label='Static Controller', alpha=0.8, color='#F24236')
@@ -469,9 +884,9 @@ class TrafficSignalComparison:
         # 2. Total Vehicles over time
         ax2 = fig.add_subplot(gs[0, 2:])
         if 'TotalVehicles' in ml_intervals.columns:
-            ax2.plot(ml_intervals['SimulationTime'], ml_intervals['TotalVehicles'], 
+            self._plot(ax2, *self._time_series(ml_intervals, 'TotalVehicles'), 
                     label='ML Agent', linewidth=2, color='#2E86AB')
-            ax2.plot(static_intervals['SimulationTime'], static_intervals['TotalVehicles'], 
+            self._plot(ax2, *self._time_series(static_intervals, 'TotalVehicles'), 
                     label='Static Controller', linewidth=2, color='#F24236')
 
             ax2.set_xlabel('Simulation Time (s)')
@@ -483,9 +898,9 @@ class TrafficSignalComparison:
         # 3. Queue length comparison
         ax3 = fig.add_subplot(gs[1, :])  # Made this span the full width since we removed the reward plot
         if 'QueueLength' in ml_intervals.columns:
-            ax3.plot(ml_intervals['SimulationTime'], ml_intervals['QueueLength'], 
+            self._plot(ax3, *self._time_series(ml_intervals, 'QueueLength'), 
                     label='ML Agent', linewidth=2, alpha=0.8, color='#2E86AB')
-            ax3.plot(static_intervals['SimulationTime'], static_intervals['QueueLength'], 
+            self._plot(ax3, *self._time_series(static_intervals, 'QueueLength'), 
                     label='Static Controller', linewidth=2, alpha=0.8, color='#F24236')
             ax3.set_xlabel('Simulation Time (s)')
             ax3.set_ylabel('Queue Length')
@@ -499,70 +914,51 @@ class TrafficSignalComparison:
         ax4 = fig.add_subplot(gs[2, :])
 
         # Create performance comparison matrix - REMOVED EpisodeDuration and FuelConsumed
-        comparison_data = []
-        metrics = ['TotalVehicles', 'VehiclesWaiting']  # Removed EpisodeDuration and FuelConsumed
+        metrics = ('TotalVehicles', 'VehiclesWaiting')  # Removed EpisodeDuration and FuelConsumed
+        # Episode means, each row normalized by its max for better visualization
+        comparison_array, labels = self.metrics.get('normalized_means', metrics)
 
-        for metric in metrics:
-            if metric in ml_episodes.columns and metric in static_episodes.columns:
-                ml_val = ml_episodes[metric].mean()
-                static_val = static_episodes[metric].mean()
-                # Normalize values for better visualization
-                comparison_data.append([ml_val, static_val])
-
-        if comparison_data:
-            comparison_array = np.array(comparison_data)
-            # Normalize each row
-            for i in range(len(comparison_array)):
-                max_val = max(comparison_array[i])
-                if max_val > 0:
-                    comparison_array[i] = comparison_array[i] / max_val
-            
+        if labels:
             sns.heatmap(comparison_array, 
                     xticklabels=['ML Agent', 'Static Controller'],
-                    yticklabels=[m for m in metrics if m in ml_episodes.columns and m in static_episodes.columns],
+                    yticklabels=labels,
                     annot=True, fmt='.3f', cmap='RdYlBu_r',
                     ax=ax4)
             ax4.set_title('Normalized Performance Heatmap')
             
-        plt.savefig('traffic_signal_dashboard.png', dpi=300, bbox_inches='tight')
-        plt.show()
+        self._savefig('traffic_signal_dashboard.png')
+        self._show()
     
-    def run_complete_analysis(self):
-        """Run the complete comparison analysis"""
-        print("🚀 Starting Traffic Signal Comparison Analysis...")
-        
-        # Load data
-        self.load_data()
-        
-        # Generate all comparisons
-        print("\n📊 Generating episode performance comparison...")
-        # self.compare_episode_performance()
-        
-        print("\n📈 Generating interval data comparison...")
-        # self.compare_interval_data()
-        
-        # Generate first half data comparisons
-        print("\n🚗 Generating detailed vehicles waiting comparison (first half)...")
-        # self.create_vehicles_waiting_comparison_half()
-        
-        print("\n🚦 Generating detailed queue length comparison (first half)...")
-        # self.create_queue_length_comparison_half()
-        
-        print("\n🔍 Performing statistical analysis...")
-        # summary_df = self.statistical_comparison()
-        
-        print("\n📋 Generating performance report...")
-        # self.generate_performance_report()
-        
-        print("\n📊 Creating comprehensive dashboard...")
-        # self.create_dashboard()
-        
-        print("\n📊 Generating full simulation queue length comparison...")
-        # self.plot_full_queue_length()
+    def run_complete_analysis(self, steps=None):
+        """
+        Run the complete comparison analysis
 
-        print("\n📊 Generating full simulation queue length for both seperately...")
-        self.plot_both_full_queue()
+        Args:
+            steps: Names from ANALYSIS_STEPS to run, in their listed order
+                (default: all of them)
 
+        Returns:
+            The statistical summary DataFrame, or None when 'stats' was not run
+        """
+        unknown = set(steps or ()) - {name for name, _, _ in ANALYSIS_STEPS}
+        if unknown:
+            raise ValueError(f"Unknown analysis steps: {sorted(unknown)}")
+        print("🚀 Starting Traffic Signal Comparison Analysis...")
+        
+        summary_df = None
+        with self.profiler.stage('run_complete_analysis'):
+            # Load data; text-only steps need just the episode logs
+            text_only = steps is not None and set(steps) <= set(TEXT_STEPS)
+            self.load_data(file_types=['episodes'] if text_only else None)
+            
+            for name, message, method in ANALYSIS_STEPS:
+                if steps is not None and name not in steps:
+                    continue
+                print(f"\n{message}")
+                result = getattr(self, method)()
+                if name == 'stats':
+                    summary_df = result
+        self.write_timing_report()
         
         print("\n✅ Analysis complete! Check the generated PNG files and CSV summary.")
         
@@ -0,0 +1,136 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import pandas as pd
+
+from analyze_stats import COMPARISON_METRICS, improvement_percent
+from log_files import INTERSECTION_DIR, log_paths, read_log
+from training_telemetry import config_hash
+
+
+ML_EPISODES = 'episode_results.csv'
+STATIC_EPISODES = 'static_episode_results.csv'
+SUMMARY_COLUMNS = ['Run', 'ConfigHash', 'Metric', 'ML_Episodes', 'ML_Mean', 'Static_Mean',
+                   'ML_Std', 'Static_Std', 'Improvement_%']
+
+
+def discover_runs(root):
+    """
+    Find every run directory below root
+
+    A run directory is any directory holding an ML ``episode_results.csv``,
+    directly or in its ``intersection_<id>/`` subdirectories.
+    """
+    root = Path(root)
+    runs = set()
+    for path in root.rglob(ML_EPISODES):
+        run_dir = path.parent
+        if INTERSECTION_DIR.match(run_dir.name):
+            run_dir = run_dir.parent
+        runs.add(run_dir)
+    return sorted(runs)
+
+
+def analyze_run(run_dir, static_dir=None, metrics=COMPARISON_METRICS, root=None, use_cache=False):
+    """
+    Compare one run against its static baseline
+
+    The baseline is the run's own ``static_episode_results.csv`` or, failing
+    that, the one in static_dir. Episodes of every intersection_<id>/ log
+    of a run are pooled. With use_cache the typed Parquet caches are read
+    and written next to the CSVs; by default the run directories are left
+    untouched.
+
+    Returns:
+        List of result rows, one per metric
+    """
+    run_dir = Path(run_dir)
+    baseline_dir = run_dir
+    if not log_paths(run_dir, STATIC_EPISODES) and static_dir is not None:
+        baseline_dir = Path(static_dir)
+
+    ml_episodes = read_log(run_dir, ML_EPISODES, metrics, use_cache)
+    static_episodes = read_log(baseline_dir, STATIC_EPISODES, metrics, use_cache)
+
+    run_name = str(run_dir.relative_to(root)) if root else run_dir.name
+    rows = []
+    for metric in metrics:
+        if metric not in ml_episodes.columns or metric not in static_episodes.columns:
+            continue
+        ml_values = ml_episodes[metric].dropna()
+        static_values = static_episodes[metric].dropna()
+        ml_mean, static_mean = ml_values.mean(), static_values.mean()
+        rows.append({
+            'Run': run_name,
+            'ConfigHash': config_hash(run_dir),
+            'Metric': metric,
+            'ML_Episodes': len(ml_values),
+            'ML_Mean': ml_mean,
+            'Static_Mean': static_mean,
+            'ML_Std': ml_values.std(),
+            'Static_Std': static_values.std(),
+            'Improvement_%': improvement_percent(metric, ml_mean, static_mean),
+        })
+    return rows
+
+
+def compare_runs(root, static_dir=None, metrics=COMPARISON_METRICS, workers=None, use_cache=False):
+    """
+    Analyse every run below root in parallel on a process pool
+
+    Args:
+        root: Directory searched recursively for run directories
+        static_dir: Fallback directory holding static_episode_results.csv
+        metrics: Episode metrics to compare
+        workers: Number of worker processes (defaults to all cores)
+        use_cache: Write typed Parquet caches into the run directories
+
+    Returns:
+        Consolidated DataFrame with one row per run and metric
+    """
+    root = Path(root)
+    runs = discover_runs(root)
+    if not runs:
+        print(f"❌ No run directories with {ML_EPISODES} found under {root}")
+        return pd.DataFrame(columns=SUMMARY_COLUMNS)
+
+    workers = min(workers or os.cpu_count() or 1, len(runs))
+    print(f"🚀 Comparing {len(runs)} runs on {workers} worker processes...")
+
+    rows = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(analyze_run, run, static_dir, metrics, root, use_cache): run for run in runs}
+        for future in as_completed(futures):
+            try:
+                rows.extend(future.result())
+            except (FileNotFoundError, ValueError) as e:
+                print(f"❌ Skipping {futures[future]}: {e}")
+
+    return pd.DataFrame(rows, columns=SUMMARY_COLUMNS).sort_values(['Run', 'Metric'], ignore_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare many training runs against the static controller')
+    parser.add_argument('root', help='Directory searched recursively for runs (e.g. Assets/results)')
+    parser.add_argument('--static-dir', default=None,
+                        help='Directory with static_episode_results.csv for runs without their own')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: all cores)')
+    parser.add_argument('--cache', action='store_true',
+                        help='Keep typed Parquet caches next to the run CSVs for faster reruns')
+    parser.add_argument('--output', default='batch_comparison_summary.csv')
+    args = parser.parse_args()
+
+    summary_df = compare_runs(args.root, args.static_dir, workers=args.workers, use_cache=args.cache)
+    if summary_df.empty:
+        print("❌ No run could be compared")
+        return
+
+    print(summary_df.to_string(index=False, float_format='%.2f'))
+    summary_df.to_csv(args.output, index=False)
+    print(f"\n📊 Batch summary saved to '{args.output}'")
+
+
+if __name__ == "__main__":
+    main()
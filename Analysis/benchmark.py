@@ -0,0 +1,194 @@
+import argparse
+import contextlib
+import io
+import multiprocessing
+import os
+import platform
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from profiling import peak_rss_mb
+from render_pipeline import FIGURE_JOBS
+from synthetic_logs import SCHEMAS, existing_logs, generate_logs
+
+
+DEFAULT_SCALES = [10**3, 10**4, 10**5, 10**6]
+DEFAULT_WORK_DIR = 'synthetic'
+DEFAULT_OUTPUT = 'benchmark_results.csv'
+DEFAULT_BASELINE = 'benchmark_baseline.csv'
+# A stage regresses when it is this many times slower (or bigger) than the baseline
+REGRESSION_RATIO = 1.2
+# ... and slower by at least this much, so millisecond stages do not flag noise
+MIN_REGRESSION_SECONDS = 0.05
+TEXT_STAGES = ['load', 'load_cached', 'load_streaming', 'stats', 'report', 'throughput']
+STAGES = TEXT_STAGES + [job.name for job in FIGURE_JOBS]
+INTERVAL_FILES = ['interval_data.csv', 'static_interval_data.csv']
+
+
+def _run_stage(stage, data_dir, n_resamples):
+    """
+    Worker entry point: prepare, then time one stage
+
+    Runs in a fresh process so the peak memory belongs to this stage alone.
+    Setup (loading the data a stage works on) is excluded from the timing;
+    its peak is reported separately as SetupPeakMB.
+    """
+    import matplotlib
+    matplotlib.use('Agg', force=True)
+    from analyze_stats import TrafficSignalComparison
+    from throughput import throughput_report
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        comparer = TrafficSignalComparison(data_dir, output_dir=data_dir, show=False,
+                                           streaming=stage == 'load_streaming')
+        job = next((job for job in FIGURE_JOBS if job.name == stage), None)
+        if stage == 'load_cached':
+            # Writes the Parquet caches; the data itself is dropped again
+            TrafficSignalComparison(data_dir, show=False).load_data()
+        elif stage in ('stats', 'report'):
+            comparer.load_data(file_types=['episodes'])
+        elif job is not None:
+            comparer.load_data(columns=job.columns)
+
+        setup_peak = peak_rss_mb()
+        wall, cpu = time.perf_counter(), time.process_time()
+        if stage == 'load':
+            comparer.load_data(use_cache=False)
+        elif stage in ('load_cached', 'load_streaming'):
+            comparer.load_data()
+        elif stage == 'stats':
+            comparer.statistical_comparison(n_resamples)
+        elif stage == 'report':
+            comparer.generate_performance_report()
+        elif stage == 'throughput':
+            throughput_report([Path(data_dir) / name for name in INTERVAL_FILES])
+        else:
+            getattr(comparer, job.method)()
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+
+    peak = peak_rss_mb()
+    # NaN where RSS is not available (Windows)
+    return {'Seconds': wall, 'CPUSeconds': cpu, 'SetupPeakMB': float('nan') if setup_peak is None else setup_peak,
+            'PeakMB': float('nan') if peak is None else peak}
+
+
+def run_benchmark(scales=DEFAULT_SCALES, stages=None, work_dir=DEFAULT_WORK_DIR, schema='sample',
+                  repeat=1, n_resamples=1000, seed=0):
+    """
+    Time every stage at every scale on synthetic logs
+
+    Logs are generated once per scale into work_dir/rows_<n> and reused while
+    their settings match. Each stage run gets its own spawned process; with
+    repeat > 1 the fastest run and the largest peak are kept.
+
+    Args:
+        scales: Interval rows per controller, one benchmark per value
+        stages: Names from STAGES (default: all)
+        schema: Log headers, see synthetic_logs.SCHEMAS. 'sample' has every
+            column the figures draw; 'csvlogger' times what Unity writes today
+        repeat: Runs per stage
+        n_resamples: Bootstrap resamples in the stats stage
+
+    Returns:
+        DataFrame with one row per scale and stage
+    """
+    stages = stages or STAGES
+    context = multiprocessing.get_context('spawn')
+    rows = []
+    for scale in scales:
+        data_dir = Path(work_dir) / f'rows_{scale}'
+        counts = existing_logs(data_dir, scale, schema, seed)
+        if counts is None:
+            print(f"🔄 Generating {scale} rows per interval log in {data_dir}...")
+            start = time.perf_counter()
+            counts = generate_logs(data_dir, scale, schema, seed)
+            print(f"  generated in {time.perf_counter() - start:.1f}s")
+        csv_mb = sum((data_dir / name).stat().st_size for name in counts) / 1024**2
+
+        for stage in stages:
+            runs = []
+            for _ in range(repeat):
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                    try:
+                        runs.append(pool.submit(_run_stage, stage, str(data_dir), n_resamples).result())
+                    except Exception as e:
+                        print(f"❌ {scale} rows, {stage}: {e}")
+                        break
+            row = {'Scale': scale, 'Stage': stage, 'Status': 'ok' if len(runs) == repeat else 'failed',
+                   'CsvMB': csv_mb}
+            if runs:
+                row.update({'Seconds': min(r['Seconds'] for r in runs),
+                            'CPUSeconds': min(r['CPUSeconds'] for r in runs),
+                            'SetupPeakMB': max(r['SetupPeakMB'] for r in runs),
+                            'PeakMB': max(r['PeakMB'] for r in runs)})
+                print(f"  {scale:>10} rows  {stage:<20} {row['Seconds']:8.3f}s  {row['PeakMB']:8.1f} MB")
+            rows.append(row)
+
+    table = pd.DataFrame(rows, columns=['Scale', 'Stage', 'Status', 'CsvMB', 'Seconds', 'CPUSeconds',
+                                        'SetupPeakMB', 'PeakMB'])
+    table['Schema'] = schema
+    table['Python'] = platform.python_version()
+    table['Machine'] = f'{platform.system()} {platform.machine()}, {os.cpu_count()} CPUs'
+    table['Timestamp'] = datetime.now().isoformat(timespec='seconds')
+    return table
+
+
+def compare_to_baseline(results, baseline, ratio=REGRESSION_RATIO):
+    """
+    Join results with a saved baseline on (Scale, Stage)
+
+    Returns:
+        DataFrame with time and peak memory ratios and a Regression flag
+    """
+    keys = ['Scale', 'Stage']
+    table = results[keys + ['Seconds', 'PeakMB']].merge(
+        baseline[keys + ['Seconds', 'PeakMB']], on=keys, suffixes=('', '_Baseline'))
+    table['TimeRatio'] = table['Seconds'] / table['Seconds_Baseline']
+    table['MemoryRatio'] = table['PeakMB'] / table['PeakMB_Baseline']
+    slower = (table['TimeRatio'] > ratio) & (table['Seconds'] - table['Seconds_Baseline'] > MIN_REGRESSION_SECONDS)
+    table['Regression'] = slower | (table['MemoryRatio'] > ratio)
+    return table
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the analysis pipeline on synthetic logs')
+    parser.add_argument('--scales', type=float, nargs='*', default=DEFAULT_SCALES,
+                        help='Interval rows per controller, e.g. 1e3 1e5 1e7')
+    parser.add_argument('--stages', nargs='*', choices=STAGES, default=None, help='Stages to time (default: all)')
+    parser.add_argument('--text-only', action='store_true', help='Skip the figure stages')
+    parser.add_argument('--work-dir', default=DEFAULT_WORK_DIR, help='Where the synthetic logs are kept')
+    parser.add_argument('--schema', choices=sorted(SCHEMAS), default='sample')
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--resamples', type=int, default=1000)
+    parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Baseline CSV to compare against')
+    parser.add_argument('--save-baseline', action='store_true', help='Store these results as the baseline')
+    args = parser.parse_args()
+
+    stages = TEXT_STAGES if args.text_only else args.stages
+    results = run_benchmark([int(s) for s in args.scales], stages, args.work_dir, args.schema,
+                            args.repeat, args.resamples)
+    results.to_csv(args.output, index=False)
+    print(f"\n📊 Results saved to {args.output}")
+
+    if args.save_baseline:
+        results.to_csv(args.baseline, index=False)
+        print(f"✅ Baseline saved to {args.baseline}")
+    elif Path(args.baseline).exists():
+        comparison = compare_to_baseline(results, pd.read_csv(args.baseline))
+        print(f"\nAgainst baseline {args.baseline}:")
+        print(comparison.to_string(index=False, float_format='%.3f'))
+        regressions = comparison[comparison['Regression']]
+        for _, row in regressions.iterrows():
+            print(f"⚠️ {row['Scale']} rows, {row['Stage']}: {row['TimeRatio']:.2f}x time, "
+                  f"{row['MemoryRatio']:.2f}x peak memory")
+        if regressions.empty:
+            print(f"✅ No stage more than {REGRESSION_RATIO}x slower or bigger than the baseline")
+
+
+if __name__ == "__main__":
+    main()
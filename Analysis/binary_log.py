@@ -0,0 +1,126 @@
+import struct
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+# Format written by Assets/_Scripts/SignalTimingAlgo/BinaryLogger.cs
+BINARY_SUFFIX = '.tslog'
+MAGIC = b'TSBLOG01'
+FORMAT_VERSION = 1
+FIXED_HEADER_SIZE = 64
+COLUMN_DESCRIPTOR_SIZE = 32
+# magic, version, header size, record size, column count, capacity, records written
+_HEADER = struct.Struct('<8sIIIIQQ')
+TYPE_CODES = {b'f': '<f4', b'i': '<i4', b'd': '<f8'}
+DTYPE_CODES = {'float32': b'f', 'int32': b'i', 'float64': b'd'}
+
+
+class BinaryLog:
+    """
+    Memory-mapped reader for a fixed-record .tslog file
+
+    Opening only parses the header; columns are numpy views straight into the
+    mapped file, so loading is O(1) in the number of records. Records still
+    being appended by a live simulation show up on the next open.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            fixed = f.read(FIXED_HEADER_SIZE)
+            if len(fixed) < _HEADER.size or fixed[:8] != MAGIC:
+                raise ValueError(f"{self.path} is not a binary traffic log")
+            (_, version, self.header_size, self.record_size, column_count,
+             self.capacity, self.records_written) = _HEADER.unpack_from(fixed)
+            if version != FORMAT_VERSION:
+                raise ValueError(f"{self.path}: unsupported log version {version}")
+            descriptors = f.read(COLUMN_DESCRIPTOR_SIZE * column_count)
+
+        names, formats = [], []
+        for i in range(column_count):
+            raw = descriptors[i * COLUMN_DESCRIPTOR_SIZE:(i + 1) * COLUMN_DESCRIPTOR_SIZE]
+            names.append(raw[:-1].rstrip(b'\0').decode())
+            formats.append(TYPE_CODES[raw[-1:]])
+        self.dtype = np.dtype({'names': names, 'formats': formats})
+        if self.dtype.itemsize != self.record_size:
+            raise ValueError(f"{self.path}: record size {self.record_size} does not match its columns")
+
+        file_records = (self.path.stat().st_size - self.header_size) // self.record_size
+        if self.capacity:
+            file_records = min(file_records, self.capacity)
+        self._records = (np.memmap(self.path, dtype=self.dtype, mode='r',
+                                   offset=self.header_size, shape=(file_records,))
+                         if file_records > 0 else np.empty(0, dtype=self.dtype))
+
+    @property
+    def columns(self):
+        return list(self.dtype.names)
+
+    @property
+    def wrapped(self):
+        """True when a ring buffer has overwritten its oldest records"""
+        return bool(self.capacity) and self.records_written > self.capacity
+
+    def __len__(self):
+        if self.capacity:
+            return min(self.records_written, len(self._records))
+        return len(self._records)
+
+    def __getitem__(self, column):
+        """
+        Column as an array in chronological order
+
+        Zero-copy for append-only logs and ring buffers that have not wrapped;
+        a wrapped ring buffer has to be reordered, which copies.
+        """
+        values = self._records[column][:len(self)]
+        if self.wrapped:
+            return np.roll(values, -(self.records_written % self.capacity))
+        return values
+
+    def to_frame(self, columns=None, copy=False):
+        """
+        The selected columns as a DataFrame
+
+        By default the columns are views into the mapped file, so this stays
+        O(1); pandas copy-on-write copies a column only if it is modified, and
+        the map itself is read-only. copy=True detaches the frame from the file.
+        """
+        columns = [c for c in (columns or self.columns) if c in self.dtype.names]
+        return pd.DataFrame({c: self[c] for c in columns}, copy=copy)
+
+
+def read_binary_log(path):
+    return BinaryLog(path)
+
+
+def write_binary_log(df, path):
+    """
+    Write a DataFrame in the .tslog format (e.g. to convert an existing CSV)
+
+    int32/float64 columns keep their type, everything else becomes float32.
+    """
+    path = Path(path)
+    codes = [DTYPE_CODES.get(str(df[c].dtype), b'f') for c in df.columns]
+    dtype = np.dtype({'names': list(df.columns), 'formats': [TYPE_CODES[c] for c in codes]})
+
+    raw_header_size = FIXED_HEADER_SIZE + COLUMN_DESCRIPTOR_SIZE * len(df.columns)
+    header_size = (raw_header_size + 63) // 64 * 64
+    header = bytearray(header_size)
+    _HEADER.pack_into(header, 0, MAGIC, FORMAT_VERSION, header_size, dtype.itemsize,
+                      len(df.columns), 0, len(df))
+    for i, (name, code) in enumerate(zip(df.columns, codes)):
+        start = FIXED_HEADER_SIZE + i * COLUMN_DESCRIPTOR_SIZE
+        encoded = name.encode()[:COLUMN_DESCRIPTOR_SIZE - 1]
+        header[start:start + len(encoded)] = encoded
+        header[start + COLUMN_DESCRIPTOR_SIZE - 1:start + COLUMN_DESCRIPTOR_SIZE] = code
+
+    records = np.empty(len(df), dtype=dtype)
+    for name in df.columns:
+        records[name] = df[name].to_numpy()
+    with open(path, 'wb') as f:
+        f.write(header)
+        f.write(records.tobytes())
+    return path
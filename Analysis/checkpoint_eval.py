@@ -0,0 +1,225 @@
+import argparse
+import json
+import re
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from vector_env import OBSERVATION_SIZE, TrafficVectorEnv, make_env
+
+try:
+    import onnxruntime
+except ImportError:  # checkpoint evaluation is unavailable without it
+    onnxruntime = None
+
+
+DEFAULT_RESULTS_DIR = '../Assets/results/TrafficRun02'
+DEFAULT_BEHAVIOR = 'FourWaySignal'
+TRAINING_STATUS = 'run_logs/training_status.json'
+# ML-Agents exports both; the deterministic head is what inference in Unity uses
+ACTION_OUTPUTS = ('deterministic_continuous_actions', 'continuous_actions')
+
+
+def discover_checkpoints(results_dir=DEFAULT_RESULTS_DIR, behavior=DEFAULT_BEHAVIOR):
+    """
+    Exported ONNX checkpoints of a run, joined with training_status.json
+
+    training_status.json records paths from the machine that trained, so
+    entries are matched to files on disk by step count.
+
+    Returns:
+        DataFrame with Checkpoint, Steps, Path, TrainingReward and CreationTime,
+        sorted by Steps (the final export last)
+    """
+    results_dir = Path(results_dir)
+    status = {}
+    final_steps = None
+    status_path = results_dir / TRAINING_STATUS
+    if status_path.exists():
+        with open(status_path) as f:
+            behavior_status = json.load(f).get(behavior, {})
+        for entry in behavior_status.get('checkpoints', []):
+            status[entry['steps']] = entry
+        final_steps = behavior_status.get('final_checkpoint', {}).get('steps')
+
+    pattern = re.compile(rf'{re.escape(behavior)}-(\d+)\.onnx$')
+    rows = []
+    for path in sorted((results_dir / behavior).glob(f'{behavior}-*.onnx')):
+        match = pattern.search(path.name)
+        if match:
+            steps = int(match.group(1))
+            rows.append({'Checkpoint': path.stem, 'Steps': steps, 'Path': path})
+    final = results_dir / f'{behavior}.onnx'
+    if final.exists():
+        rows.append({'Checkpoint': final.stem, 'Steps': final_steps, 'Path': final})
+
+    table = pd.DataFrame(rows, columns=['Checkpoint', 'Steps', 'Path'])
+    table['TrainingReward'] = [status.get(s, {}).get('reward') for s in table['Steps']]
+    table['CreationTime'] = [status.get(s, {}).get('creation_time') for s in table['Steps']]
+    return table
+
+
+class CheckpointPolicies:
+    """
+    One CPU onnxruntime session per checkpoint, created once and reused
+
+    Args:
+        paths: ONNX files to load
+        threads: intra-op threads per session (None lets onnxruntime decide)
+    """
+
+    def __init__(self, paths, threads=None):
+        if onnxruntime is None:
+            raise ImportError("onnxruntime is required: pip install onnxruntime")
+        options = onnxruntime.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        self.sessions = {}
+        self.outputs = {}
+        for path in paths:
+            session = onnxruntime.InferenceSession(str(path), options, providers=['CPUExecutionProvider'])
+            names = [o.name for o in session.get_outputs()]
+            output = next((name for name in ACTION_OUTPUTS if name in names), None)
+            if output is None:
+                raise ValueError(f"{path} has no continuous action output")
+            self.sessions[str(path)] = session
+            self.outputs[str(path)] = (session.get_inputs()[0].name, output)
+
+    def act(self, path, observations):
+        """Actions in [-1, 1] for a (batch, OBSERVATION_SIZE) array in one run call"""
+        input_name, output_name = self.outputs[str(path)]
+        actions, = self.sessions[str(path)].run([output_name], {input_name: observations.astype(np.float32)})
+        return np.clip(actions, -1, 1)
+
+
+def evaluate_recorded(checkpoints, policies, observations, reference=None):
+    """
+    Open-loop scoring on a fixed observation set
+
+    Every checkpoint sees the same observations in a single batched call.
+    Actions are turned into green times as TrafficSignalMlAgent would, and
+    compared with the reference checkpoint (the final export by default).
+
+    Returns:
+        DataFrame with one row per checkpoint
+    """
+    observations = np.asarray(observations, dtype=np.float32).reshape(-1, OBSERVATION_SIZE)
+    actions = {path: policies.act(path, observations)[:, 0] for path in checkpoints['Path']}
+    reference = reference or checkpoints['Path'].iloc[-1]
+    to_green = TrafficVectorEnv(len(observations))
+    rows = []
+    for path, action in actions.items():
+        green = to_green.green_light_time(action)
+        rows.append({
+            'Path': path,
+            'MeanAction': action.mean(),
+            'ActionStd': action.std(),
+            'MeanGreenTime': green.mean(),
+            'MeanAbsDiffFromReference': np.abs(action - actions[reference]).mean(),
+        })
+    return pd.DataFrame(rows)
+
+
+def evaluate_closed_loop(checkpoints, policies, num_envs=64, steps=200, seed=0, **env_kwargs):
+    """
+    Closed-loop scoring on the surrogate intersection
+
+    All checkpoints drive their own block of num_envs intersections inside one
+    batched environment, so each decision step is a single env.step plus one
+    inference call per checkpoint. Intersection j of every block replays the
+    same traffic scenario, so checkpoints are compared on identical arrivals.
+
+    Returns:
+        DataFrame with one row per checkpoint
+    """
+    paths = list(checkpoints['Path'])
+    env = make_env(num_envs * len(paths), scenarios=num_envs, seed=seed, **env_kwargs)
+    obs, _ = env.reset(seed=seed)
+    blocks = [slice(i * num_envs, (i + 1) * num_envs) for i in range(len(paths))]
+
+    rewards = np.zeros((steps, len(obs)))
+    waiting = np.zeros((steps, len(obs)))
+    green = np.zeros((steps, len(obs)))
+    actions = np.empty((len(obs), 1), dtype=np.float32)
+    for t in range(steps):
+        for path, block in zip(paths, blocks):
+            actions[block] = policies.act(path, obs[block])
+        obs, rewards[t], _, _, info = env.step(actions)
+        waiting[t] = info['vehicles_waiting']
+        green[t] = info['green_time']
+    env.close()
+
+    rows = []
+    for path, block in zip(paths, blocks):
+        rows.append({
+            'Path': path,
+            'MeanReward': rewards[:, block].mean(),
+            'RewardStd': rewards[:, block].mean(axis=0).std(),
+            'MeanVehiclesWaiting': waiting[:, block].mean(),
+            'MeanGreenTime': green[:, block].mean(),
+        })
+    return pd.DataFrame(rows)
+
+
+def rank_checkpoints(results_dir=DEFAULT_RESULTS_DIR, behavior=DEFAULT_BEHAVIOR, observations=None,
+                     num_envs=64, steps=200, seed=0, threads=None, **env_kwargs):
+    """
+    Score every checkpoint of a run and rank them
+
+    Closed-loop mean reward on the surrogate decides the rank; with an
+    observation set the open-loop columns are added as well.
+    """
+    checkpoints = discover_checkpoints(results_dir, behavior)
+    if checkpoints.empty:
+        raise FileNotFoundError(f"No {behavior} ONNX checkpoints under {results_dir}")
+    print(f"🔄 Loading {len(checkpoints)} checkpoints...")
+    policies = CheckpointPolicies(checkpoints['Path'], threads)
+
+    print(f"🚀 Closed loop: {num_envs} intersections x {steps} decisions per checkpoint...")
+    table = checkpoints.merge(evaluate_closed_loop(checkpoints, policies, num_envs, steps, seed, **env_kwargs),
+                              on='Path')
+    if observations is not None:
+        table = table.merge(evaluate_recorded(checkpoints, policies, observations), on='Path',
+                            suffixes=('', '_Recorded'))
+    table['Rank'] = table['MeanReward'].rank(ascending=False, method='min').astype(int)
+    return table.sort_values('Rank').reset_index(drop=True)
+
+
+def load_observations(path):
+    """Observation set from .npy/.npz (first array) or a CSV without header"""
+    path = Path(path)
+    if path.suffix == '.npy':
+        return np.load(path)
+    if path.suffix == '.npz':
+        with np.load(path) as data:
+            return data[data.files[0]]
+    return np.loadtxt(path, delimiter=',', dtype=np.float32)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rank exported ONNX checkpoints offline')
+    parser.add_argument('--results-dir', default=DEFAULT_RESULTS_DIR)
+    parser.add_argument('--behavior', default=DEFAULT_BEHAVIOR)
+    parser.add_argument('--observations', default=None,
+                        help='Recorded observation set (.npy/.npz/.csv, 121 values per row)')
+    parser.add_argument('--envs', type=int, default=64, help='Surrogate intersections per checkpoint')
+    parser.add_argument('--steps', type=int, default=200, help='Decisions per intersection')
+    parser.add_argument('--calibrate', default=None, help='Interval log to calibrate the surrogate from')
+    parser.add_argument('--threads', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='checkpoint_ranking.csv')
+    args = parser.parse_args()
+
+    observations = load_observations(args.observations) if args.observations else None
+    table = rank_checkpoints(args.results_dir, args.behavior, observations, args.envs, args.steps,
+                             args.seed, args.threads, calibrate_csv=args.calibrate)
+    table.drop(columns='Path').to_csv(args.output, index=False)
+
+    print("\nCheckpoint ranking:")
+    print(table.drop(columns=['Path', 'CreationTime']).to_string(index=False, float_format='%.3f'))
+    print(f"\n📊 Ranking saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+import time
+
+_START = time.perf_counter()
+
+import argparse
+import importlib
+import sys
+
+# Seconds from launch until a command's modules are imported. Text-only
+# commands must stay inside it; plots pay for matplotlib on top.
+STARTUP_BUDGET = 0.75
+PLOTTING_MODULES = ('matplotlib', 'seaborn')
+
+
+def _stats(args):
+    from analyze_stats import TrafficSignalComparison
+    from significance import DEFAULT_RESAMPLES
+
+    comparer = TrafficSignalComparison(args.data_dir, streaming=args.streaming, output_dir=args.output_dir,
+                                       show=False, catalog=args.catalog, run=args.run, profile=args.profile,
+                                       intersection=args.intersection)
+    comparer.load_data(file_types=['episodes'])
+    comparer.statistical_comparison(DEFAULT_RESAMPLES if args.resamples is None else args.resamples)
+    comparer.write_timing_report()
+
+
+def _throughput(args):
+    from throughput import print_report, throughput_report
+
+    print_report(throughput_report(args.csvs, args.window, args.intersection), args.output)
+
+
+def _plots(args):
+    from render_pipeline import render_all
+
+    render_all(args.data_dir, args.output_dir, args.jobs, args.workers, args.force, streaming=args.streaming,
+               intersection=args.intersection)
+
+
+def _report(args):
+    from analyze_stats import TEXT_STEPS, TrafficSignalComparison
+
+    comparer = TrafficSignalComparison(args.data_dir, streaming=args.streaming, output_dir=args.output_dir,
+                                       show=args.show, catalog=args.catalog, run=args.run, profile=args.profile,
+                                       intersection=args.intersection)
+    comparer.run_complete_analysis(args.steps or (None if args.plots else TEXT_STEPS))
+
+
+# Subcommand -> (modules it needs, handler). The modules are imported by
+# main() before the handler runs so their cost can be measured on its own.
+COMMANDS = {
+    'stats': (['analyze_stats'], _stats),
+    'throughput': (['throughput'], _throughput),
+    'plots': (['render_pipeline'], _plots),
+    'report': (['analyze_stats'], _report),
+}
+
+
+def _add_data_args(parser):
+    parser.add_argument('--data-dir', default='./', help='Directory containing the CSV files')
+    parser.add_argument('--output-dir', default=None)
+    parser.add_argument('--streaming', action='store_true', help='Aggregate the CSVs chunk by chunk')
+    _add_intersection_arg(parser)
+
+
+def _add_intersection_arg(parser):
+    parser.add_argument('--intersection', type=int, default=None,
+                        help='Only this IntersectionId (default: pool every intersection_<id>/ log)')
+
+
+def _add_profile_arg(parser):
+    # Same names as profiling.MODES, repeated so parsing imports nothing
+    parser.add_argument('--profile', choices=['timing', 'cprofile', 'sampling'], default=None,
+                        help='Write analysis_timing.json (and a profile) next to the outputs')
+
+
+def build_parser():
+    """Argument parser with one subparser per entry of COMMANDS"""
+    parser = argparse.ArgumentParser(description='ML vs static traffic signal analysis')
+    parser.add_argument('--timing', action='store_true',
+                        help=f'Print startup and run time against the {STARTUP_BUDGET}s startup budget')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    stats = commands.add_parser('stats', help='Episode statistics and significance tests (no plots)')
+    _add_data_args(stats)
+    stats.add_argument('--resamples', type=int, default=None,
+                       help='Bootstrap resamples per metric (0 to skip; default: significance.DEFAULT_RESAMPLES)')
+    stats.add_argument('--catalog', default=None, help='Read the run from this SQLite catalog instead')
+    stats.add_argument('--run', default=None, help='Catalog run name')
+    _add_profile_arg(stats)
+
+    # Defaults repeat throughput.DEFAULT_CSVS/DEFAULT_WINDOW so parsing imports nothing
+    throughput = commands.add_parser('throughput', help='Vehicles-per-minute throughput (no plots)')
+    throughput.add_argument('csvs', nargs='*', default=['interval_data.csv', 'static_interval_data.csv'],
+                            help='Interval CSVs; the improvement compares the first against the last')
+    throughput.add_argument('--window', type=float, default=300.0, help='Rolling window in simulation seconds')
+    throughput.add_argument('--output', default=None, help='Prefix for CSV outputs')
+    _add_intersection_arg(throughput)
+
+    plots = commands.add_parser('plots', help='Render the comparison figures headless, in parallel')
+    _add_data_args(plots)
+    plots.add_argument('--jobs', nargs='*', default=None, help='Figures to render (default: all)')
+    plots.add_argument('--workers', type=int, default=None)
+    plots.add_argument('--force', action='store_true', help='Re-render unchanged figures')
+
+    report = commands.add_parser('report', help='Statistics and performance report; --plots adds every figure')
+    _add_data_args(report)
+    report.add_argument('--steps', nargs='*', default=None,
+                        help='run_complete_analysis steps to run (default: stats and report)')
+    report.add_argument('--plots', action='store_true', help='Run every step, figures included')
+    report.add_argument('--show', action='store_true', help='Open figure windows instead of only saving')
+    report.add_argument('--catalog', default=None, help='Read the run from this SQLite catalog instead')
+    report.add_argument('--run', default=None, help='Catalog run name')
+    _add_profile_arg(report)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    modules, handler = COMMANDS[args.command]
+    for name in modules:
+        importlib.import_module(name)
+    startup = time.perf_counter() - _START
+
+    handler(args)
+
+    if args.timing:
+        total = time.perf_counter() - _START
+        plotting = [name for name in PLOTTING_MODULES if name in sys.modules]
+        print(f"\n⏱️ {args.command}: startup {startup:.3f}s (budget {STARTUP_BUDGET}s), total {total:.3f}s")
+        if startup > STARTUP_BUDGET:
+            print(f"⚠️ Startup over budget; see python -X importtime cli.py {args.command}")
+        if plotting and args.command in ('stats', 'throughput'):
+            print(f"⚠️ {args.command} imported {', '.join(plotting)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+import argparse
+import json
+import math
+import os
+import signal
+import time
+from collections import deque
+from pathlib import Path
+
+from incremental import TailReader
+from log_files import log_path
+
+
+DEFAULT_REWARDS = 'reward_progress.csv'
+DEFAULT_STATUS = '../Assets/results/TrafficRun02/run_logs/training_status.json'
+DEFAULT_BEHAVIOR = 'FourWaySignal'
+SIGNAL_FILE = 'convergence_signal.json'
+# EWMA smoothing: ~2/alpha episodes of memory
+DEFAULT_ALPHA = 0.05
+# Episodes in the sliding window the slope is fitted over
+DEFAULT_WINDOW = 100
+# Plateau: the fitted change across one window is under this many reward standard deviations
+DEFAULT_TOLERANCE = 0.5
+# Consecutive plateau episodes, without a changepoint, before stopping
+DEFAULT_PATIENCE = 100
+# Never stop before this many episodes
+DEFAULT_MIN_EPISODES = 200
+# CUSUM drift and threshold, in reward standard deviations
+CUSUM_DRIFT = 0.5
+CUSUM_THRESHOLD = 8.0
+
+
+class ConvergenceDetector:
+    """
+    Online plateau detector for the per-episode reward, O(1) per episode
+
+    Three statistics are updated with every reward:
+      - an EWMA of the reward and of its variance (the noise scale)
+      - the least-squares slope over the last `window` episodes, kept as
+        running sums so adding and dropping a point is constant time
+      - a two-sided CUSUM of the standardised deviation from the EWMA that
+        flags a changepoint (a shift in the reward level) and then restarts
+
+    Training has plateaued while the slope, extrapolated over one window, is
+    under `tolerance` standard deviations. Stop is signalled after `patience`
+    consecutive plateau episodes with no changepoint, once `min_episodes`
+    were seen.
+    """
+
+    def __init__(self, alpha=DEFAULT_ALPHA, window=DEFAULT_WINDOW, tolerance=DEFAULT_TOLERANCE,
+                 patience=DEFAULT_PATIENCE, min_episodes=DEFAULT_MIN_EPISODES,
+                 cusum_drift=CUSUM_DRIFT, cusum_threshold=CUSUM_THRESHOLD):
+        self.alpha = alpha
+        self.window = window
+        self.tolerance = tolerance
+        self.patience = patience
+        self.min_episodes = min_episodes
+        self.cusum_drift = cusum_drift
+        self.cusum_threshold = cusum_threshold
+
+        self.count = 0
+        self.ewma = None
+        self.ew_var = 0.0
+        self._points = deque()
+        self._sums = [0.0, 0.0, 0.0, 0.0]  # x, y, xy, xx over the window
+        self._cusum_high = 0.0
+        self._cusum_low = 0.0
+        self._last_change = 0
+        self.plateau_run = 0
+        self.changepoints = []
+        self.best_ewma = -math.inf
+        self.best_episode = None
+        self.stop = False
+
+    @property
+    def std(self):
+        return math.sqrt(self.ew_var)
+
+    def slope(self):
+        """Least-squares reward change per episode over the window (NaN under 3 points)"""
+        n = len(self._points)
+        if n < 3:
+            return math.nan
+        sx, sy, sxy, sxx = self._sums
+        denominator = n * sxx - sx * sx
+        return (n * sxy - sx * sy) / denominator if denominator else math.nan
+
+    def _slide(self, x, y):
+        self._points.append((x, y))
+        for i, value in enumerate((x, y, x * y, x * x)):
+            self._sums[i] += value
+        if len(self._points) > self.window:
+            old_x, old_y = self._points.popleft()
+            for i, value in enumerate((old_x, old_y, old_x * old_y, old_x * old_x)):
+                self._sums[i] -= value
+
+    def _changepoint(self, reward):
+        """Update the CUSUM against the EWMA before this reward; True when it fires"""
+        # The noise estimate needs a window of history first, and the EWMA a
+        # window to catch up with the new level after a changepoint
+        if self.count - self._last_change < self.window or self.std == 0:
+            return False
+        z = (reward - self.ewma) / self.std
+        self._cusum_high = max(0.0, self._cusum_high + z - self.cusum_drift)
+        self._cusum_low = max(0.0, self._cusum_low - z - self.cusum_drift)
+        if max(self._cusum_high, self._cusum_low) > self.cusum_threshold:
+            self._cusum_high = self._cusum_low = 0.0
+            self._last_change = self.count
+            return True
+        return False
+
+    def update(self, reward, episode=None):
+        """
+        Fold in one episode reward
+
+        Args:
+            reward: The episode's reward
+            episode: Episode number for the report (default: running count)
+
+        Returns:
+            Dict with Episode, Reward, EWMA, Std, Slope, Changepoint, Plateau and Stop
+        """
+        episode = self.count + 1 if episode is None else episode
+        changepoint = self._changepoint(reward)
+        if self.ewma is None:
+            self.ewma = float(reward)
+        else:
+            delta = reward - self.ewma
+            self.ewma += self.alpha * delta
+            self.ew_var = (1 - self.alpha) * (self.ew_var + self.alpha * delta * delta)
+        self.count += 1
+        self._slide(float(self.count), float(reward))
+
+        if self.count >= self.window and self.ewma > self.best_ewma:
+            self.best_ewma, self.best_episode = self.ewma, episode
+
+        slope = self.slope()
+        plateau = (len(self._points) >= self.window and not math.isnan(slope)
+                   and abs(slope) * self.window < self.tolerance * max(self.std, 1e-9))
+        if changepoint:
+            self.changepoints.append(episode)
+            self.plateau_run = 0
+        elif plateau:
+            self.plateau_run += 1
+        else:
+            self.plateau_run = 0
+        self.stop = self.count >= self.min_episodes and self.plateau_run >= self.patience
+
+        return {'Episode': episode, 'Reward': reward, 'EWMA': self.ewma, 'Std': self.std, 'Slope': slope,
+                'Changepoint': changepoint, 'Plateau': plateau, 'Stop': self.stop}
+
+    def state(self):
+        """Current decision, JSON serialisable"""
+        return {
+            'stop': self.stop,
+            'episodes': self.count,
+            'ewma': self.ewma,
+            'std': self.std,
+            'slope_per_episode': None if math.isnan(self.slope()) else self.slope(),
+            'plateau_episodes': self.plateau_run,
+            'changepoints': self.changepoints[-10:],
+            'best_ewma_episode': self.best_episode,
+        }
+
+
+def best_checkpoint(status_path, behavior=DEFAULT_BEHAVIOR):
+    """
+    Highest-reward checkpoint in training_status.json
+
+    Checkpoints without a reward (the first save of a run) are only chosen
+    when none has one; ties go to the earlier checkpoint.
+
+    Returns:
+        Dict with steps, reward and file_path, or None when there is no status file
+    """
+    status_path = Path(status_path)
+    if not status_path.exists():
+        return None
+    with open(status_path) as f:
+        checkpoints = json.load(f).get(behavior, {}).get('checkpoints', [])
+    if not checkpoints:
+        return None
+    rated = [c for c in checkpoints if c.get('reward') is not None]
+    best = max(rated, key=lambda c: (c['reward'], -c['steps'])) if rated else checkpoints[-1]
+    return {key: best.get(key) for key in ('steps', 'reward', 'file_path')}
+
+
+class ConvergenceMonitor:
+    """
+    Follows a growing reward_progress.csv and training_status.json
+
+    Only rows appended since the previous poll are parsed (TailReader), and
+    each is one detector update. A rewritten file (new training session)
+    restarts the detector.
+    """
+
+    def __init__(self, rewards_path=DEFAULT_REWARDS, status_path=DEFAULT_STATUS, behavior=DEFAULT_BEHAVIOR,
+                 reward_column='Reward', **detector_args):
+        self.reader = TailReader(rewards_path)
+        self.status_path = Path(status_path)
+        self.behavior = behavior
+        self.reward_column = reward_column
+        self.detector_args = detector_args
+        self.detector = ConvergenceDetector(**detector_args)
+        self._status_mtime = None
+        self.checkpoint = None
+
+    def poll(self):
+        """
+        Ingest new rewards and re-read training_status.json if it changed
+
+        Returns:
+            List of per-episode update dicts for the new rows
+        """
+        rows = self.reader.read_new_rows()
+        if self.reader.rewritten:
+            self.detector = ConvergenceDetector(**self.detector_args)
+        updates = []
+        if len(rows):
+            rewards = rows[self.reward_column].to_numpy()
+            episodes = rows['Episode'].to_numpy() if 'Episode' in rows.columns else [None] * len(rows)
+            for reward, episode in zip(rewards, episodes):
+                if not math.isnan(reward):
+                    updates.append(self.detector.update(float(reward), None if episode is None else int(episode)))
+
+        if self.status_path.exists():
+            mtime = self.status_path.stat().st_mtime_ns
+            if mtime != self._status_mtime:
+                self._status_mtime = mtime
+                self.checkpoint = best_checkpoint(self.status_path, self.behavior)
+        return updates
+
+    def signal(self):
+        """Stop/keep-going decision with the checkpoint to keep"""
+        decision = self.detector.state()
+        decision['best_checkpoint'] = self.checkpoint
+        return decision
+
+
+def write_signal(decision, path=SIGNAL_FILE):
+    """Write the decision atomically, so a training wrapper never reads half a file"""
+    path = Path(path)
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(decision, f, indent=2)
+    tmp_path.replace(path)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Detect when the ML reward has plateaued and training can stop')
+    parser.add_argument('--rewards', default=DEFAULT_REWARDS, help='reward_progress.csv written by CsvLogger')
+    parser.add_argument('--status', default=DEFAULT_STATUS, help='ML-Agents run_logs/training_status.json')
+    parser.add_argument('--behavior', default=DEFAULT_BEHAVIOR)
+    parser.add_argument('--alpha', type=float, default=DEFAULT_ALPHA, help='EWMA smoothing factor')
+    parser.add_argument('--window', type=int, default=DEFAULT_WINDOW, help='Episodes per slope window')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='Plateau when the change across a window is under this many std')
+    parser.add_argument('--patience', type=int, default=DEFAULT_PATIENCE)
+    parser.add_argument('--min-episodes', type=int, default=DEFAULT_MIN_EPISODES)
+    parser.add_argument('--follow', action='store_true', help='Keep polling until the stop signal')
+    parser.add_argument('--interval', type=float, default=10.0, help='Seconds between polls with --follow')
+    parser.add_argument('--pid', type=int, help='mlagents-learn process to interrupt on stop (it saves a final model)')
+    parser.add_argument('--output', default=SIGNAL_FILE)
+    parser.add_argument('--intersection', type=int, default=None,
+                        help='IntersectionId whose intersection_<id>/ rewards to follow (default: the lowest)')
+    args = parser.parse_args()
+
+    rewards = Path(args.rewards)
+    args.rewards = log_path(rewards.parent, rewards.name, args.intersection)
+    monitor = ConvergenceMonitor(args.rewards, args.status, args.behavior, alpha=args.alpha, window=args.window,
+                                 tolerance=args.tolerance, patience=args.patience,
+                                 min_episodes=args.min_episodes)
+    while True:
+        for update in monitor.poll():
+            if update['Changepoint']:
+                print(f"🔄 Episode {update['Episode']}: reward level changed (EWMA {update['EWMA']:.2f})")
+        decision = monitor.signal()
+        write_signal(decision, args.output)
+        if decision['stop'] or not args.follow:
+            break
+        time.sleep(args.interval)
+
+    if decision['ewma'] is None:
+        print(f"❌ No rewards in {args.rewards} yet")
+        return
+    print(f"📊 {decision['episodes']} episodes, EWMA reward {decision['ewma']:.2f} ± {decision['std']:.2f}, "
+          f"slope {decision['slope_per_episode'] or 0:.4f}/episode, plateau for {decision['plateau_episodes']}")
+    checkpoint = decision['best_checkpoint']
+    if checkpoint:
+        print(f"  Best checkpoint: step {checkpoint['steps']} (reward {checkpoint['reward']})")
+    if decision['stop']:
+        print(f"🛑 Reward has plateaued since episode {decision['episodes'] - decision['plateau_episodes']}: "
+              f"stop training")
+        if args.pid:
+            os.kill(args.pid, signal.SIGINT)
+            print(f"  Sent SIGINT to process {args.pid}")
+    else:
+        print("🚀 Still improving: keep training")
+    print(f"\n📊 Signal saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
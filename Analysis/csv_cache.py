@@ -0,0 +1,144 @@
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # cache is optional, fall back to plain CSV parsing
+    pa = None
+    pq = None
+
+
+CACHE_SUFFIX = '.cache.parquet'
+CACHE_KEY = b'csv_cache_key'
+
+# Explicit dtypes for every column CsvLogger writes (ML and static loggers)
+COLUMN_DTYPES = {
+    'IntersectionId': 'int32',
+    'SimulationTime': 'float32',
+    'Episode': 'int32',
+    'Step': 'int32',
+    'TotalVehicles': 'int32',
+    'VehiclesWaiting': 'int32',
+    'QueueLength': 'int32',
+    'VehiclesDeparted': 'int32',
+    'CurrentPhase': 'int32',
+    'EpisodeDuration': 'float32',
+    'CumulativeReward': 'float32',
+    'CurrentReward': 'float32',
+    'Reward': 'float32',
+    'GreenLightTime': 'float32',
+    'PhaseGreenTime': 'float32',
+    'PhaseDuration': 'float32',
+    'AverageWaitTime': 'float32',
+    'Throughput': 'float32',
+    'TrafficDensity': 'float32',
+    'FuelConsumed': 'float32',
+}
+
+
+def cache_path_for(csv_path):
+    """Return the cache file that sits next to a CSV"""
+    csv_path = Path(csv_path)
+    return csv_path.with_name(csv_path.stem + CACHE_SUFFIX)
+
+
+def source_key(csv_path):
+    """Fingerprint of a CSV file based on its mtime and size"""
+    stat = os.stat(csv_path)
+    return {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+
+
+def apply_dtypes(df):
+    """Downcast known CsvLogger columns to their compact dtypes"""
+    for col, dtype in COLUMN_DTYPES.items():
+        if col not in df.columns:
+            continue
+        values = pd.to_numeric(df[col], errors='coerce')
+        # Integer columns with gaps cannot be int32, keep them as float32
+        if dtype.startswith('int') and values.isna().any():
+            dtype = 'float32'
+        df[col] = values.astype(dtype)
+    return df
+
+
+def _cached_key(cache_path):
+    try:
+        metadata = pq.read_schema(cache_path).metadata or {}
+    except (OSError, pa.ArrowInvalid):
+        return None
+    raw = metadata.get(CACHE_KEY)
+    return json.loads(raw) if raw else None
+
+
+def _write_cache(df, cache_path, key):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata[CACHE_KEY] = json.dumps(key).encode()
+    table = table.replace_schema_metadata(metadata)
+
+    # Write to a temp file first so a crashed run never leaves a half cache;
+    # per process, since parallel renders may cache the same CSV at once
+    tmp_path = cache_path.with_name(f'{cache_path.name}.{os.getpid()}.tmp')
+    pq.write_table(table, tmp_path)
+    os.replace(tmp_path, cache_path)
+
+
+def read_csv_cached(csv_path, columns=None, use_cache=True):
+    """
+    Read a CsvLogger CSV through a typed Parquet cache
+
+    The cache is rebuilt whenever the CSV's mtime or size changes. Without
+    pyarrow this is a plain typed read_csv.
+
+    Args:
+        csv_path: Path to the CSV file
+        columns: Optional list of columns to read (missing ones are ignored)
+        use_cache: Set to False to bypass the cache entirely
+
+    Returns:
+        DataFrame with COLUMN_DTYPES applied
+    """
+    csv_path = Path(csv_path)
+    key = source_key(csv_path)
+
+    if not use_cache or pq is None:
+        df = pd.read_csv(csv_path, usecols=_usecols(columns))
+        return apply_dtypes(df)
+
+    cache_path = cache_path_for(csv_path)
+    if not cache_path.exists() or _cached_key(cache_path) != key:
+        df = apply_dtypes(pd.read_csv(csv_path))
+        try:
+            _write_cache(df, cache_path, key)
+        except OSError as e:
+            print(f"⚠️ Could not write cache {cache_path}: {e}")
+        return df[_present(df.columns, columns)] if columns else df
+
+    if columns:
+        columns = _present(pq.read_schema(cache_path).names, columns)
+    return pq.read_table(cache_path, columns=columns).to_pandas()
+
+
+def clear_cache(data_directory):
+    """Delete every cache file in a directory"""
+    removed = 0
+    for path in Path(data_directory).glob('*' + CACHE_SUFFIX):
+        path.unlink()
+        removed += 1
+    return removed
+
+
+def _present(available, columns):
+    available = set(available)
+    return [c for c in columns if c in available]
+
+
+def _usecols(columns):
+    if not columns:
+        return None
+    wanted = set(columns)
+    return lambda c: c in wanted
@@ -0,0 +1,116 @@
+import numpy as np
+
+
+# All figures are saved at this resolution
+SAVE_DPI = 300
+METHODS = ('minmax', 'lttb')
+
+
+def _clean(x, y):
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    valid = ~(np.isnan(x) | np.isnan(y))
+    return x[valid], y[valid]
+
+
+def minmax_downsample(x, y, n_buckets, x_range=None):
+    """
+    Keep the minimum and maximum point of each of n_buckets equal-width x buckets
+
+    Buckets split x_range (default: the data's x span) into equal widths, so
+    with one bucket per pixel column every peak and trough that could light
+    up a pixel survives however irregularly the series was sampled. Fully
+    vectorized; returns at most 2 * n_buckets + 2 points (the first and last
+    point are always kept) in original order.
+    """
+    x, y = _clean(x, y)
+    n = len(x)
+    if n <= 2 * n_buckets:
+        return x, y
+
+    lo, hi = x_range if x_range is not None else (x.min(), x.max())
+    scale = n_buckets / (hi - lo) if hi > lo else 0.0
+    bucket = np.clip(np.floor((x - lo) * scale), 0, n_buckets - 1).astype(np.int64)
+    # Sorted by bucket, then y: each bucket's run starts at its minimum and ends at its maximum
+    order = np.lexsort((y, bucket))
+    runs = np.flatnonzero(np.diff(bucket[order])) + 1
+    first = np.concatenate([[0], runs])
+    last = np.concatenate([runs, [n]]) - 1
+    keep = np.unique(np.concatenate([order[first], order[last], [0, n - 1]]))
+    return x[keep], y[keep]
+
+
+def lttb_downsample(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets downsampling to n_out points
+
+    Bucket averages are computed in one vectorized pass; the triangle areas in
+    each bucket are vectorized, only the walk from bucket to bucket is a loop.
+    """
+    x, y = _clean(x, y)
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return x, y
+
+    # Bucket boundaries for the n - 2 interior points
+    edges = np.floor(np.linspace(1, n - 1, n_out - 1)).astype(np.int64)
+    counts = np.diff(edges)
+    sums_x = np.add.reduceat(x[:n - 1], edges[:-1])
+    sums_y = np.add.reduceat(y[:n - 1], edges[:-1])
+    avg_x = np.append(sums_x / counts, x[-1])
+    avg_y = np.append(sums_y / counts, y[-1])
+
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, stop = edges[i], edges[i + 1]
+        bx, by = x[start:stop], y[start:stop]
+        area = np.abs((x[a] - avg_x[i + 1]) * (by - y[a]) - (x[a] - bx) * (avg_y[i + 1] - y[a]))
+        a = start + int(area.argmax())
+        keep[i + 1] = a
+    return x[keep], y[keep]
+
+
+def axes_x_range(ax, x):
+    """
+    x span the axes will show once x is drawn
+
+    A fixed xlim is used as is; otherwise the span of x joined with what is
+    already plotted, so every series on the axes shares one pixel grid.
+    """
+    if not ax.get_autoscalex_on():
+        return ax.get_xlim()
+    x = np.asarray(x, dtype=np.float64)
+    x = x[np.isfinite(x)]
+    lo, hi = (x.min(), x.max()) if len(x) else (np.inf, -np.inf)
+    if ax.has_data():
+        lo, hi = min(lo, ax.dataLim.x0), max(hi, ax.dataLim.x1)
+    return lo, hi
+
+
+def axes_pixel_width(ax, dpi=SAVE_DPI):
+    """Width of an axes in output pixels when the figure is saved at dpi"""
+    fig = ax.get_figure()
+    return max(1, int(ax.get_position().width * fig.get_figwidth() * dpi))
+
+
+def downsample_for_axes(ax, x, y, method='minmax', dpi=SAVE_DPI):
+    """
+    Reduce a series to what the axes can show at the save resolution
+
+    Args:
+        ax: Matplotlib axes the series will be drawn on
+        x, y: Series values
+        method: 'minmax' (min and max of each pixel column's x range) or 'lttb'
+        dpi: Resolution the figure is saved at
+
+    Returns:
+        (x, y) arrays, unchanged if they already fit
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown downsampling method '{method}', expected one of {METHODS}")
+    pixels = axes_pixel_width(ax, dpi)
+    if method == 'minmax':
+        return minmax_downsample(x, y, pixels, axes_x_range(ax, x))
+    return lttb_downsample(x, y, 2 * pixels)
@@ -0,0 +1,177 @@
+import hashlib
+import io
+import pickle
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from csv_cache import apply_dtypes
+from log_files import log_paths
+from streaming_stats import StreamSummary
+
+
+STATE_FILE = '.analysis_state.pkl'
+STATE_VERSION = 2
+# Bytes at the start of the file and just before the stored offset that are
+# hashed to detect a rewritten file
+DIGEST_WINDOW = 4096
+
+
+class TailReader:
+    """
+    Keeps a byte offset into a growing CSV and parses only the rows appended to it
+
+    CsvLogger.SaveToFile rewrites the whole file each time. As long as the
+    already-ingested prefix is unchanged only the appended rows are parsed;
+    if the prefix changed (new session, truncated file) everything restarts.
+    Rows of an intersection_<id>/ log written without an IntersectionId
+    column get `intersection_id`.
+    """
+
+    def __init__(self, csv_path, intersection_id=None):
+        self.path = Path(csv_path)
+        self.intersection_id = intersection_id
+        self.reset()
+
+    def reset(self):
+        """Forget the offset, so the next read starts from the top of the file"""
+        self.rewritten = False
+        self.offset = 0
+        self.header = None
+        self.digest = None
+
+    def _prefix_digest(self, f, offset):
+        digest = hashlib.sha1()
+        f.seek(0)
+        digest.update(f.read(min(offset, DIGEST_WINDOW)))
+        start = max(0, offset - DIGEST_WINDOW)
+        f.seek(start)
+        digest.update(f.read(offset - start))
+        return digest.hexdigest()
+
+    def read_new_rows(self):
+        """
+        Parse the complete rows appended since the last call
+
+        Sets ``rewritten`` when the file had to be re-read from the start.
+
+        Returns:
+            DataFrame of new rows (possibly empty)
+        """
+        if not self.path.exists():
+            raise FileNotFoundError(f"No such file: '{self.path}'")
+
+        self.rewritten = False
+        with open(self.path, 'rb') as f:
+            size = f.seek(0, io.SEEK_END)
+            if size < self.offset or (self.offset and self._prefix_digest(f, self.offset) != self.digest):
+                print(f"🔄 {self.path.name} was rewritten, re-reading from the start")
+                self.reset()
+                self.rewritten = True
+
+            f.seek(self.offset)
+            data = f.read()
+
+            # Ignore a trailing partial line that is still being written
+            end = data.rfind(b'\n') + 1
+            if end == 0:
+                return pd.DataFrame(columns=self.header or [])
+            data = data[:end]
+            self.offset += end
+            self.digest = self._prefix_digest(f, self.offset)
+
+        if self.header is None:
+            header_end = data.index(b'\n') + 1
+            self.header = data[:header_end].decode().strip().split(',')
+            data = data[header_end:]
+
+        if not data.strip():
+            return pd.DataFrame(columns=self.header)
+        rows = apply_dtypes(pd.read_csv(io.BytesIO(data), header=None, names=self.header))
+        if self.intersection_id is not None and 'IntersectionId' not in rows.columns:
+            rows['IntersectionId'] = np.int32(self.intersection_id)
+        return rows
+
+
+class IncrementalAnalysis:
+    """
+    Persisted TailReaders for every log of a data directory
+
+    Each log is read from data_dir and from every intersection_<id>/
+    directory (log_files.log_paths), and its files are pooled into one
+    StreamSummary, or only the rows of `intersection`. Directories that
+    appear later are picked up on the next refresh. When one file of a log
+    is rewritten, the log's summary is rebuilt from all of its files.
+    """
+
+    def __init__(self, data_directory, file_names, intersection=None):
+        self.data_dir = Path(data_directory)
+        self.intersection = intersection
+        # file name -> {path: TailReader}
+        self.readers = {name: {} for name in file_names}
+        self.summaries = {name: StreamSummary(self.data_dir / name) for name in file_names}
+        self.version = STATE_VERSION
+
+    @classmethod
+    def load(cls, data_directory, file_names, state_path=None, intersection=None):
+        """Restore saved state, or start fresh if there is none or it is stale"""
+        state_path = Path(state_path or Path(data_directory) / STATE_FILE)
+        if state_path.exists():
+            try:
+                with open(state_path, 'rb') as f:
+                    state = pickle.load(f)
+                if (state.version == STATE_VERSION and set(file_names) <= set(state.readers)
+                        and state.intersection == intersection):
+                    return state
+            except (OSError, pickle.UnpicklingError, AttributeError, EOFError) as e:
+                print(f"⚠️ Ignoring unreadable state {state_path}: {e}")
+        return cls(data_directory, file_names, intersection)
+
+    def save(self, state_path=None):
+        state_path = Path(state_path or self.data_dir / STATE_FILE)
+        tmp_path = state_path.with_name(state_path.name + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp_path.replace(state_path)
+
+    def _refresh_log(self, name):
+        readers = self.readers[name]
+        for directory_id, path in log_paths(self.data_dir, name, self.intersection):
+            # Only CSVs can be tailed; a .tslog-only file is skipped
+            if path.exists() and path not in readers:
+                readers[path] = TailReader(path, directory_id)
+
+        chunks = [reader.read_new_rows() for reader in readers.values()]
+        if any(reader.rewritten for reader in readers.values()):
+            self.summaries[name] = StreamSummary(self.data_dir / name)
+            for i, reader in enumerate(readers.values()):
+                if not reader.rewritten:
+                    reader.reset()
+                    chunks[i] = reader.read_new_rows()
+
+        new_rows = 0
+        for chunk in chunks:
+            if self.intersection is not None and 'IntersectionId' in chunk.columns:
+                chunk = chunk[chunk['IntersectionId'] == self.intersection]
+            self.summaries[name].update(chunk)
+            new_rows += len(chunk)
+        return new_rows
+
+    def refresh(self):
+        """
+        Ingest appended rows in every log; returns new row counts per log
+
+        Raises:
+            FileNotFoundError: When no log has any file yet
+        """
+        new_rows = {name: self._refresh_log(name) for name in self.readers}
+        missing = [name for name, readers in self.readers.items() if not readers]
+        if len(missing) == len(self.readers):
+            raise FileNotFoundError(f"None of {missing} in {self.data_dir} or its intersection_<id>/ directories")
+        for name in missing:
+            print(f"⚠️ No {name} in {self.data_dir} yet")
+        return new_rows
+
+    def summary(self, file_name):
+        return self.summaries[file_name]
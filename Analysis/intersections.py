@@ -0,0 +1,257 @@
+import argparse
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from csv_cache import pq, read_csv_cached
+from log_files import intersection_dirs
+from throughput import prepare
+
+
+DEFAULT_DATASET = 'partitions'
+# Log files with an IntersectionId column, per file type
+PARTITIONED_FILES = {
+    'episodes': 'episode_results.csv',
+    'intervals': 'interval_data.csv',
+}
+CONTROLLER_PREFIXES = {'ml': '', 'static': 'static_'}
+# Consecutive episodes stored together; ML episodes are single decisions, so
+# one directory per episode would mean millions of tiny files
+EPISODES_PER_PARTITION = 1000
+# Partition directory levels below <dataset>/<file type>/, as key=value names
+PARTITION_KEYS = [('run', 'Run'), ('controller', 'Controller'), ('intersection', 'IntersectionId'),
+                  ('episode', 'Episode')]
+# Seconds per bucket of the network-wide time series
+DEFAULT_BUCKET = 60.0
+PART_NAME = 'part-0'
+
+
+def find_logs(data_dir):
+    """
+    Interval and episode logs of one run: the plain files in data_dir and
+    those in its intersection_<id>/ subdirectories
+
+    Returns:
+        DataFrame with FileType, Controller, DirectoryId (None for data_dir
+        itself) and Path
+    """
+    data_dir = Path(data_dir)
+    directories = [(None, data_dir)] + intersection_dirs(data_dir)
+
+    rows = []
+    for directory_id, directory in directories:
+        for file_type, file_name in PARTITIONED_FILES.items():
+            for controller, prefix in CONTROLLER_PREFIXES.items():
+                path = directory / f'{prefix}{file_name}'
+                if path.exists():
+                    rows.append({'FileType': file_type, 'Controller': controller,
+                                 'DirectoryId': directory_id, 'Path': path})
+    return pd.DataFrame(rows, columns=['FileType', 'Controller', 'DirectoryId', 'Path'])
+
+
+def _partition_dir(dataset_dir, file_type, run, controller, intersection=None, episode=None):
+    path = Path(dataset_dir) / file_type / f'run={run}' / f'controller={controller}'
+    if intersection is not None:
+        path = path / f'intersection={intersection}'
+    if episode is not None:
+        path = path / f'episode={episode}'
+    return path
+
+
+def _write_part(df, directory):
+    directory.mkdir(parents=True, exist_ok=True)
+    if pq is not None:
+        df.to_parquet(directory / f'{PART_NAME}.parquet', index=False)
+    else:
+        df.to_csv(directory / f'{PART_NAME}.csv', index=False)
+
+
+def _read_part(path, columns=None):
+    if path.suffix == '.parquet':
+        return pd.read_parquet(path, columns=columns)
+    df = pd.read_csv(path)
+    return df[[c for c in columns if c in df.columns]] if columns else df
+
+
+def partition_logs(data_dir, dataset_dir=DEFAULT_DATASET, run=None, episodes_per_partition=EPISODES_PER_PARTITION):
+    """
+    Copy one run's logs into <dataset>/<file type>/run=/controller=/intersection=/episode=/
+
+    Files are read one at a time. Rows keep their IntersectionId column;
+    logs written before it existed take the id of their intersection_<id>
+    directory, or 0. Re-partitioning a run replaces its earlier partitions.
+
+    Args:
+        data_dir: Run directory as copied from Application.persistentDataPath
+        dataset_dir: Root of the partitioned dataset
+        run: Run name (default: the name of data_dir)
+        episodes_per_partition: Episodes per episode= directory, named by
+            the first episode they hold
+
+    Returns:
+        Partition table of the run, see list_partitions
+    """
+    data_dir = Path(data_dir)
+    run = run or data_dir.resolve().name
+    logs = find_logs(data_dir)
+    if logs.empty:
+        raise FileNotFoundError(f"No interval or episode logs in {data_dir}")
+
+    for file_type, controller in logs[['FileType', 'Controller']].drop_duplicates().itertuples(index=False):
+        shutil.rmtree(_partition_dir(dataset_dir, file_type, run, controller), ignore_errors=True)
+
+    for log in logs.itertuples(index=False):
+        df = read_csv_cached(log.Path)
+        if 'IntersectionId' not in df.columns:
+            df['IntersectionId'] = np.int32(log.DirectoryId or 0)
+        block = df['Episode'] // episodes_per_partition * episodes_per_partition
+        for (intersection, episode), part in df.groupby([df['IntersectionId'], block], sort=True):
+            _write_part(part, _partition_dir(dataset_dir, log.FileType, run, log.Controller,
+                                             int(intersection), int(episode)))
+        print(f"  {log.Path}: {len(df)} rows, intersections {sorted(df['IntersectionId'].unique().tolist())}")
+    return list_partitions(dataset_dir, run=run)
+
+
+def list_partitions(dataset_dir=DEFAULT_DATASET, file_type='intervals', run=None):
+    """
+    Partition files of the dataset, with their keys parsed from the path
+
+    Returns:
+        DataFrame with Run, Controller, IntersectionId, Episode and Path
+    """
+    root = Path(dataset_dir) / file_type
+    pattern = f'run={run}/*/*/*/{PART_NAME}.*' if run else f'*/*/*/*/{PART_NAME}.*'
+    rows = []
+    for path in sorted(root.glob(pattern)):
+        keys = dict(part.split('=', 1) for part in path.relative_to(root).parts[:-1])
+        row = {column: keys[key] for key, column in PARTITION_KEYS}
+        row['Path'] = path
+        rows.append(row)
+    table = pd.DataFrame(rows, columns=[column for _, column in PARTITION_KEYS] + ['Path'])
+    return table.astype({'IntersectionId': 'int64', 'Episode': 'int64'})
+
+
+def _intersection_summary(key, paths, bucket):
+    """
+    Worker: queue and throughput statistics of one intersection
+
+    Only this intersection's partitions are read. Returns the summary row
+    and the time-bucketed series that the network totals are summed from.
+    """
+    df = pd.concat([_read_part(path) for path in paths], ignore_index=True).sort_values('SimulationTime')
+    df = prepare(df)
+    queue = df['QueueLength'].to_numpy(dtype=np.float64)
+    elapsed = df['Elapsed'].sum()
+
+    run, controller, intersection = key
+    summary = {
+        'Run': run, 'Controller': controller, 'IntersectionId': intersection,
+        'Rows': len(df), 'Episodes': df['Episode'].nunique(),
+        'SimulatedSeconds': df['SimulationTime'].max() - df['SimulationTime'].min(),
+        'QueueMean': np.nanmean(queue), 'QueueStd': np.nanstd(queue, ddof=1) if len(queue) > 1 else np.nan,
+        'QueueP95': np.nanpercentile(queue, 95), 'QueueMax': np.nanmax(queue),
+        'Departed': df['Departed'].sum(), 'Elapsed': elapsed,
+        'VehiclesPerMinute': df['Departed'].sum() / elapsed * 60 if elapsed else np.nan,
+    }
+    series = df.groupby(df['SimulationTime'] // bucket * bucket).agg(
+        QueueLength=('QueueLength', 'mean'), Departed=('Departed', 'sum'))
+    series.index.name = 'TimeBucket'
+    series = series.reset_index()
+    series['Run'], series['Controller'], series['IntersectionId'] = run, controller, intersection
+    return summary, series
+
+
+def _summarize_group(task):
+    return _intersection_summary(*task)
+
+
+def intersection_stats(dataset_dir=DEFAULT_DATASET, run=None, workers=None, bucket=DEFAULT_BUCKET):
+    """
+    Per-intersection and network-wide queue and throughput statistics
+
+    Each intersection is one task for a process pool, so at most `workers`
+    intersections are in memory at once and the per-intersection reductions
+    run in parallel. Network figures are combined from the per-intersection
+    results: queue means weighted by rows, vehicles per minute summed over
+    intersections, and the queue over time summed across intersections per
+    time bucket.
+
+    Args:
+        run: Only this run (default: every run in the dataset)
+        workers: Processes (default: one per CPU; 1 runs in this process)
+        bucket: Seconds per network time-series bucket
+
+    Returns:
+        (per-intersection DataFrame, network DataFrame per run and
+        controller, network time series DataFrame)
+    """
+    partitions = list_partitions(dataset_dir, 'intervals', run)
+    if partitions.empty:
+        raise FileNotFoundError(f"No interval partitions in {dataset_dir}" + (f" for run {run}" if run else ''))
+    keys = ['Run', 'Controller', 'IntersectionId']
+    tasks = [(key, list(group['Path']), bucket) for key, group in partitions.groupby(keys, sort=True)]
+
+    workers = workers or os.cpu_count()
+    if workers == 1:
+        results = [_summarize_group(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            results = list(pool.map(_summarize_group, tasks, chunksize=max(1, len(tasks) // (4 * workers))))
+
+    per_intersection = pd.DataFrame([summary for summary, _ in results])
+    series = pd.concat([s for _, s in results], ignore_index=True)
+
+    grouped = per_intersection.assign(WeightedQueue=per_intersection['QueueMean'] * per_intersection['Rows'])
+    network = grouped.groupby(['Run', 'Controller']).agg(
+        Intersections=('IntersectionId', 'size'), Rows=('Rows', 'sum'), WeightedQueue=('WeightedQueue', 'sum'),
+        WorstQueueMean=('QueueMean', 'max'), WorstQueueP95=('QueueP95', 'max'),
+        VehiclesPerMinute=('VehiclesPerMinute', 'sum'),
+        MeanIntersectionVehiclesPerMinute=('VehiclesPerMinute', 'mean'))
+    network.insert(2, 'QueueMean', network.pop('WeightedQueue') / network['Rows'])
+
+    network_series = series.groupby(['Run', 'Controller', 'TimeBucket']).agg(
+        TotalQueue=('QueueLength', 'sum'), Departed=('Departed', 'sum'),
+        Intersections=('IntersectionId', 'nunique'))
+    network_series['VehiclesPerMinute'] = network_series['Departed'] / bucket * 60
+    return per_intersection, network.reset_index(), network_series.reset_index()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Partition multi-intersection logs and compare them per intersection')
+    parser.add_argument('--data-dir', help='Run directory to partition first (with intersection_<id>/ subdirectories)')
+    parser.add_argument('--dataset', default=DEFAULT_DATASET, help='Root of the partitioned dataset')
+    parser.add_argument('--run', help='Run name (default: the data directory name, or every run)')
+    parser.add_argument('--episodes-per-partition', type=int, default=EPISODES_PER_PARTITION)
+    parser.add_argument('--workers', type=int, default=None, help='Parallel processes (default: one per CPU)')
+    parser.add_argument('--bucket', type=float, default=DEFAULT_BUCKET, help='Seconds per network time bucket')
+    parser.add_argument('--output-prefix', default='intersection')
+    args = parser.parse_args()
+
+    run = args.run
+    if args.data_dir:
+        run = run or Path(args.data_dir).resolve().name
+        print(f"🔄 Partitioning {args.data_dir} into {args.dataset} as run '{run}'...")
+        partitions = partition_logs(args.data_dir, args.dataset, run, args.episodes_per_partition)
+        print(f"✅ {len(partitions)} interval partitions")
+
+    per_intersection, network, network_series = intersection_stats(args.dataset, run, args.workers, args.bucket)
+    paths = [f'{args.output_prefix}_stats.csv', f'{args.output_prefix}_network.csv',
+             f'{args.output_prefix}_network_series.csv']
+    for table, path in zip((per_intersection, network, network_series), paths):
+        table.to_csv(path, index=False)
+
+    print("\nNetwork-wide (queue mean weighted by rows, vehicles per minute summed over intersections):")
+    print(network.to_string(index=False, float_format='%.2f'))
+    worst = per_intersection.sort_values('QueueMean', ascending=False).head(5)
+    print("\nIntersections with the longest mean queue:")
+    print(worst[['Run', 'Controller', 'IntersectionId', 'QueueMean', 'QueueP95', 'VehiclesPerMinute']]
+          .to_string(index=False, float_format='%.2f'))
+    print(f"\n📊 Statistics saved to {', '.join(paths)}")
+
+
+if __name__ == "__main__":
+    main()
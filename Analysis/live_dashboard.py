@@ -0,0 +1,343 @@
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import struct
+from pathlib import Path
+
+import numpy as np
+
+from incremental import TailReader
+from log_files import log_path
+from streaming_stats import TimeBuckets
+
+
+LIVE_METRICS = ['QueueLength', 'VehiclesWaiting', 'TotalVehicles']
+SOURCES = {'ml': 'interval_data.csv', 'static': 'static_interval_data.csv'}
+# Buckets kept per series; the browser never holds more points than this
+DEFAULT_BUCKETS = 1024
+WS_MAGIC = '258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+
+
+class LiveSource:
+    """
+    Tails one interval CSV and keeps a downsampled view of each live metric
+
+    Every poll returns only the buckets touched by newly appended rows, or a
+    full snapshot when the bucket width changed or the file was rewritten.
+    Until the file exists, `locate` (if given) is asked for its path again
+    on every poll, so intersection_<id>/ logs created after start are found.
+    """
+
+    def __init__(self, name, csv_path, max_buckets=DEFAULT_BUCKETS, locate=None):
+        self.name = name
+        self.locate = locate
+        self.reader = TailReader(csv_path)
+        self.max_buckets = max_buckets
+        self._reset_buckets()
+
+    def _reset_buckets(self):
+        self.buckets = {metric: TimeBuckets(self.max_buckets) for metric in LIVE_METRICS}
+
+    def poll(self):
+        """Ingest appended rows; returns a message dict or None if nothing changed"""
+        if not self.reader.path.exists():
+            path = self.locate() if self.locate else self.reader.path
+            if not path.exists():
+                return None
+            self.reader = TailReader(path)
+        rows = self.reader.read_new_rows()
+        if self.reader.rewritten:
+            self._reset_buckets()
+        if len(rows) == 0 and not self.reader.rewritten:
+            return None
+
+        snapshot = self.reader.rewritten
+        touched = {}
+        for metric, buckets in self.buckets.items():
+            if metric not in rows.columns or 'SimulationTime' not in rows.columns:
+                continue
+            width = buckets.width
+            times = rows['SimulationTime'].to_numpy(dtype=np.float64)
+            buckets.update(times, rows[metric].to_numpy())
+            if buckets.width != width:
+                snapshot = True
+            touched[metric] = np.unique(times[~np.isnan(times)] // buckets.width).astype(np.int64)
+
+        if snapshot:
+            return self.snapshot()
+        return {'type': 'delta', 'source': self.name,
+                'series': {m: self._encode(m, idx) for m, idx in touched.items()}}
+
+    def snapshot(self):
+        """Full downsampled state of every metric"""
+        series = {}
+        for metric, buckets in self.buckets.items():
+            series[metric] = self._encode(metric, np.nonzero(buckets.counts > 0)[0])
+        return {'type': 'snapshot', 'source': self.name, 'series': series}
+
+    def _encode(self, metric, idx):
+        b = self.buckets[metric]
+        idx = idx[(idx >= 0) & (idx < b.max_buckets)]
+        idx = idx[b.counts[idx] > 0]
+        return {
+            'width': b.width,
+            'index': idx.tolist(),
+            'mean': np.round(b.sums[idx] / b.counts[idx], 3).tolist(),
+            'min': b.mins[idx].tolist(),
+            'max': b.maxs[idx].tolist(),
+        }
+
+
+class LiveDashboard:
+    """Local asyncio HTTP server with a WebSocket feed of live interval data"""
+
+    def __init__(self, data_directory="./", interval=1.0, max_buckets=DEFAULT_BUCKETS, intersection=None):
+        """
+        Args:
+            intersection: IntersectionId to follow in a multi-intersection run
+                (default: the top-level logs, else the lowest id)
+        """
+        self.data_dir = Path(data_directory)
+        self.interval = interval
+        self.sources = []
+        for name, file_name in SOURCES.items():
+            locate = lambda file_name=file_name: log_path(self.data_dir, file_name, intersection)
+            self.sources.append(LiveSource(name, locate(), max_buckets, locate))
+        self.clients = set()
+
+    async def handle(self, reader, writer):
+        try:
+            request_line = (await reader.readline()).decode()
+            headers = {}
+            while True:
+                line = (await reader.readline()).decode().strip()
+                if not line:
+                    break
+                key, _, value = line.partition(':')
+                headers[key.strip().lower()] = value.strip()
+
+            path = request_line.split(' ')[1] if request_line.count(' ') >= 2 else '/'
+            if path == '/ws' and headers.get('upgrade', '').lower() == 'websocket':
+                if 'sec-websocket-key' in headers:
+                    await self._serve_websocket(reader, writer, headers)
+                else:
+                    self._respond(writer, '400 Bad Request', 'text/plain', b'Missing Sec-WebSocket-Key')
+            elif path == '/':
+                self._respond(writer, '200 OK', 'text/html; charset=utf-8', DASHBOARD_HTML.encode())
+            else:
+                self._respond(writer, '404 Not Found', 'text/plain', b'Not found')
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def _respond(self, writer, status, content_type, body):
+        writer.write(f'HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n'
+                     f'Content-Length: {len(body)}\r\nConnection: close\r\n\r\n'.encode() + body)
+
+    async def _serve_websocket(self, reader, writer, headers):
+        accept = base64.b64encode(
+            hashlib.sha1((headers['sec-websocket-key'] + WS_MAGIC).encode()).digest()).decode()
+        writer.write(('HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\n'
+                      f'Connection: Upgrade\r\nSec-WebSocket-Accept: {accept}\r\n\r\n').encode())
+
+        # New clients start from the current downsampled state
+        for source in self.sources:
+            self._send(writer, source.snapshot())
+        await writer.drain()
+        self.clients.add(writer)
+        try:
+            while True:
+                opcode, payload = await self._read_frame(reader)
+                if opcode == 0x8:  # close: echo the status code back, as the protocol requires
+                    self.clients.discard(writer)
+                    self._write_frame(writer, 0x8, payload[:2])
+                    await writer.drain()
+                    break
+                if opcode == 0x9:  # ping
+                    self._write_frame(writer, 0xA, payload)
+                    await writer.drain()
+        finally:
+            self.clients.discard(writer)
+
+    async def _read_frame(self, reader):
+        """Read one client frame, returning its opcode and unmasked payload"""
+        first, second = await reader.readexactly(2)
+        length = second & 0x7F
+        if length == 126:
+            length = struct.unpack('!H', await reader.readexactly(2))[0]
+        elif length == 127:
+            length = struct.unpack('!Q', await reader.readexactly(8))[0]
+        mask = await reader.readexactly(4) if second & 0x80 else None
+        payload = await reader.readexactly(length)
+        if mask:
+            payload = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+        return first & 0x0F, payload
+
+    def _write_frame(self, writer, opcode, payload):
+        length = len(payload)
+        if length < 126:
+            header = struct.pack('!BB', 0x80 | opcode, length)
+        elif length < 1 << 16:
+            header = struct.pack('!BBH', 0x80 | opcode, 126, length)
+        else:
+            header = struct.pack('!BBQ', 0x80 | opcode, 127, length)
+        writer.write(header + payload)
+
+    def _send(self, writer, message):
+        self._write_frame(writer, 0x1, json.dumps(message, separators=(',', ':')).encode())
+
+    async def poll_forever(self):
+        loop = asyncio.get_running_loop()
+        errors = {}
+        while True:
+            for source in self.sources:
+                # CSV parsing runs in a thread so the event loop stays responsive
+                try:
+                    message = await loop.run_in_executor(None, source.poll)
+                except Exception as e:
+                    # e.g. the CSV vanished or was half-written during CsvLogger's full rewrite;
+                    # the next poll retries
+                    error = f"{type(e).__name__}: {e}"
+                    if error != errors.get(source.name):
+                        print(f"⚠️ Polling {source.reader.path} failed ({error}); retrying")
+                    errors[source.name] = error
+                    continue
+                errors.pop(source.name, None)
+                if message is None:
+                    continue
+                for writer in list(self.clients):
+                    try:
+                        self._send(writer, message)
+                        await writer.drain()
+                    except ConnectionError:
+                        self.clients.discard(writer)
+            await asyncio.sleep(self.interval)
+
+    async def serve(self, host='127.0.0.1', port=8765):
+        server = await asyncio.start_server(self.handle, host, port)
+        print(f"📡 Live dashboard on http://{host}:{port}/ watching {self.data_dir.resolve()}")
+        async with server:
+            await asyncio.gather(server.serve_forever(), self.poll_forever())
+
+
+DASHBOARD_HTML = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Traffic Signal Control: Live Dashboard</title>
+<style>
+  body { font-family: sans-serif; margin: 20px; background: #fafafa; }
+  h1 { font-size: 20px; }
+  .chart { background: white; border: 1px solid #ddd; margin-bottom: 16px; }
+  .legend span { margin-right: 16px; font-weight: bold; }
+</style>
+</head>
+<body>
+<h1>Traffic Signal Control: ML vs Static (live)</h1>
+<div class="legend"><span style="color:#2E86AB">ML Agent</span><span style="color:#F24236">Static Controller</span>
+<span id="status">connecting...</span></div>
+<div id="charts"></div>
+<script>
+const METRICS = %METRICS%;
+const COLORS = {ml: '#2E86AB', static: '#F24236'};
+const state = {ml: {}, static: {}};
+const canvases = {};
+for (const m of METRICS) {
+  const title = document.createElement('h3');
+  title.textContent = m;
+  const c = document.createElement('canvas');
+  c.className = 'chart'; c.width = 1200; c.height = 260;
+  document.getElementById('charts').append(title, c);
+  canvases[m] = c;
+}
+
+function apply(msg) {
+  for (const [metric, s] of Object.entries(msg.series)) {
+    let series = state[msg.source][metric];
+    if (msg.type === 'snapshot' || !series || series.width !== s.width) {
+      series = state[msg.source][metric] = {width: s.width, points: new Map()};
+    }
+    s.index.forEach((idx, i) => series.points.set(idx, [s.mean[i], s.min[i], s.max[i]]));
+  }
+}
+
+function draw(metric) {
+  const c = canvases[metric], ctx = c.getContext('2d');
+  ctx.clearRect(0, 0, c.width, c.height);
+  let xmax = 1, ymin = Infinity, ymax = -Infinity;
+  for (const src of ['ml', 'static']) {
+    const s = state[src][metric];
+    if (!s) continue;
+    for (const [idx, [, lo, hi]] of s.points) {
+      xmax = Math.max(xmax, (idx + 1) * s.width);
+      ymin = Math.min(ymin, lo); ymax = Math.max(ymax, hi);
+    }
+  }
+  if (ymin === Infinity) return;
+  if (ymax === ymin) ymax = ymin + 1;
+  const X = t => 40 + (c.width - 50) * t / xmax;
+  const Y = v => c.height - 20 - (c.height - 30) * (v - ymin) / (ymax - ymin);
+  ctx.fillStyle = '#555';
+  ctx.fillText(ymax.toFixed(1), 2, 14); ctx.fillText(ymin.toFixed(1), 2, c.height - 20);
+  ctx.fillText(xmax.toFixed(0) + ' s', c.width - 60, c.height - 5);
+  for (const src of ['ml', 'static']) {
+    const s = state[src][metric];
+    if (!s) continue;
+    const keys = [...s.points.keys()].sort((a, b) => a - b);
+    ctx.strokeStyle = COLORS[src];
+    ctx.globalAlpha = 0.25; ctx.beginPath();
+    for (const k of keys) {
+      const [, lo, hi] = s.points.get(k), x = X((k + 0.5) * s.width);
+      ctx.moveTo(x, Y(lo)); ctx.lineTo(x, Y(hi));
+    }
+    ctx.stroke();
+    ctx.globalAlpha = 1; ctx.lineWidth = 2; ctx.beginPath();
+    keys.forEach((k, i) => {
+      const x = X((k + 0.5) * s.width), y = Y(s.points.get(k)[0]);
+      i ? ctx.lineTo(x, y) : ctx.moveTo(x, y);
+    });
+    ctx.stroke(); ctx.lineWidth = 1;
+  }
+}
+
+let pending = false;
+function connect() {
+  const ws = new WebSocket(`ws://${location.host}/ws`);
+  ws.onopen = () => document.getElementById('status').textContent = 'live';
+  ws.onclose = () => { document.getElementById('status').textContent = 'reconnecting...'; setTimeout(connect, 2000); };
+  ws.onmessage = e => {
+    apply(JSON.parse(e.data));
+    if (!pending) { pending = true; requestAnimationFrame(() => { METRICS.forEach(draw); pending = false; }); }
+  };
+}
+connect();
+</script>
+</body>
+</html>
+""".replace('%METRICS%', json.dumps(LIVE_METRICS))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve a live dashboard of the growing interval CSVs')
+    parser.add_argument('--data-dir', default='./', help='Directory (or run directory) holding the interval CSVs')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--interval', type=float, default=1.0, help='Seconds between file polls')
+    parser.add_argument('--buckets', type=int, default=DEFAULT_BUCKETS, help='Points kept per series')
+    parser.add_argument('--intersection', type=int, default=None,
+                        help='IntersectionId to follow (default: the lowest intersection_<id>/)')
+    args = parser.parse_args()
+
+    dashboard = LiveDashboard(args.data_dir, args.interval, args.buckets, args.intersection)
+    try:
+        asyncio.run(dashboard.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print("\n👋 Live dashboard stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+import re
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from binary_log import BINARY_SUFFIX, read_binary_log
+from csv_cache import read_csv_cached
+
+
+# Per-intersection log directories written by TrafficLightSetup.LogFileName
+INTERSECTION_DIR = re.compile(r'^intersection_(\d+)$')
+
+
+def intersection_dirs(data_dir):
+    """(IntersectionId, directory) of every intersection_<id>/ in data_dir, by id"""
+    data_dir = Path(data_dir)
+    if not data_dir.is_dir():
+        return []
+    found = []
+    for path in data_dir.iterdir():
+        match = INTERSECTION_DIR.match(path.name)
+        if match and path.is_dir():
+            found.append((int(match.group(1)), path))
+    return sorted(found)
+
+
+def _exists(path):
+    return path.exists() or path.with_suffix(BINARY_SUFFIX).exists()
+
+
+def read_log_file(path, columns=None, use_cache=True):
+    """One file of a log: the CSV, or the .tslog next to it when only that exists"""
+    path = Path(path)
+    if not path.exists() and path.with_suffix(BINARY_SUFFIX).exists():
+        return read_binary_log(path.with_suffix(BINARY_SUFFIX)).to_frame(columns)
+    return read_csv_cached(path, columns, use_cache)
+
+
+def log_paths(data_dir, file_name, intersection=None):
+    """
+    Every file holding one log of a run
+
+    A scene with one intersection writes data_dir/file_name; with several,
+    each writes intersection_<id>/file_name. A file counts as present when
+    it or the .tslog next to it exists.
+
+    Args:
+        intersection: Only the intersection_<id>/ file of this id (the
+            top-level file is kept, its rows are filtered by read_log)
+
+    Returns:
+        List of (IntersectionId or None for the top-level file, Path)
+    """
+    data_dir = Path(data_dir)
+    paths = []
+    if _exists(data_dir / file_name):
+        paths.append((None, data_dir / file_name))
+    for directory_id, directory in intersection_dirs(data_dir):
+        path = directory / file_name
+        if _exists(path) and intersection in (None, directory_id):
+            paths.append((directory_id, path))
+    return paths
+
+
+def log_path(data_dir, file_name, intersection=None):
+    """
+    The single file to follow for a log, for readers that tail one file
+
+    The top-level file when it exists, otherwise the file of `intersection`
+    or of the lowest intersection id. A path that does not exist yet is
+    returned when nothing was found, so a tailing reader can wait for it.
+    """
+    data_dir = Path(data_dir)
+    paths = [path for directory_id, path in log_paths(data_dir, file_name, intersection)
+             if directory_id is not None or intersection is None]
+    return paths[0] if paths else data_dir / file_name
+
+
+def read_log(data_dir, file_name, columns=None, use_cache=True, intersection=None, reader=None):
+    """
+    One log of a run as a DataFrame, across its intersection_<id>/ files
+
+    Files are concatenated with their IntersectionId (taken from the
+    directory for logs written without the column) and, for interval logs,
+    ordered by SimulationTime. Per-row differences must then be taken per
+    IntersectionId (see throughput.previous_row).
+
+    Args:
+        columns: Columns to read; IntersectionId is always added
+        use_cache: Read through the typed Parquet cache next to each CSV
+        intersection: Only the rows of this IntersectionId
+        reader: Callable (path, columns, use_cache) -> DataFrame used instead
+            of read_log_file, e.g. to prefer a .tslog next to the CSV
+
+    Raises:
+        FileNotFoundError: When no file of the log exists
+    """
+    paths = log_paths(data_dir, file_name, intersection)
+    if not paths:
+        raise FileNotFoundError(f"No {file_name} in {data_dir} or its intersection_<id>/ directories")
+    reader = reader or read_log_file
+    if columns is not None and 'IntersectionId' not in columns:
+        columns = ['IntersectionId'] + list(columns)
+
+    frames = []
+    for directory_id, path in paths:
+        df = reader(path, columns, use_cache)
+        if 'IntersectionId' not in df.columns and directory_id is not None:
+            df['IntersectionId'] = np.int32(directory_id)
+        if intersection is not None and 'IntersectionId' in df.columns:
+            df = df[df['IntersectionId'] == intersection]
+        frames.append(df)
+    if len(frames) == 1:
+        return frames[0]
+    df = pd.concat(frames, ignore_index=True)
+    if 'SimulationTime' in df.columns:
+        df = df.sort_values('SimulationTime', kind='stable', ignore_index=True)
+    return df
@@ -0,0 +1,115 @@
+from collections import Counter, OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+# Memoized node values kept before the least recently used one is evicted
+DEFAULT_MAX_ENTRIES = 512
+# Rows hashed per DataFrame fingerprint, evenly spaced over the frame
+FINGERPRINT_ROWS = 256
+
+
+def fingerprint(value):
+    """
+    Cheap identity of an input's contents
+
+    DataFrames hash their shape, columns, dtypes and an evenly spaced sample
+    of FINGERPRINT_ROWS rows, so re-reading an unchanged log keeps the cached
+    metrics while appended or rewritten rows invalidate them. Other inputs
+    (StreamSummary, CatalogTable) are fingerprinted by identity and length.
+    """
+    if isinstance(value, pd.DataFrame):
+        rows = np.unique(np.linspace(0, len(value) - 1, min(len(value), FINGERPRINT_ROWS)).astype(np.int64))
+        sample = pd.util.hash_pandas_object(value.iloc[rows], index=False).to_numpy()
+        return ('DataFrame', value.shape, tuple(value.columns), tuple(map(str, value.dtypes)),
+                int(np.bitwise_xor.reduce(sample)) if len(sample) else 0)
+    if value is None:
+        return None
+    try:
+        length = len(value)
+    except TypeError:
+        length = None
+    return (type(value).__name__, id(value), length)
+
+
+class MetricsGraph:
+    """
+    Lazily computed, memoized metrics over a set of named inputs
+
+    Every node is a function node(graph, *args) that reads inputs with
+    graph.input(name) and other nodes with graph.get(name, *args). The
+    inputs each value depended on (directly or through other nodes) are
+    recorded with their fingerprints; a cached value is reused only while
+    all of them still match, so each reduction runs once per distinct input
+    data. At most max_entries values are kept, least recently used first out.
+
+    Args:
+        nodes: Dict of node name -> function
+        resolve: Function returning the current value of a named input
+        max_entries: Cache size
+    """
+
+    def __init__(self, nodes, resolve, max_entries=DEFAULT_MAX_ENTRIES):
+        self.nodes = dict(nodes)
+        self.resolve = resolve
+        self.max_entries = max_entries
+        self.counts = Counter()
+        self._cache = OrderedDict()
+        # input name -> (value it was fingerprinted for, fingerprint)
+        self._inputs = {}
+        self._reading = []
+
+    def _fingerprint(self, name):
+        value = self.resolve(name)
+        seen = self._inputs.get(name)
+        # The same object is not hashed again; the reference keeps its id from being reused
+        if seen is None or seen[0] is not value:
+            seen = (value, fingerprint(value))
+            self._inputs[name] = seen
+        return seen[1]
+
+    def input(self, name):
+        """Current value of an input, recorded as a dependency of the node being computed"""
+        if self._reading:
+            self._reading[-1][name] = self._fingerprint(name)
+        return self.resolve(name)
+
+    def get(self, name, *args):
+        """Value of node name for args, computed on first use"""
+        key = (name,) + args
+        entry = self._cache.get(key)
+        if entry is not None and all(self._fingerprint(i) == fp for i, fp in entry[1].items()):
+            self._cache.move_to_end(key)
+            self.counts['hits'] += 1
+            value, depends = entry
+        else:
+            if name not in self.nodes:
+                raise KeyError(f"Unknown metric node '{name}'")
+            self._reading.append({})
+            try:
+                value = self.nodes[name](self, *args)
+            finally:
+                depends = self._reading.pop()
+            self.counts['misses'] += 1
+            self._cache[key] = (value, depends)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+                self.counts['evictions'] += 1
+        if self._reading:
+            self._reading[-1].update(depends)
+        return value
+
+    def invalidate(self, input_name=None):
+        """Drop cached values that depend on input_name (all values when None)"""
+        if input_name is None:
+            self._cache.clear()
+            self._inputs.clear()
+            return
+        self._inputs.pop(input_name, None)
+        for key in [k for k, (_, depends) in self._cache.items() if input_name in depends]:
+            del self._cache[key]
+
+    def __len__(self):
+        return len(self._cache)
@@ -0,0 +1,302 @@
+import argparse
+import json
+import re
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from csv_cache import read_csv_cached
+
+
+DEFAULT_LOG = '../Assets/results/TrafficRun02/run_logs/Player-0.log'
+TIMERS_FILE = 'timers.json'
+
+# Optional wall-clock prefix (Unity -timestamps style, or any ISO time) and thread id
+TIMESTAMP = re.compile(r'^\[?(\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:\.\d+)?)Z?\]?\s*(?:\|[^|]*\|)?\s*')
+# Debug.Log lines of the agent and CsvLogger/BinaryLogger, and Unity's own
+# warning/error prefixes. Lines are dispatched on a cheap prefix test first;
+# only candidates are matched against the regex. Segments need the
+# controllers' "Interval data logged" line (logged with verboseLogging on),
+# which also carries Time.realtimeSinceStartup since Player.log lines have no
+# timestamps; saves carry their own duration. Decisions are the reward
+# calculation's "Throughput:" line (older builds: "Reward function reward").
+PATTERNS = {
+    'interval': ('Interval data logged', re.compile(r'at simulation time: ([-\d.]+)s(?: \(wall ([\d.]+)s\))?')),
+    'decision': (('Throughput:', 'Reward function reward'), re.compile(r'(?:Throughput|reward): (\S+)')),
+    'csv_save': ('CSV saved to', re.compile(r'([^\\/]+?)(?: in ([\d.]+) ms)?\s*$')),
+    'binary_save': ('Binary log flushed to', re.compile(r'([^\\/]+?)(?: in ([\d.]+) ms)?\s*$')),
+    'frames': ('Peak usage frame count', re.compile(r'(\d+) frames')),
+}
+WARNING_PREFIXES = ('WARNING', 'Warning')
+ERROR_PREFIXES = ('ERROR', 'Error')
+EXCEPTION = re.compile(r'^([\w.]*Exception)\b')
+SEGMENT_COLUMNS = ['SimStart', 'SimEnd', 'Lines', 'Decisions', 'Warnings', 'Errors', 'Exceptions',
+                   'CsvSaves', 'CsvSaveSeconds', 'WallStart', 'WallEnd']
+
+
+def _parse_time(text):
+    try:
+        return datetime.fromisoformat(text.replace(' ', 'T')).timestamp()
+    except ValueError:
+        return None
+
+
+def iter_events(lines):
+    """
+    Classify Player.log lines one at a time
+
+    Args:
+        lines: Iterable of lines, e.g. an open file (read lazily)
+
+    Yields:
+        (kind, value, wall_time) for every line; kind is one of PATTERNS,
+        'warning', 'error', 'exception' or 'other', and wall_time is the
+        line's timestamp in seconds when the log has them, or the wall time
+        an interval line reports (else None). Saves yield (file name, seconds
+        the write took or NaN for older builds).
+    """
+    for line in lines:
+        wall = None
+        if line[:1].isdigit() or line[:1] == '[':
+            stamp = TIMESTAMP.match(line)
+            if stamp:
+                wall = _parse_time(stamp.group(1))
+                line = line[stamp.end():]
+        line = line.strip()
+
+        for kind, (prefix, pattern) in PATTERNS.items():
+            if line.startswith(prefix):
+                if kind == 'frames':
+                    yield kind, sum(int(n) for n in pattern.findall(line)), wall
+                    break
+                match = pattern.search(line)
+                if kind in ('csv_save', 'binary_save'):
+                    name, ms = match.groups() if match else ('', None)
+                    value = (name, float(ms) / 1000 if ms else np.nan)
+                else:
+                    try:
+                        value = float(match.group(1))
+                    except (AttributeError, ValueError):
+                        value = np.nan
+                    if kind == 'interval' and wall is None and match and match.group(2):
+                        wall = float(match.group(2))
+                yield kind, value, wall
+                break
+        else:
+            if line.startswith(WARNING_PREFIXES):
+                yield 'warning', line, wall
+            elif line.startswith(ERROR_PREFIXES):
+                yield 'error', line, wall
+            else:
+                exception = EXCEPTION.match(line)
+                if exception:
+                    yield 'exception', exception.group(1), wall
+                else:
+                    yield 'other', None, wall
+
+
+class LogSummary:
+    """Whole-run counters filled in while segments stream past"""
+
+    def __init__(self):
+        self.lines = 0
+        self.frames = 0
+        self.agents = 0
+        self.final_sim_time = np.nan
+        self.first_wall = None
+        self.last_wall = None
+        self.exceptions = Counter()
+        self.saves = Counter()
+        self.warnings = 0
+        self.errors = 0
+
+    def to_dict(self):
+        return {
+            'Lines': self.lines, 'Frames': self.frames, 'Agents': self.agents,
+            'FinalSimulationTime': self.final_sim_time, 'Warnings': self.warnings, 'Errors': self.errors,
+            'Exceptions': dict(self.exceptions), 'Saves': dict(self.saves),
+            'LogWallSeconds': (self.last_wall - self.first_wall) if self.first_wall is not None else None,
+        }
+
+
+def _new_segment(sim_start=np.nan):
+    segment = dict.fromkeys(SEGMENT_COLUMNS, 0)
+    segment.update(SimStart=sim_start, SimEnd=np.nan, CsvSaveSeconds=np.nan, WallStart=np.nan, WallEnd=np.nan)
+    return segment
+
+
+def iter_segments(path, summary=None):
+    """
+    Stream a Player.log as one record per simulation-time segment
+
+    A segment runs from one 'Interval data logged' time to the next. Every
+    agent logs each interval, so a new segment starts at the first line of a
+    new time. Lines before the first interval form a startup segment with
+    SimStart NaN. Only the open segment is held in memory.
+
+    Args:
+        path: Player.log path
+        summary: Optional LogSummary updated with whole-run counters
+
+    Yields:
+        Dicts with the SEGMENT_COLUMNS keys
+    """
+    summary = summary if summary is not None else LogSummary()
+    segment = _new_segment()
+    agents_at_time = 0
+    previous_wall = None
+
+    with open(path, encoding='utf-8', errors='replace') as f:
+        for kind, value, wall in iter_events(f):
+            summary.lines += 1
+            if kind == 'interval' and not value == segment['SimStart']:
+                segment['SimEnd'] = value
+                if segment['Lines']:
+                    yield segment
+                summary.agents = max(summary.agents, agents_at_time)
+                segment = _new_segment(value)
+                summary.final_sim_time = value
+                agents_at_time = 0
+
+            segment['Lines'] += 1
+            if wall is not None:
+                if summary.first_wall is None:
+                    summary.first_wall = wall
+                summary.last_wall = wall
+                if np.isnan(segment['WallStart']):
+                    segment['WallStart'] = wall
+                segment['WallEnd'] = wall
+
+            if kind == 'interval':
+                agents_at_time += 1
+            elif kind == 'decision':
+                segment['Decisions'] += 1
+            elif kind in ('csv_save', 'binary_save'):
+                name, seconds = value
+                segment['CsvSaves'] += 1
+                summary.saves[name] += 1
+                # Older builds do not time the write; it is logged after File.WriteAllText returns
+                if np.isnan(seconds) and wall is not None and previous_wall is not None:
+                    seconds = wall - previous_wall
+                if not np.isnan(seconds):
+                    saved = 0.0 if np.isnan(segment['CsvSaveSeconds']) else segment['CsvSaveSeconds']
+                    segment['CsvSaveSeconds'] = saved + seconds
+            elif kind == 'warning':
+                segment['Warnings'] += 1
+                summary.warnings += 1
+            elif kind == 'error':
+                segment['Errors'] += 1
+                summary.errors += 1
+            elif kind == 'exception':
+                segment['Exceptions'] += 1
+                summary.exceptions[value] += 1
+            elif kind == 'frames':
+                summary.frames = max(summary.frames, value)
+            if wall is not None:
+                previous_wall = wall
+
+    summary.agents = max(summary.agents, agents_at_time)
+    yield segment
+
+
+def parse_player_log(path):
+    """
+    Segment table and run summary of one Player.log
+
+    Returns:
+        (segments DataFrame, summary dict)
+    """
+    summary = LogSummary()
+    segments = pd.DataFrame(list(iter_segments(path, summary)), columns=SEGMENT_COLUMNS)
+    segments['SimSeconds'] = segments['SimEnd'] - segments['SimStart']
+    # Up to the next segment's first line; the last segment ends at its last line
+    segments['WallSeconds'] = segments['WallStart'].shift(-1).fillna(segments['WallEnd']) - segments['WallStart']
+    return segments, summary.to_dict()
+
+
+def run_wall_seconds(log_path):
+    """Wall time of the training run from the timers.json next to the log, None if absent"""
+    timers = Path(log_path).with_name(TIMERS_FILE)
+    if not timers.exists():
+        return None
+    with open(timers) as f:
+        return json.load(f).get('total')
+
+
+def episode_log_stats(segments, intervals):
+    """
+    Join log segments to a run's interval data and aggregate per episode
+
+    Each segment takes the Episode of the last interval row at or before its
+    SimStart (merge_asof). Step rate is agent decisions per simulated second.
+
+    Args:
+        segments: Table from parse_player_log
+        intervals: Interval DataFrame with SimulationTime and Episode
+
+    Returns:
+        DataFrame indexed by Episode
+    """
+    timed = segments.dropna(subset=['SimStart']).sort_values('SimStart')
+    episodes = intervals[['SimulationTime', 'Episode']].dropna().sort_values('SimulationTime')
+    joined = pd.merge_asof(timed, episodes.astype({'SimulationTime': np.float64}),
+                           left_on='SimStart', right_on='SimulationTime', direction='backward')
+    joined['Episode'] = joined['Episode'].fillna(episodes['Episode'].iloc[0] if len(episodes) else 0).astype(np.int64)
+
+    table = joined.groupby('Episode').agg(
+        SimStart=('SimStart', 'min'), SimSeconds=('SimSeconds', 'sum'), Segments=('SimStart', 'size'),
+        Decisions=('Decisions', 'sum'), Warnings=('Warnings', 'sum'), Errors=('Errors', 'sum'),
+        Exceptions=('Exceptions', 'sum'), CsvSaves=('CsvSaves', 'sum'),
+        CsvSaveSeconds=('CsvSaveSeconds', lambda s: s.sum(min_count=1)),
+        WallSeconds=('WallSeconds', lambda s: s.sum(min_count=1)),
+    )
+    with np.errstate(divide='ignore', invalid='ignore'):
+        table['StepRate'] = table['Decisions'] / table['SimSeconds']
+        table['SimSpeed'] = table['SimSeconds'] / table['WallSeconds']
+    return table
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Step rate, CSV saves and warnings from a Unity Player.log')
+    parser.add_argument('--log', default=DEFAULT_LOG)
+    parser.add_argument('--intervals', default='interval_data.csv',
+                        help='Interval log of the same run, for the per-episode join')
+    parser.add_argument('--output', default='player_log_episodes.csv')
+    args = parser.parse_args()
+
+    segments, summary = parse_player_log(args.log)
+    wall = run_wall_seconds(args.log)
+    print(f"📊 {summary['Lines']} lines, {len(segments)} segments up to "
+          f"{summary['FinalSimulationTime']:.0f}s simulated, {summary['Agents']} agents")
+    if wall:
+        sim_time = summary['FinalSimulationTime']
+        print(f"  Wall time {wall:.0f}s (timers.json): {sim_time / wall:.2f} simulated s per wall s, "
+              f"{summary['Frames'] / wall:.1f} frames/s")
+    print(f"  Warnings: {summary['Warnings']}, errors: {summary['Errors']}, "
+          f"exceptions: {sum(summary['Exceptions'].values())}")
+    for name, count in sorted(summary['Exceptions'].items(), key=lambda item: -item[1]):
+        print(f"    {name}: {count}")
+    print(f"  Saves: {sum(summary['Saves'].values())} "
+          f"({', '.join(f'{name} x{n}' for name, n in summary['Saves'].items())})")
+    if np.isnan(summary['FinalSimulationTime']):
+        print("  ⚠️ No 'Interval data logged' lines: enable verboseLogging on the controllers "
+              "for per-episode segments")
+    if summary['LogWallSeconds'] is None:
+        print("  ⚠️ No wall-clock times in the log: WallSeconds is empty")
+
+    if Path(args.intervals).exists():
+        table = episode_log_stats(segments, read_csv_cached(args.intervals, ['SimulationTime', 'Episode']))
+        table.to_csv(args.output)
+        print(f"\nPer-episode step rate (decisions per simulated second):")
+        print(table['StepRate'].describe().to_string(float_format='%.3f'))
+        print(f"\n📊 Per-episode log statistics saved to {args.output}")
+    else:
+        segments.to_csv(args.output, index=False)
+        print(f"\n📊 {args.intervals} not found; per-segment statistics saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+import contextlib
+import cProfile
+import functools
+import io
+import json
+import os
+import platform
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows: RSS is not recorded
+    resource = None
+
+
+TIMING_REPORT = 'analysis_timing.json'
+PROFILE_STATS = 'analysis_profile.pstats'
+PROFILE_TEXT = 'analysis_profile.txt'
+SAMPLED_STACKS = 'analysis_profile.folded'
+# Profiling mode taken from the environment when none is passed in code
+PROFILE_ENV = 'TRAFFIC_ANALYSIS_PROFILE'
+MODES = ('timing', 'cprofile', 'sampling')
+SAMPLE_INTERVAL = 0.005
+# Seconds between RSS readings while a stage runs
+RSS_INTERVAL = 0.01
+TOP_FUNCTIONS = 25
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far, in MB (None where unavailable)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kilobytes elsewhere
+    return peak / 1024**2 if sys.platform == 'darwin' else peak / 1024
+
+
+def rss_mb():
+    """Current resident set size in MB, from /proc on Linux (None elsewhere)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024**2
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class _Sampler(threading.Thread):
+    """
+    Stack sampler for one thread, stdlib only
+
+    Every interval seconds the target thread's Python stack is recorded as a
+    'file:function' chain, prefixed with the profiler stage it was in.
+    """
+
+    def __init__(self, profiler, thread_id, interval=SAMPLE_INTERVAL):
+        super().__init__(daemon=True)
+        self.profiler = profiler
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.halt = threading.Event()
+
+    def run(self):
+        while not self.halt.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{Path(code.co_filename).name}:{code.co_name}')
+                frame = frame.f_back
+            self.stacks[';'.join(['/'.join(self.profiler.path) or 'idle'] + stack[::-1])] += 1
+
+    def stop(self):
+        self.halt.set()
+        self.join()
+
+
+class _RssMonitor(threading.Thread):
+    """
+    Samples rss_mb() while stages run and raises the peak of every open stage
+
+    getrusage's high-water mark only grows over the process lifetime, so it
+    cannot tell what a later, smaller stage used; this records the largest
+    RSS seen during each stage instead.
+    """
+
+    def __init__(self, interval=RSS_INTERVAL):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peaks = []
+        self.lock = threading.Lock()
+        self.halt = threading.Event()
+
+    def push(self):
+        with self.lock:
+            self.peaks.append(rss_mb())
+
+    def pop(self):
+        """Close the innermost stage and return its peak RSS in MB"""
+        current = rss_mb()
+        with self.lock:
+            peak = self.peaks.pop()
+        if peak is None or current is None:
+            return current if peak is None else peak
+        return max(peak, current)
+
+    def run(self):
+        while not self.halt.wait(self.interval):
+            current = rss_mb()
+            if current is None:
+                continue
+            with self.lock:
+                self.peaks = [p if p is not None and p >= current else current for p in self.peaks]
+
+    def stop(self):
+        self.halt.set()
+        self.join()
+
+
+class StageProfiler:
+    """
+    Wall time, CPU time and RSS per named stage, with optional cProfile or
+    sampling profiles
+
+    Stages nest: a stage opened inside another is recorded under
+    'outer/inner', and each stage's self time excludes its children. Repeated
+    stages accumulate calls. peak_rss_mb is the largest RSS sampled while the
+    stage ran (over all its calls), not the process high-water mark.
+
+    Args:
+        mode: None to record nothing, 'timing' for the stage table only, or
+            'cprofile'/'sampling' to also profile every function. The default
+            comes from the TRAFFIC_ANALYSIS_PROFILE environment variable.
+    """
+
+    def __init__(self, mode=None):
+        mode = mode if mode is not None else os.environ.get(PROFILE_ENV) or None
+        if mode is True:
+            mode = 'timing'
+        if mode not in (None,) + MODES:
+            raise ValueError(f"Profiling mode must be one of {MODES}")
+        self.mode = mode
+        self.path = []
+        self.stages = {}
+        self.started = datetime.now().isoformat(timespec='seconds')
+        self._profile = None
+        self._sampler = None
+        self._rss = None
+
+    @property
+    def enabled(self):
+        return self.mode is not None
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Context manager that records one run of the named stage"""
+        if not self.enabled:
+            yield
+            return
+        outermost = not self.path
+        self.path.append(name)
+        key = '/'.join(self.path)
+        if outermost:
+            self._start_profiling()
+        self._rss.push()
+        entry = self.stages.setdefault(key, {
+            'stage': key, 'parent': '/'.join(self.path[:-1]) or None, 'depth': len(self.path) - 1,
+            'calls': 0, 'wall_seconds': 0.0, 'cpu_seconds': 0.0, 'rss_start_mb': rss_mb(),
+            'rss_end_mb': None, 'peak_rss_mb': None,
+        })
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+            peak = self._rss.pop()
+            if outermost:
+                self._stop_profiling()
+            entry['calls'] += 1
+            entry['wall_seconds'] += wall
+            entry['cpu_seconds'] += cpu
+            entry['rss_end_mb'] = rss_mb()
+            if peak is not None:
+                entry['peak_rss_mb'] = max(peak, entry['peak_rss_mb'] or 0.0)
+            self.path.pop()
+
+    def _start_profiling(self):
+        self._rss = _RssMonitor()
+        self._rss.start()
+        if self.mode == 'cprofile':
+            self._profile = self._profile or cProfile.Profile()
+            self._profile.enable()
+        elif self.mode == 'sampling' and self._sampler is None:
+            self._sampler = _Sampler(self, threading.get_ident())
+            self._sampler.start()
+
+    def _stop_profiling(self):
+        self._rss.stop()
+        if self._profile is not None:
+            self._profile.disable()
+
+    def table(self):
+        """Stage entries in first-run order, with self time (wall minus children) added"""
+        rows = [dict(entry) for entry in self.stages.values()]
+        for row in rows:
+            children = sum(r['wall_seconds'] for r in rows if r['parent'] == row['stage'])
+            row['self_seconds'] = row['wall_seconds'] - children
+        return rows
+
+    def write_report(self, output_dir):
+        """
+        Write the timing report (and profiles, per mode) into output_dir
+
+        Returns:
+            Paths written
+        """
+        if not self.enabled:
+            return []
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        report = {
+            'started': self.started,
+            'written': datetime.now().isoformat(timespec='seconds'),
+            'mode': self.mode,
+            'python': platform.python_version(),
+            'machine': f'{platform.system()} {platform.machine()}, {os.cpu_count()} CPUs',
+            'argv': sys.argv,
+            'process_peak_rss_mb': peak_rss_mb(),
+            'stages': self.table(),
+        }
+        paths = [output_dir / TIMING_REPORT]
+        with open(paths[0], 'w') as f:
+            json.dump(report, f, indent=2)
+
+        if self._profile is not None:
+            self._profile.dump_stats(output_dir / PROFILE_STATS)
+            text = io.StringIO()
+            pstats.Stats(self._profile, stream=text).sort_stats('cumulative').print_stats(TOP_FUNCTIONS)
+            (output_dir / PROFILE_TEXT).write_text(text.getvalue())
+            paths += [output_dir / PROFILE_STATS, output_dir / PROFILE_TEXT]
+        if self._sampler is not None:
+            self._sampler.stop()
+            with open(output_dir / SAMPLED_STACKS, 'w') as f:
+                for stack, count in self._sampler.stacks.most_common():
+                    f.write(f'{stack} {count}\n')
+            self._sampler = None
+            paths.append(output_dir / SAMPLED_STACKS)
+        return paths
+
+    def print_summary(self):
+        """Stage table on stdout, slowest self time first"""
+        rows = sorted(self.table(), key=lambda r: r['self_seconds'], reverse=True)
+        print(f"\n⏱️ Stage timing ({self.mode}):")
+        print(f"  {'stage':<50} {'calls':>5} {'wall s':>8} {'self s':>8} {'cpu s':>8} {'peak MB':>8}")
+        for row in rows:
+            peak = f"{row['peak_rss_mb']:8.1f}" if row['peak_rss_mb'] is not None else f"{'-':>8}"
+            print(f"  {row['stage']:<50} {row['calls']:>5} {row['wall_seconds']:8.3f} "
+                  f"{row['self_seconds']:8.3f} {row['cpu_seconds']:8.3f} {peak}")
+
+
+def profiled(method):
+    """Record every call of a method as a stage of self.profiler"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.profiler.stage(method.__name__):
+            return method(self, *args, **kwargs)
+    return wrapper
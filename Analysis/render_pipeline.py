@@ -0,0 +1,227 @@
+import argparse
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+from pathlib import Path
+
+from binary_log import BINARY_SUFFIX
+from csv_cache import source_key
+from log_files import log_paths
+
+
+RENDER_STATE = '.render_state.json'
+
+EPISODE_FILES = ('episode_results.csv', 'static_episode_results.csv')
+INTERVAL_FILES = ('interval_data.csv', 'static_interval_data.csv')
+
+
+def input_keys(data_dir, file_name):
+    """
+    source_key of every file of a log that load_data reads: the CSV and the
+    .tslog next to it (which load_data prefers), in data_dir and in its
+    intersection_<id>/ directories
+
+    Raises:
+        FileNotFoundError: When none exists
+    """
+    data_dir = Path(data_dir)
+    keys = {}
+    for _, path in log_paths(data_dir, file_name):
+        for candidate in (path, path.with_suffix(BINARY_SUFFIX)):
+            if candidate.exists():
+                keys[candidate.relative_to(data_dir).as_posix()] = source_key(candidate)
+    if not keys:
+        raise FileNotFoundError(f"Neither {data_dir / file_name} nor its {BINARY_SUFFIX} log exists")
+    return keys
+
+
+# Analysis modules every figure runs: the comparison class, the plot
+# downsampler and load_data's readers
+PLOT_MODULES = ('analyze_stats.py', 'downsample.py')
+LOAD_MODULES = ('log_files.py', 'csv_cache.py', 'binary_log.py', 'streaming_stats.py')
+
+
+@lru_cache(maxsize=None)
+def code_version(modules):
+    """Hash of the given analysis sources, so changed plotting code re-renders the figures using it"""
+    digest = hashlib.sha1()
+    directory = Path(__file__).resolve().parent
+    for name in sorted(modules):
+        digest.update(name.encode())
+        digest.update((directory / name).read_bytes())
+    return digest.hexdigest()
+
+
+class FigureJob:
+    """
+    Declarative description of one figure rendered by TrafficSignalComparison
+
+    Args:
+        name: Job name used on the command line and in the render state
+        method: TrafficSignalComparison method that draws and saves the figure
+        outputs: Files the method writes
+        inputs: CSV files whose contents (or .tslog counterparts) the figure depends on
+        columns: Columns to load per file type ('episodes', 'rewards', 'intervals')
+        modules: Analysis modules the method uses beyond PLOT_MODULES and
+            LOAD_MODULES, whose changes re-render the figure
+    """
+
+    def __init__(self, name, method, outputs, inputs, columns=None, modules=()):
+        self.name = name
+        self.method = method
+        self.outputs = list(outputs)
+        self.inputs = list(inputs)
+        self.columns = columns or {}
+        self.modules = tuple(sorted(set(PLOT_MODULES + LOAD_MODULES + tuple(modules))))
+        # load_data file types of the inputs; the rewards log is never read
+        self.file_types = sorted({'episodes' if name in EPISODE_FILES else 'intervals' for name in self.inputs})
+
+    def fingerprint(self, data_dir, options):
+        """Hash of the job definition, render options, input file keys and analysis code"""
+        keys = {name: input_keys(data_dir, name) for name in self.inputs}
+        payload = json.dumps([self.method, self.outputs, self.columns, options, keys,
+                              code_version(self.modules)],
+                             sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode()).hexdigest()
+
+
+_INTERVAL_METRICS = ['SimulationTime', 'TotalVehicles', 'VehiclesWaiting', 'QueueLength']
+
+FIGURE_JOBS = [
+    FigureJob('episodes', 'compare_episode_performance',
+              ['episode_performance_comparison.png'], EPISODE_FILES, modules=['metrics_graph.py']),
+    FigureJob('intervals', 'compare_interval_data',
+              ['interval_data_comparison.png'], INTERVAL_FILES,
+              {'intervals': _INTERVAL_METRICS}),
+    FigureJob('waiting_half', 'create_vehicles_waiting_comparison_half',
+              ['vehicles_waiting_comparison_first_half.png'], INTERVAL_FILES,
+              {'intervals': ['SimulationTime', 'VehiclesWaiting']}, ['metrics_graph.py']),
+    FigureJob('queue_half', 'create_queue_length_comparison_half',
+              ['queue_length_comparison_first_half.png'], INTERVAL_FILES,
+              {'intervals': ['SimulationTime', 'QueueLength']}, ['metrics_graph.py']),
+    FigureJob('full_queue', 'plot_full_queue_length',
+              ['full_queue_length_comparison.png'], INTERVAL_FILES,
+              {'intervals': ['SimulationTime', 'QueueLength']}),
+    FigureJob('full_queue_separate', 'plot_both_full_queue',
+              ['full_queue_length_ppo.png', 'full_queue_length_static.png'], INTERVAL_FILES,
+              {'intervals': ['SimulationTime', 'QueueLength']}),
+    FigureJob('dashboard', 'create_dashboard',
+              ['traffic_signal_dashboard.png'], EPISODE_FILES + INTERVAL_FILES,
+              {'intervals': _INTERVAL_METRICS}, ['metrics_graph.py']),
+]
+
+
+def _init_worker():
+    # Headless: never open windows, and make plt.show() a no-op
+    import matplotlib
+    matplotlib.use('Agg', force=True)
+
+
+def _render(job, data_dir, output_dir, options):
+    """Worker entry point: load only what the job needs and draw one figure"""
+    from analyze_stats import TrafficSignalComparison
+
+    comparer = TrafficSignalComparison(data_dir, output_dir=output_dir, show=False, **options)
+    comparer.load_data(columns=job.columns, file_types=job.file_types)
+    getattr(comparer, job.method)()
+    return job.name
+
+
+def _load_state(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def render_all(data_dir="./", output_dir=None, jobs=None, workers=None, force=False, **options):
+    """
+    Render figures concurrently on a process pool with the Agg backend
+
+    Figures whose fingerprint matches the last render and whose outputs still
+    exist are skipped.
+
+    Args:
+        data_dir: Directory containing the CSV files
+        output_dir: Directory for the PNGs (defaults to data_dir)
+        jobs: Job names to render (defaults to all FIGURE_JOBS)
+        workers: Worker processes (defaults to all cores)
+        force: Re-render even when nothing changed
+        **options: Extra TrafficSignalComparison options, e.g. streaming=True
+
+    Returns:
+        Dict of job name to 'rendered', 'skipped' or 'failed'
+    """
+    data_dir = Path(data_dir)
+    output_dir = Path(output_dir) if output_dir is not None else data_dir
+    output_dir.mkdir(parents=True, exist_ok=True)
+    selected = [job for job in FIGURE_JOBS if jobs is None or job.name in jobs]
+
+    state_path = output_dir / RENDER_STATE
+    state = _load_state(state_path)
+    status = {}
+    pending = {}
+    for job in selected:
+        try:
+            fingerprint = job.fingerprint(data_dir, options)
+        except FileNotFoundError as e:
+            print(f"❌ {job.name}: {e}")
+            status[job.name] = 'failed'
+            continue
+        outputs_exist = all((output_dir / name).exists() for name in job.outputs)
+        if not force and outputs_exist and state.get(job.name) == fingerprint:
+            status[job.name] = 'skipped'
+        else:
+            pending[job.name] = (job, fingerprint)
+
+    if pending:
+        os.environ['MPLBACKEND'] = 'Agg'
+        workers = min(workers or os.cpu_count() or 1, len(pending))
+        print(f"🎨 Rendering {len(pending)} figures on {workers} worker processes...")
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            futures = {pool.submit(_render, job, data_dir, output_dir, options): name
+                       for name, (job, _) in pending.items()}
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    future.result()
+                except Exception as e:  # keep the other figures going
+                    print(f"❌ {name} failed: {e}")
+                    status[name] = 'failed'
+                    state.pop(name, None)
+                    continue
+                status[name] = 'rendered'
+                state[name] = pending[name][1]
+
+        with open(state_path, 'w') as f:
+            json.dump(state, f, indent=2)
+
+    counts = {outcome: sum(1 for s in status.values() if s == outcome)
+              for outcome in ('rendered', 'skipped', 'failed')}
+    print(f"✅ Rendered {counts['rendered']} figures, skipped {counts['skipped']} unchanged, "
+          f"{counts['failed']} failed")
+    return status
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Render all comparison figures in parallel, headless')
+    parser.add_argument('--data-dir', default='./')
+    parser.add_argument('--output-dir', default=None)
+    parser.add_argument('--jobs', nargs='*', choices=[job.name for job in FIGURE_JOBS],
+                        help='Figures to render (default: all)')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--force', action='store_true', help='Re-render unchanged figures')
+    parser.add_argument('--streaming', action='store_true')
+    parser.add_argument('--intersection', type=int, default=None,
+                        help='Only this IntersectionId (default: pool every intersection_<id>/ log)')
+    args = parser.parse_args()
+
+    render_all(args.data_dir, args.output_dir, args.jobs, args.workers, args.force,
+               streaming=args.streaming, intersection=args.intersection)
+
+
+if __name__ == "__main__":
+    main()
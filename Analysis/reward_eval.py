@@ -0,0 +1,274 @@
+import argparse
+import json
+
+import numpy as np
+import pandas as pd
+
+from log_files import read_log
+from throughput import interval_departures, previous_row
+
+
+# Per-row quantities a candidate reward can weight
+FEATURES = ['ArrivalRate', 'DepartureRate', 'QueueLength', 'VehiclesWaiting', 'AverageWaitTime',
+            'Throughput', 'WaitRate', 'QueuedWait']
+# MLSignalTimingOptimizationSO.REWARD_MULTIPLYER
+REWARD_MULTIPLIER = 500
+# Linear candidates: reward = sum(weight * feature). 'current' approximates the
+# reward in MLSignalTimingOptimizationSO.CalculateRewards: its "throughput" is
+# the change in TotalNumberOfVehicles per second (ArrivalRate here), and the
+# per-vehicle waits it subtracts are not logged, so WaitRate stands in.
+DEFAULT_CANDIDATES = {
+    'current': {'ArrivalRate': REWARD_MULTIPLIER, 'WaitRate': -1.0},
+    'arrivals_only': {'ArrivalRate': REWARD_MULTIPLIER},
+    'departures_only': {'DepartureRate': 60.0},
+    'queue_penalty': {'QueueLength': -1.0},
+    'wait_penalty': {'WaitRate': -1.0},
+    'departures_minus_queue': {'DepartureRate': 60.0, 'QueueLength': -1.0},
+    'balanced': {'DepartureRate': 100.0, 'QueueLength': -1.0, 'WaitRate': -0.1},
+}
+# Target KPIs per row, oriented so that higher is better. NegAverageWaitTime
+# is dropped when a log has no (non-zero) AverageWaitTime.
+KPIS = {
+    'VehiclesPerMinute': ('DepartureRate', 60.0),
+    'NegQueueLength': ('QueueLength', -1.0),
+    'NegAverageWaitTime': ('AverageWaitTime', -1.0),
+}
+# Features that restate another one: WaitRate is the trapezoid of QueueLength
+# and reward_features fills QueueLength and VehiclesWaiting from each other
+FEATURE_SOURCES = {'WaitRate': 'QueueLength', 'VehiclesWaiting': 'QueueLength'}
+LOG_FILES = {
+    'intervals': {'ml': 'interval_data.csv', 'static': 'static_interval_data.csv'},
+    'episodes': {'ml': 'episode_results.csv', 'static': 'static_episode_results.csv'},
+}
+DEFAULT_BUCKET = 60.0
+
+
+def reward_features(df):
+    """
+    FEATURES for every row of an interval or episode log
+
+    Episode logs have no SimulationTime; episode end times are the running
+    sum of EpisodeDuration. Every feature is a level or a per-second rate,
+    never a total over the row, so controllers whose rows or episodes last
+    differently (ML episodes ~30 s, static ~100 s) stay comparable:
+      - ArrivalRate, DepartureRate: vehicles per second since the previous row
+      - WaitRate: vehicle-seconds of waiting accrued per second, i.e. the
+        row's mean queue (trapezoid of the previous and current QueueLength)
+      - QueuedWait: QueueLength * AverageWaitTime, the wait held by the queue;
+        NaN unless AverageWaitTime was logged (non-zero)
+    Features a log lacks are NaN. The logged CurrentReward, when present, is
+    carried along in time order as LoggedReward. Logs pooled over several
+    intersections are differenced per IntersectionId.
+
+    Returns:
+        DataFrame with the FEATURES columns plus SimulationTime, float64
+    """
+    df = df.copy()
+    if 'SimulationTime' not in df.columns:
+        duration = df['EpisodeDuration'].fillna(0)
+        df['SimulationTime'] = (duration.groupby(df['IntersectionId']).cumsum()
+                                if 'IntersectionId' in df.columns else duration.cumsum())
+    for a, b in (('QueueLength', 'VehiclesWaiting'), ('VehiclesWaiting', 'QueueLength')):
+        if a not in df.columns and b in df.columns:
+            df[a] = df[b]
+    df = df.sort_values('SimulationTime', kind='stable')
+
+    departed, elapsed = interval_departures(df)
+    total = df['TotalVehicles'].to_numpy(dtype=np.float64)
+    arrived = total - previous_row(df, total)
+    arrived = np.where(np.isnan(arrived), 0.0, np.where(arrived < 0, total, arrived))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        arrival_rate = np.where(elapsed > 0, arrived / elapsed, np.nan)
+        departure_rate = np.where(elapsed > 0, departed / elapsed, np.nan)
+
+    queue = df['QueueLength'].to_numpy(dtype=np.float64)
+    features = pd.DataFrame({'SimulationTime': df['SimulationTime'].to_numpy(dtype=np.float64),
+                             'ArrivalRate': arrival_rate, 'DepartureRate': departure_rate,
+                             'QueueLength': queue,
+                             'VehiclesWaiting': df['VehiclesWaiting'].to_numpy(dtype=np.float64)})
+    for column in ('AverageWaitTime', 'Throughput'):
+        features[column] = df[column].to_numpy(dtype=np.float64) if column in df.columns else np.nan
+    previous = previous_row(df, queue)
+    previous = np.where(np.isnan(previous), queue, previous)
+    features['WaitRate'] = np.where(elapsed > 0, (previous + queue) / 2, queue)
+    wait = features['AverageWaitTime'].to_numpy()
+    features['QueuedWait'] = queue * wait if np.nan_to_num(wait).any() else np.nan
+    if 'CurrentReward' in df.columns:
+        features['LoggedReward'] = df['CurrentReward'].to_numpy(dtype=np.float64)
+    return features
+
+
+def evaluate_rewards(features, candidates=None):
+    """
+    Every candidate reward for every row, in one matrix product
+
+    Linear candidates ({feature: weight}) form a (features x candidates)
+    weight matrix that the feature matrix is multiplied with once. Callable
+    candidates (features DataFrame -> values) are evaluated after it. A
+    linear candidate is NaN on rows where a feature it weights is NaN.
+
+    Returns:
+        DataFrame (rows x candidates)
+    """
+    candidates = candidates or DEFAULT_CANDIDATES
+    linear = {name: c for name, c in candidates.items() if not callable(c)}
+    unknown = {f for c in linear.values() for f in c} - set(FEATURES)
+    if unknown:
+        raise ValueError(f"Unknown reward features {sorted(unknown)}; use {FEATURES}")
+
+    values = features[FEATURES].to_numpy(dtype=np.float64)
+    missing = np.isnan(values)
+    weights = np.array([[c.get(f, 0.0) for c in linear.values()] for f in FEATURES], dtype=np.float64)
+    # A NaN feature only voids the candidates that weight it, so e.g. the ML
+    # log's missing Throughput leaves the other candidates defined
+    rewards = np.where(missing, 0.0, values) @ weights
+    rewards[(missing.astype(np.float64) @ (weights != 0)) > 0] = np.nan
+
+    table = pd.DataFrame(rewards, columns=list(linear), index=features.index)
+    for name, candidate in candidates.items():
+        if callable(candidate):
+            table[name] = np.asarray(candidate(features), dtype=np.float64)
+    return table[list(candidates)]
+
+
+def _kpis(features):
+    """KPI columns for the KPIs every controller logged"""
+    kpis = {}
+    for name, (column, sign) in KPIS.items():
+        logged = features[column].fillna(0).ne(0).groupby(features['Controller']).any()
+        if logged.all():
+            kpis[name] = features[column] * sign
+    return pd.DataFrame(kpis, index=features.index)
+
+
+def kpi_proxy(candidate, kpis=KPIS):
+    """
+    The KPI a linear candidate merely rescales, or '' if it has none
+
+    A candidate weighting only a KPI's feature (or a feature restating it,
+    see FEATURE_SOURCES) agrees with that KPI by construction, so it says
+    nothing about how the reward tracks the targets.
+    """
+    if callable(candidate):
+        return ''
+    sources = {FEATURE_SOURCES.get(f, f) for f, weight in candidate.items() if weight}
+    for name, (column, _) in kpis.items():
+        if sources == {column}:
+            return name
+    return ''
+
+
+def load_logs(data_dir, level='intervals', intersection=None):
+    """
+    Reward features of the ML and static logs, stacked with a Controller column
+
+    Logs of every intersection_<id>/ directory are pooled, or only those of
+    `intersection`.
+    """
+    frames = []
+    for controller, file_name in LOG_FILES[level].items():
+        df = read_log(data_dir, file_name, intersection=intersection)
+        features = reward_features(df)
+        features['Controller'] = controller
+        frames.append(features)
+    return pd.concat(frames, ignore_index=True)
+
+
+def screen_candidates(features, candidates=None, bucket=DEFAULT_BUCKET):
+    """
+    How each candidate ranks ML against static, and how it tracks the KPIs
+
+    Per candidate: mean reward per controller, the difference and Cohen's d
+    (pooled std), which controller it prefers, and whether that matches
+    the controller the KPIs prefer by majority. Correlations are Spearman
+    rank correlations over `bucket`-second windows of both controllers,
+    which smooths the per-row noise of rates. CorrLoggedReward is the
+    Pearson correlation with the reward the ML agent logged (when present).
+    Candidates that only rescale a KPI (KPIProxy, see kpi_proxy) are ranked
+    after every other candidate.
+
+    Args:
+        features: Output of load_logs
+        candidates: Dict of name -> {feature: weight} or callable
+
+    Returns:
+        DataFrame indexed by candidate, best KPI agreement first
+    """
+    candidates = candidates or DEFAULT_CANDIDATES
+    rewards = evaluate_rewards(features, candidates)
+    kpis = _kpis(features)
+    names = list(rewards.columns)
+    controller = features['Controller']
+
+    means = rewards.groupby(controller).mean()
+    stds = rewards.groupby(controller).std()
+    table = pd.DataFrame({'ML_Mean': means.loc['ml'], 'Static_Mean': means.loc['static']})
+    table['Difference'] = table['ML_Mean'] - table['Static_Mean']
+    pooled = np.sqrt((stds.loc['ml'] ** 2 + stds.loc['static'] ** 2) / 2)
+    table['Cohens_d'] = table['Difference'] / pooled.replace(0, np.nan)
+    table['Prefers'] = np.where(table['Difference'] > 0, 'ML', np.where(table['Difference'] < 0, 'Static', 'Tie'))
+    table.loc[table['Difference'].isna(), 'Prefers'] = 'n/a'
+
+    kpi_means = kpis.groupby(controller).mean()
+    votes = np.sign(kpi_means.loc['ml'] - kpi_means.loc['static']).sum()
+    kpi_choice = 'ML' if votes > 0 else 'Static' if votes < 0 else 'Tie'
+    table['KPIsPrefer'] = kpi_choice
+    table['AgreesWithKPIs'] = table['Prefers'] == kpi_choice
+
+    windows = pd.concat([rewards, kpis], axis=1).groupby(
+        [controller, features['SimulationTime'] // bucket]).mean()
+    ranked = windows.rank()
+    correlation = ranked.corr().loc[names, list(kpis)]
+    for kpi in kpis:
+        table[f'Spearman_{kpi}'] = correlation[kpi]
+    table['MeanKPISpearman'] = correlation.mean(axis=1)
+    table['KPIProxy'] = [kpi_proxy(candidates[name], {k: KPIS[k] for k in kpis}) for name in names]
+
+    if 'LoggedReward' in features.columns:
+        ml = controller == 'ml'
+        logged = features.loc[ml, 'LoggedReward']
+        table['CorrLoggedReward'] = rewards[ml].corrwith(logged)
+    table.index.name = 'Candidate'
+    independent = table['KPIProxy'] == ''
+    return (table.assign(Independent=independent)
+            .sort_values(['Independent', 'AgreesWithKPIs', 'MeanKPISpearman'], ascending=False)
+            .drop(columns='Independent'))
+
+
+def load_candidates(path):
+    """Candidates from a JSON file of {name: {feature: weight}}"""
+    with open(path) as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Screen candidate reward shapings on logged ML and static data')
+    parser.add_argument('--data-dir', default='./', help='Directory holding the ML and static CSVs')
+    parser.add_argument('--level', choices=sorted(LOG_FILES), default='intervals')
+    parser.add_argument('--candidates', help='JSON file of {name: {feature: weight}} (default: built-in set)')
+    parser.add_argument('--bucket', type=float, default=DEFAULT_BUCKET, help='Seconds per correlation window')
+    parser.add_argument('--output', default='reward_candidates.csv')
+    parser.add_argument('--intersection', type=int, default=None,
+                        help='Only this IntersectionId (default: pool every intersection_<id>/ log)')
+    args = parser.parse_args()
+
+    candidates = load_candidates(args.candidates) if args.candidates else DEFAULT_CANDIDATES
+    features = load_logs(args.data_dir, args.level, args.intersection)
+    table = screen_candidates(features, candidates, args.bucket)
+    table.to_csv(args.output)
+
+    print(f"\nCandidate rewards over {len(features)} {args.level} rows "
+          f"(KPIs prefer {table['KPIsPrefer'].iloc[0]}):")
+    print(table.drop(columns='KPIsPrefer').to_string(float_format='%.3f'))
+    unavailable = table.index[table['ML_Mean'].isna() | table['Static_Mean'].isna()]
+    for name in unavailable:
+        print(f"⚠️ {name}: uses a feature missing from one of the logs")
+    for name, kpi in table.loc[table['KPIProxy'] != '', 'KPIProxy'].items():
+        print(f"⚠️ {name}: only rescales the {kpi} KPI, ranked last")
+    if 'Spearman_NegAverageWaitTime' not in table.columns:
+        print("⚠️ AverageWaitTime is not logged by both controllers: no wait-time KPI")
+    print(f"\n📊 Candidate screening saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
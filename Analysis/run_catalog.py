@@ -0,0 +1,345 @@
+import argparse
+import hashlib
+import json
+import sqlite3
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from csv_cache import COLUMN_DTYPES, source_key
+from log_files import log_paths, read_log
+from streaming_stats import MAX_TIME_BUCKETS
+
+
+DEFAULT_CATALOG = 'runs.sqlite'
+CONTROLLERS = {'ml': '', 'static': 'static_'}
+# File type -> (CSV name written by the ML controller, index columns after run_id)
+TABLES = {
+    'episodes': ('episode_results.csv', ['Episode']),
+    'rewards': ('reward_progress.csv', ['Episode', 'Step']),
+    'intervals': ('interval_data.csv', ['Episode', 'SimulationTime']),
+}
+INSERT_CHUNKSIZE = 50_000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY,
+    name TEXT UNIQUE NOT NULL,
+    controller TEXT NOT NULL,
+    data_dir TEXT,
+    config_hash TEXT,
+    scene TEXT,
+    registered_at REAL,
+    first_time REAL,
+    last_time REAL,
+    source_keys TEXT
+)
+"""
+
+
+def _sql_type(dtype):
+    return 'INTEGER' if dtype.startswith('int') else 'REAL'
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def file_hash(path):
+    """Short content hash of a file (e.g. the ML-Agents config YAML), '' if missing"""
+    path = Path(path) if path else None
+    if path is None or not path.exists():
+        return ''
+    return hashlib.sha1(path.read_bytes()).hexdigest()[:10]
+
+
+class CatalogTable:
+    """
+    Lazy view of one run's episodes, rewards or intervals
+
+    Nothing is read until a column, summary or series is asked for, and then
+    only that column (or its aggregate) leaves SQLite. Time windows narrow the
+    view without touching the data.
+    """
+
+    def __init__(self, catalog, table, run_id, start=None, end=None):
+        self.catalog = catalog
+        self.table = table
+        self.run_id = run_id
+        self.start = start
+        self.end = end
+        self._columns = None
+
+    def _where(self):
+        clauses, params = ['run_id = ?'], [self.run_id]
+        if self.start is not None:
+            clauses.append('SimulationTime >= ?')
+            params.append(self.start)
+        if self.end is not None:
+            clauses.append('SimulationTime < ?')
+            params.append(self.end)
+        return ' AND '.join(clauses), params
+
+    def _order(self):
+        return 'SimulationTime, rowid' if 'SimulationTime' in self.catalog.table_columns(self.table) else 'rowid'
+
+    @property
+    def columns(self):
+        """Columns this run actually logged (at least one non-null value)"""
+        if self._columns is None:
+            where, params = self._where()
+            candidates = [c for c in self.catalog.table_columns(self.table) if c != 'run_id']
+            present = ', '.join(f'MAX({_quote(c)} IS NOT NULL)' for c in candidates)
+            row = self.catalog.execute(f'SELECT {present} FROM {self.table} WHERE {where}', params).fetchone()
+            self._columns = pd.Index([c for c, has in zip(candidates, row) if has])
+        return self._columns
+
+    def __len__(self):
+        where, params = self._where()
+        return self.catalog.execute(f'SELECT COUNT(*) FROM {self.table} WHERE {where}', params).fetchone()[0]
+
+    def __getitem__(self, column):
+        """One column as a Series, in time order"""
+        where, params = self._where()
+        rows = self.catalog.execute(
+            f'SELECT {_quote(column)} FROM {self.table} WHERE {where} ORDER BY {self._order()}', params)
+        return pd.Series([r[0] for r in rows], name=column, dtype='float64')
+
+    def frame(self, columns=None):
+        """Materialise the selected columns (all logged columns by default)"""
+        columns = list(columns or self.columns)
+        where, params = self._where()
+        select = ', '.join(_quote(c) for c in columns)
+        return pd.read_sql_query(f'SELECT {select} FROM {self.table} WHERE {where} ORDER BY {self._order()}',
+                                 self.catalog.connection, params=params)
+
+    def window(self, start=None, end=None):
+        """View restricted to start <= SimulationTime < end"""
+        return CatalogTable(self.catalog, self.table, self.run_id, start, end)
+
+    def time_range(self):
+        where, params = self._where()
+        return self.catalog.execute(f'SELECT MIN(SimulationTime), MAX(SimulationTime) FROM {self.table} '
+                                    f'WHERE {where}', params).fetchone()
+
+    def first_half(self):
+        """View of the first half of the run's simulated time"""
+        first, last = self.time_range()
+        if first is None:
+            return self
+        return self.window(self.start, first + (last - first) / 2)
+
+    def summary(self, metric):
+        """mean/std/median/min/max of a column, aggregated inside SQLite"""
+        where, params = self._where()
+        col = _quote(metric)
+        where = f'{where} AND {col} IS NOT NULL'
+        n, mean, lo, hi = self.catalog.execute(
+            f'SELECT COUNT({col}), AVG({col}), MIN({col}), MAX({col}) '
+            f'FROM {self.table} WHERE {where}', params).fetchone()
+        if not n:
+            return dict.fromkeys(['mean', 'std', 'median', 'min', 'max'], np.nan)
+        # Second pass around the mean: AVG(x*x) - AVG(x)^2 cancels for large-mean
+        # columns such as SimulationTime
+        std = np.nan
+        if n > 1:
+            squares = self.catalog.execute(
+                f'SELECT SUM(({col} - ?) * ({col} - ?)) FROM {self.table} WHERE {where}',
+                [mean, mean] + params).fetchone()[0]
+            std = np.sqrt(squares / (n - 1))
+        middle = self.catalog.execute(
+            f'SELECT {col} FROM {self.table} WHERE {where} ORDER BY {col} LIMIT ? OFFSET ?',
+            params + [2 - n % 2, (n - 1) // 2]).fetchall()
+        return {'mean': mean, 'std': std, 'median': float(np.mean([r[0] for r in middle])),
+                'min': lo, 'max': hi}
+
+    def series(self, metric, max_buckets=MAX_TIME_BUCKETS):
+        """
+        (times, mean, min, max) of a metric over SimulationTime
+
+        Runs longer than max_buckets rows are averaged into equal-width time
+        buckets by a GROUP BY, so only max_buckets rows reach pandas.
+        """
+        where, params = self._where()
+        col = _quote(metric)
+        n = len(self)
+        if n <= max_buckets:
+            rows = self.catalog.execute(f'SELECT SimulationTime, {col}, {col}, {col} FROM {self.table} '
+                                        f'WHERE {where} ORDER BY {self._order()}', params).fetchall()
+        else:
+            first, last = self.time_range()
+            width = (last - first) / max_buckets or 1.0
+            rows = self.catalog.execute(
+                f'SELECT AVG(SimulationTime), AVG({col}), MIN({col}), MAX({col}) FROM {self.table} '
+                f'WHERE {where} GROUP BY CAST((SimulationTime - ?) / ? AS INTEGER) ORDER BY 1',
+                params + [first, width]).fetchall()
+        values = np.array(rows, dtype=np.float64).reshape(-1, 4)
+        return values[:, 0], values[:, 1], values[:, 2], values[:, 3]
+
+
+class RunCatalog:
+    """
+    Embedded SQLite catalog of simulation runs and their logged tables
+
+    Every run is registered once per controller ('<name>/ml', '<name>/static')
+    with its config hash, scene and time span; its episode, reward and
+    interval rows are bulk-loaded into shared tables indexed on
+    (run_id, Episode, SimulationTime).
+
+    Args:
+        path: SQLite file (created if missing)
+    """
+
+    def __init__(self, path=DEFAULT_CATALOG):
+        self.path = Path(path)
+        self.connection = sqlite3.connect(self.path)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.execute(_SCHEMA)
+        for table, (_, index) in TABLES.items():
+            columns = ', '.join(f'{_quote(c)} {_sql_type(COLUMN_DTYPES.get(c, "float32"))}'
+                                for c in dict.fromkeys(index + list(COLUMN_DTYPES)))
+            self.connection.execute(f'CREATE TABLE IF NOT EXISTS {table} (run_id INTEGER NOT NULL, {columns})')
+            index_columns = ', '.join(['run_id'] + [_quote(c) for c in index])
+            self.connection.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_run ON {table} ({index_columns})')
+        self.connection.execute('CREATE INDEX IF NOT EXISTS idx_intervals_time '
+                                'ON intervals (run_id, SimulationTime)')
+        self.connection.commit()
+        self._table_columns = {}
+
+    def execute(self, sql, params=()):
+        return self.connection.execute(sql, params)
+
+    def query(self, sql, params=()):
+        """Run arbitrary SQL and return a DataFrame"""
+        return pd.read_sql_query(sql, self.connection, params=params)
+
+    def table_columns(self, table):
+        if table not in self._table_columns:
+            self._table_columns[table] = [row[1] for row in self.execute(f'PRAGMA table_info({table})')]
+        return self._table_columns[table]
+
+    def runs(self):
+        return self.query('SELECT * FROM runs ORDER BY name')
+
+    def run_id(self, name):
+        row = self.execute('SELECT run_id FROM runs WHERE name = ?', (name,)).fetchone()
+        if row is None:
+            raise KeyError(f"Run '{name}' is not in {self.path}")
+        return row[0]
+
+    def table(self, file_type, run):
+        """Lazy CatalogTable for a run given by name or run_id"""
+        run_id = run if isinstance(run, int) else self.run_id(run)
+        return CatalogTable(self, file_type, run_id)
+
+    def _insert(self, table, run_id, df):
+        known = self.table_columns(table)
+        for col in df.columns:
+            if col not in known:
+                self.execute(f'ALTER TABLE {table} ADD COLUMN {_quote(col)} REAL')
+                self._table_columns.pop(table, None)
+                known = self.table_columns(table)
+        columns = ['run_id'] + list(df.columns)
+        sql = (f'INSERT INTO {table} ({", ".join(_quote(c) for c in columns)}) '
+               f'VALUES ({", ".join("?" * len(columns))})')
+        values = df.astype(object).where(df.notna(), None)
+        for start in range(0, len(values), INSERT_CHUNKSIZE):
+            chunk = values.iloc[start:start + INSERT_CHUNKSIZE]
+            self.connection.executemany(sql, ((run_id, *row) for row in chunk.itertuples(index=False)))
+
+    def register(self, data_dir, name=None, config=None, scene=None, force=False):
+        """
+        Register both controllers' logs in data_dir and bulk-load their tables
+
+        Runs whose CSVs are unchanged since the last registration are skipped.
+        The logs of every intersection_<id>/ directory are loaded into the same
+        run, keyed by their IntersectionId column.
+
+        Args:
+            data_dir: Directory with episode_results.csv etc. and their static_ twins
+            name: Run name (defaults to the directory name)
+            config: ML-Agents config YAML whose hash identifies the setup
+            scene: Unity scene the logs came from
+            force: Reload even when the CSVs are unchanged
+
+        Returns:
+            List of run names that were (re)loaded
+        """
+        data_dir = Path(data_dir)
+        name = name or data_dir.resolve().name
+        loaded = []
+        for controller, prefix in CONTROLLERS.items():
+            files = {t: f'{prefix}{csv}' for t, (csv, _) in TABLES.items()}
+            paths = {t: [p for _, p in log_paths(data_dir, f) if p.exists()] for t, f in files.items()}
+            paths = {t: p for t, p in paths.items() if p}
+            if not paths:
+                continue
+            run_name = f'{name}/{controller}'
+            keys = json.dumps({t: {p.relative_to(data_dir).as_posix(): source_key(p) for p in ps}
+                               for t, ps in paths.items()}, sort_keys=True)
+            existing = self.execute('SELECT run_id, source_keys FROM runs WHERE name = ?', (run_name,)).fetchone()
+            if existing and existing[1] == keys and not force:
+                print(f"✅ {run_name} unchanged, skipping")
+                continue
+
+            with self.connection:
+                if existing:
+                    for table in TABLES:
+                        self.execute(f'DELETE FROM {table} WHERE run_id = ?', (existing[0],))
+                    self.execute('DELETE FROM runs WHERE run_id = ?', (existing[0],))
+                run_id = self.execute(
+                    'INSERT INTO runs (name, controller, data_dir, config_hash, scene, registered_at, source_keys) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (run_name, controller, str(data_dir.resolve()), file_hash(config), scene, time.time(), keys)
+                ).lastrowid
+                rows = 0
+                for table in paths:
+                    df = read_log(data_dir, files[table])
+                    self._insert(table, run_id, df)
+                    rows += len(df)
+                self.execute('UPDATE runs SET first_time = (SELECT MIN(SimulationTime) FROM intervals '
+                             'WHERE run_id = ?), last_time = (SELECT MAX(SimulationTime) FROM intervals '
+                             'WHERE run_id = ?) WHERE run_id = ?', (run_id, run_id, run_id))
+            print(f"📊 Registered {run_name}: {rows} rows from {len(paths)} files")
+            loaded.append(run_name)
+        return loaded
+
+    def close(self):
+        self.connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Embedded catalog of simulation runs')
+    parser.add_argument('--catalog', default=DEFAULT_CATALOG)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    register = commands.add_parser('register', help='Load a directory of logs as a run')
+    register.add_argument('data_dir', nargs='?', default='./')
+    register.add_argument('--name', default=None)
+    register.add_argument('--config', default=None, help='ML-Agents config YAML used for the run')
+    register.add_argument('--scene', default=None)
+    register.add_argument('--force', action='store_true')
+
+    commands.add_parser('list', help='List registered runs')
+
+    query = commands.add_parser('query', help='Run SQL against the catalog')
+    query.add_argument('sql')
+    args = parser.parse_args()
+
+    catalog = RunCatalog(args.catalog)
+    try:
+        if args.command == 'register':
+            catalog.register(args.data_dir, args.name, args.config, args.scene, args.force)
+        elif args.command == 'list':
+            print(catalog.runs().drop(columns='source_keys').to_string(index=False))
+        else:
+            print(catalog.query(args.sql).to_string(index=False))
+    finally:
+        catalog.close()
+
+
+if __name__ == "__main__":
+    main()
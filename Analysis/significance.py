@@ -0,0 +1,236 @@
+import math
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+try:
+    from scipy import stats as scipy_stats
+except ImportError:  # fall back to normal approximations
+    scipy_stats = None
+
+
+DEFAULT_RESAMPLES = 10_000
+DEFAULT_CONFIDENCE = 0.95
+# Upper bound on resample-matrix elements held in memory at once
+MAX_BATCH_ELEMENTS = 20_000_000
+# Fewest observations per controller for intervals, tests and effect sizes
+MIN_OBSERVATIONS = 2
+
+
+def _normal_sf(z):
+    """Two-sided p-value for a standard normal statistic"""
+    return math.erfc(abs(z) / math.sqrt(2))
+
+
+def bootstrap_means(values, n_resamples=DEFAULT_RESAMPLES, rng=None):
+    """
+    Means of n_resamples bootstrap resamples of values
+
+    Resamples are drawn as (batch, n) index matrices and reduced with one
+    vectorized mean per batch; batches keep memory bounded for long tables.
+    Under MIN_OBSERVATIONS values there is nothing to resample and every
+    mean is NaN.
+    """
+    rng = rng or np.random.default_rng()
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    if n < MIN_OBSERVATIONS:
+        return np.full(n_resamples, np.nan)
+    batch = max(1, MAX_BATCH_ELEMENTS // max(n, 1))
+    means = np.empty(n_resamples)
+    for start in range(0, n_resamples, batch):
+        stop = min(start + batch, n_resamples)
+        idx = rng.integers(0, n, size=(stop - start, n))
+        means[start:stop] = values[idx].mean(axis=1)
+    return means
+
+
+def _interval(samples, confidence):
+    if np.isnan(samples).all():
+        return np.nan, np.nan
+    tail = (1 - confidence) / 2 * 100
+    low, high = np.nanpercentile(samples, [tail, 100 - tail])
+    return low, high
+
+
+def moments(values):
+    """(count, mean, sample variance) of values, the form RunningStats keeps"""
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    return n, values.mean() if n else np.nan, values.var(ddof=1) if n > 1 else np.nan
+
+
+def welch_test(a, b):
+    """Welch's unequal-variance t-test: returns (t, dof, two-sided p)"""
+    return welch_from_moments(moments(a), moments(b))
+
+
+def welch_from_moments(a, b):
+    """welch_test from (count, mean, sample variance) of each group"""
+    (n_a, mean_a, var_a), (n_b, mean_b, var_b) = a, b
+    if min(n_a, n_b) < MIN_OBSERVATIONS:
+        return np.nan, np.nan, np.nan
+    var_a, var_b = var_a / n_a, var_b / n_b
+    se = math.sqrt(var_a + var_b)
+    if se == 0:
+        return np.nan, np.nan, np.nan
+    t = (mean_a - mean_b) / se
+    dof = (var_a + var_b) ** 2 / (var_a ** 2 / (n_a - 1) + var_b ** 2 / (n_b - 1))
+    if scipy_stats is not None:
+        p = 2 * scipy_stats.t.sf(abs(t), dof)
+    else:
+        p = _normal_sf(t)
+    return t, dof, p
+
+
+def mann_whitney(a, b):
+    """Two-sided Mann-Whitney U test with tie correction: returns (U, p)"""
+    if len(a) == 0 or len(b) == 0:
+        return np.nan, np.nan
+    if scipy_stats is not None:
+        result = scipy_stats.mannwhitneyu(a, b, alternative='two-sided')
+        return result.statistic, result.pvalue
+
+    n_a, n_b = len(a), len(b)
+    ranks = pd.Series(np.concatenate([a, b])).rank().to_numpy()
+    u = ranks[:n_a].sum() - n_a * (n_a + 1) / 2
+    n = n_a + n_b
+    _, tie_counts = np.unique(ranks, return_counts=True)
+    tie_term = (tie_counts ** 3 - tie_counts).sum() / (n * (n - 1))
+    sigma = math.sqrt(n_a * n_b / 12 * ((n + 1) - tie_term))
+    if sigma == 0:
+        return u, np.nan
+    z = (u - n_a * n_b / 2) / sigma
+    return u, _normal_sf(z)
+
+
+def cohens_from_moments(a, b):
+    """Cohen's d and Hedges' g of a vs b from (count, mean, sample variance)"""
+    (n_a, mean_a, var_a), (n_b, mean_b, var_b) = a, b
+    if min(n_a, n_b) < MIN_OBSERVATIONS:
+        return np.nan, np.nan
+    pooled = math.sqrt(((n_a - 1) * var_a + (n_b - 1) * var_b) / (n_a + n_b - 2))
+    d = (mean_a - mean_b) / pooled if pooled else np.nan
+    return d, d * (1 - 3 / (4 * (n_a + n_b) - 9))
+
+
+def effect_sizes(a, b, u=None):
+    """Cohen's d, Hedges' g and the rank-biserial correlation of a vs b"""
+    n_a, n_b = len(a), len(b)
+    if min(n_a, n_b) < MIN_OBSERVATIONS:
+        return np.nan, np.nan, np.nan
+    d, g = cohens_from_moments(moments(a), moments(b))
+    if u is None:
+        u, _ = mann_whitney(a, b)
+    rank_biserial = 2 * u / (n_a * n_b) - 1
+    return d, g, rank_biserial
+
+
+def _rescale(means, sample, exact):
+    """
+    Bootstrap means of a sample, moved onto the exact mean and shrunk to the
+    spread of the full column: the standard error falls with sqrt(n)
+    """
+    n, mean, _ = exact
+    if len(sample) == 0 or n <= len(sample):
+        return means
+    return mean + (means - sample.mean()) * math.sqrt(len(sample) / n)
+
+
+def compare_metric(metric, ml_values, static_values, improvement_fn,
+                   n_resamples=DEFAULT_RESAMPLES, confidence=DEFAULT_CONFIDENCE, seed=0,
+                   ml_moments=None, static_moments=None, higher_is_better=False):
+    """
+    Bootstrap CIs, tests and effect sizes for one metric
+
+    When the values are a sample of a longer column (the reservoir of a
+    streaming RunningStats), pass the column's exact moments: Welch's test and
+    Cohen's d / Hedges' g then use them, and the bootstrap means of the sample
+    are recentred on the exact mean and scaled by sqrt(n_sample / n). The
+    Mann-Whitney test and rank-biserial correlation stay on the sample, which
+    the Sampled column records.
+
+    Effect sizes are signed like improvement_fn: positive when ML is better.
+
+    Args:
+        metric: Metric name (passed to improvement_fn)
+        ml_values, static_values: Observations for each controller
+        improvement_fn: f(metric, ml_mean, static_mean) -> improvement %
+        n_resamples: Bootstrap resamples per controller
+        confidence: Confidence level of the intervals
+        seed: Seed so reruns give the same intervals
+        ml_moments, static_moments: (count, mean, sample variance) of the full
+            columns when the values are only a sample of them
+        higher_is_better: Whether a larger metric is better for the sign of
+            the effect sizes
+
+    Returns:
+        Dict of result columns
+    """
+    ml = np.asarray(ml_values, dtype=np.float64)
+    static = np.asarray(static_values, dtype=np.float64)
+    ml, static = ml[~np.isnan(ml)], static[~np.isnan(static)]
+    ml_moments = ml_moments or moments(ml)
+    static_moments = static_moments or moments(static)
+    rng = np.random.default_rng(seed)
+
+    ml_means = _rescale(bootstrap_means(ml, n_resamples, rng), ml, ml_moments)
+    static_means = _rescale(bootstrap_means(static, n_resamples, rng), static, static_moments)
+    improvements = improvement_fn(metric, ml_means, static_means)
+
+    t, dof, welch_p = welch_from_moments(ml_moments, static_moments)
+    u, mw_p = mann_whitney(ml, static)
+    _, _, rank_biserial = effect_sizes(ml, static, u)
+    d, g = cohens_from_moments(ml_moments, static_moments)
+    if not higher_is_better:
+        d, g, rank_biserial = -d, -g, -rank_biserial
+
+    ml_low, ml_high = _interval(ml_means, confidence)
+    static_low, static_high = _interval(static_means, confidence)
+    imp_low, imp_high = _interval(improvements, confidence)
+    return {
+        'Metric': metric,
+        'ML_Mean_CI_Low': ml_low,
+        'ML_Mean_CI_High': ml_high,
+        'Static_Mean_CI_Low': static_low,
+        'Static_Mean_CI_High': static_high,
+        'Improvement_CI_Low': imp_low,
+        'Improvement_CI_High': imp_high,
+        'Welch_t': t,
+        'Welch_df': dof,
+        'Welch_p': welch_p,
+        'MannWhitney_U': u,
+        'MannWhitney_p': mw_p,
+        'Cohens_d': d,
+        'Hedges_g': g,
+        'Rank_Biserial': rank_biserial,
+        'Sampled': ml_moments[0] > len(ml) or static_moments[0] > len(static),
+    }
+
+
+def compare_metrics(samples, improvement_fn, n_resamples=DEFAULT_RESAMPLES,
+                    confidence=DEFAULT_CONFIDENCE, workers=None, seed=0, moments=None,
+                    higher_is_better=()):
+    """
+    Run compare_metric for several metrics in parallel
+
+    NumPy releases the GIL in the resampling kernels, so a thread pool keeps
+    every core busy without copying the samples into worker processes.
+
+    Args:
+        samples: Dict of metric -> (ml_values, static_values)
+        moments: Dict of metric -> (ml_moments, static_moments) for samples
+            drawn from longer columns, see compare_metric
+        higher_is_better: Metrics where a larger value is better
+
+    Returns:
+        DataFrame with one row per metric
+    """
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(compare_metric, metric, ml, static, improvement_fn,
+                               n_resamples, confidence, seed + i, *(moments or {}).get(metric, (None, None)),
+                               metric in higher_is_better)
+                   for i, (metric, (ml, static)) in enumerate(samples.items())]
+        rows = [future.result() for future in futures]
+    return pd.DataFrame(rows)
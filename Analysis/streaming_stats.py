@@ -0,0 +1,292 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from binary_log import BINARY_SUFFIX, read_binary_log
+from csv_cache import apply_dtypes
+
+
+DEFAULT_CHUNKSIZE = 100_000
+RESERVOIR_SIZE = 10_000
+MAX_TIME_BUCKETS = 2048
+
+
+class RunningStats:
+    """
+    Bounded-memory statistics for one column
+
+    Mean and variance are merged chunk by chunk with Welford/Chan updates,
+    quantiles come from a fixed-size uniform reservoir sample.
+    """
+
+    def __init__(self, reservoir_size=RESERVOIR_SIZE, seed=0):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.nan
+        self.max = np.nan
+        self.reservoir_size = reservoir_size
+        self._rng = np.random.default_rng(seed)
+        self._keys = np.empty(0)
+        self._sample = np.empty(0)
+
+    def update(self, values):
+        """Merge a chunk of values into the running aggregates"""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        n_b = len(values)
+        if n_b == 0:
+            return
+
+        mean_b = values.mean()
+        m2_b = ((values - mean_b) ** 2).sum()
+        n = self.count + n_b
+        delta = mean_b - self.mean
+        self.mean += delta * n_b / n
+        self.m2 += m2_b + delta ** 2 * self.count * n_b / n
+        self.count = n
+
+        self.min = np.fmin(self.min, values.min())
+        self.max = np.fmax(self.max, values.max())
+
+        # Keep the rows with the smallest random keys: a uniform sample
+        keys = np.concatenate([self._keys, self._rng.random(n_b)])
+        sample = np.concatenate([self._sample, values])
+        if len(keys) > self.reservoir_size:
+            keep = np.argpartition(keys, self.reservoir_size)[:self.reservoir_size]
+            keys, sample = keys[keep], sample[keep]
+        self._keys, self._sample = keys, sample
+
+    @property
+    def var(self):
+        # Sample variance (ddof=1) to match pandas' Series.std()
+        return self.m2 / (self.count - 1) if self.count > 1 else np.nan
+
+    @property
+    def std(self):
+        return np.sqrt(self.var)
+
+    @property
+    def sample(self):
+        """Uniform random sample of the values seen so far"""
+        return self._sample
+
+    def quantile(self, q):
+        """Approximate quantile(s) from the reservoir sample"""
+        if len(self._sample) == 0:
+            return np.nan
+        return np.quantile(self._sample, q)
+
+    def summary(self):
+        """Return mean/std/median/min/max like the in-memory comparison"""
+        return {
+            'mean': self.mean if self.count else np.nan,
+            'std': self.std,
+            'median': self.quantile(0.5),
+            'min': self.min,
+            'max': self.max,
+        }
+
+    def box_stats(self, label):
+        """Box plot statistics in the format expected by Axes.bxp"""
+        q1, med, q3 = self.quantile([0.25, 0.5, 0.75])
+        iqr = q3 - q1
+        whislo = max(self.min, q1 - 1.5 * iqr)
+        whishi = min(self.max, q3 + 1.5 * iqr)
+        sample = self._sample
+        fliers = sample[(sample < whislo) | (sample > whishi)]
+        return {'label': label, 'med': med, 'q1': q1, 'q3': q3,
+                'whislo': whislo, 'whishi': whishi, 'mean': self.mean, 'fliers': fliers}
+
+
+class TimeBuckets:
+    """
+    Fixed number of time buckets holding mean/min/max of a series
+
+    When a value falls past the last bucket, adjacent buckets are merged and
+    the bucket width doubles, so memory never grows with log length.
+    """
+
+    def __init__(self, max_buckets=MAX_TIME_BUCKETS, initial_width=1.0):
+        self.max_buckets = max_buckets
+        self.width = initial_width
+        self.sums = np.zeros(max_buckets)
+        self.counts = np.zeros(max_buckets)
+        self.mins = np.full(max_buckets, np.inf)
+        self.maxs = np.full(max_buckets, -np.inf)
+
+    def update(self, times, values):
+        times = np.asarray(times, dtype=np.float64)
+        values = np.asarray(values, dtype=np.float64)
+        valid = ~(np.isnan(times) | np.isnan(values))
+        times, values = times[valid], values[valid]
+        if len(times) == 0:
+            return
+
+        while times.max() >= self.width * self.max_buckets:
+            self._coarsen()
+
+        idx = np.maximum(times // self.width, 0).astype(np.int64)
+        self.sums += np.bincount(idx, values, minlength=self.max_buckets)
+        self.counts += np.bincount(idx, minlength=self.max_buckets)
+        np.minimum.at(self.mins, idx, values)
+        np.maximum.at(self.maxs, idx, values)
+
+    def _coarsen(self):
+        half = self.max_buckets // 2
+        for name, reduce, fill in (('sums', np.add, 0.0), ('counts', np.add, 0.0),
+                                   ('mins', np.minimum, np.inf), ('maxs', np.maximum, -np.inf)):
+            arr = getattr(self, name)
+            merged = reduce(arr[0::2], arr[1::2])
+            setattr(self, name, np.concatenate([merged, np.full(self.max_buckets - half, fill)]))
+        self.width *= 2
+
+    def series(self):
+        """Return bucket centres with the mean, min and max in each bucket"""
+        filled = self.counts > 0
+        centres = (np.nonzero(filled)[0] + 0.5) * self.width
+        means = self.sums[filled] / self.counts[filled]
+        return centres, means, self.mins[filled], self.maxs[filled]
+
+
+class StreamSummary:
+    """
+    Running aggregates for one CSV, built without holding it in memory
+
+    Mirrors the parts of a DataFrame the comparison code touches
+    (``columns`` and ``len``) so it can sit in ``ml_data``/``static_data``.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.columns = []
+        self.rows = 0
+        self.stats = {}
+        self.buckets = {}
+        self.last = {}
+        self._trend = {}
+        self._ep_count = None
+        self._ep_sum = None
+        self._ep_min = None
+        self._ep_max = None
+
+    def __len__(self):
+        return self.rows
+
+    def update(self, chunk):
+        """Fold one DataFrame chunk into the aggregates"""
+        if not self.columns:
+            self.columns = list(chunk.columns)
+        if len(chunk) == 0:
+            return
+        row_index = np.arange(self.rows, self.rows + len(chunk), dtype=np.float64)
+        self.rows += len(chunk)
+        self.last = chunk.iloc[-1].to_dict()
+
+        numeric = [c for c in chunk.columns if pd.api.types.is_numeric_dtype(chunk[c])]
+        for col in numeric:
+            values = chunk[col].to_numpy(dtype=np.float64)
+            self.stats.setdefault(col, RunningStats()).update(values)
+
+            # Least-squares sums against row number, for trend()
+            valid = ~np.isnan(values)
+            x, y = row_index[valid], values[valid]
+            sums = np.array([len(x), x.sum(), y.sum(), (x * x).sum(), (x * y).sum()])
+            self._trend[col] = self._trend.get(col, 0) + sums
+
+            if 'SimulationTime' in chunk.columns and col != 'SimulationTime':
+                self.buckets.setdefault(col, TimeBuckets()).update(
+                    chunk['SimulationTime'].to_numpy(), chunk[col].to_numpy())
+
+        if 'Episode' in chunk.columns:
+            cols = [c for c in numeric if c != 'Episode']
+            grouped = chunk.groupby('Episode')[cols]
+            self._ep_count = _merge(self._ep_count, grouped.count(), 'sum')
+            self._ep_sum = _merge(self._ep_sum, grouped.sum(), 'sum')
+            self._ep_min = _merge(self._ep_min, grouped.min(), 'min')
+            self._ep_max = _merge(self._ep_max, grouped.max(), 'max')
+
+    def summary(self, metric):
+        return self.stats[metric].summary()
+
+    def trend(self, metric):
+        """Slope of a linear fit of the metric against row number"""
+        n, sx, sy, sxx, sxy = self._trend[metric]
+        denom = n * sxx - sx * sx
+        return (n * sxy - sx * sy) / denom if denom else np.nan
+
+    def series(self, metric):
+        """Time-bucketed (time, mean, min, max) arrays for a metric"""
+        return self.buckets[metric].series()
+
+    def episode_reductions(self):
+        """Per-episode count/mean/min/max as one DataFrame"""
+        if self._ep_sum is None:
+            return pd.DataFrame()
+        return pd.concat({
+            'count': self._ep_count,
+            'mean': self._ep_sum / self._ep_count,
+            'min': self._ep_min,
+            'max': self._ep_max,
+        }, axis=1)
+
+
+def _merge(acc, part, how):
+    if acc is None:
+        return part
+    return getattr(pd.concat([acc, part]).groupby(level=0), how)()
+
+
+def stream_csv(csv_path, columns=None, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Aggregate a CSV chunk by chunk in bounded memory
+
+    Args:
+        csv_path: Path to the CSV file
+        columns: Optional list of columns to aggregate
+        chunksize: Rows per chunk handed to pandas
+
+    Returns:
+        StreamSummary with running stats, time buckets and episode reductions
+    """
+    return stream_csvs([csv_path], columns, chunksize)
+
+
+def _iter_chunks(path, columns, chunksize):
+    """
+    Typed chunks of one log file, read from the .tslog next to it when there
+    is one (sliced off the memory map) and parsed from the CSV otherwise
+    """
+    path = Path(path)
+    binary_path = path.with_suffix(BINARY_SUFFIX)
+    if binary_path.exists():
+        log = read_binary_log(binary_path)
+        frame = log.to_frame([c for c in log.columns if c in columns] if columns else None)
+        for start in range(0, len(frame), chunksize):
+            yield frame.iloc[start:start + chunksize]
+        return
+    usecols = (lambda c: c in columns) if columns else None
+    for chunk in pd.read_csv(path, usecols=usecols, chunksize=chunksize):
+        yield apply_dtypes(chunk)
+
+
+def stream_csvs(csv_paths, columns=None, chunksize=DEFAULT_CHUNKSIZE, intersection=None):
+    """
+    Aggregate several CSVs of one log (e.g. its intersection_<id>/ files) into one StreamSummary
+
+    A file whose .tslog exists is streamed from the binary log instead, so
+    runs written only by BinaryLogger aggregate too.
+
+    Args:
+        intersection: Only the rows of this IntersectionId
+    """
+    csv_paths = list(csv_paths)
+    summary = StreamSummary(csv_paths[0])
+    wanted = set(columns or ()) | ({'IntersectionId'} if intersection is not None else set())
+    for path in csv_paths:
+        for chunk in _iter_chunks(path, wanted if columns else None, chunksize):
+            if intersection is not None and 'IntersectionId' in chunk.columns:
+                chunk = chunk[chunk['IntersectionId'] == intersection]
+            summary.update(chunk)
+    return summary
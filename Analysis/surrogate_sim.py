@@ -0,0 +1,378 @@
+import argparse
+import itertools
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from log_files import read_log
+from throughput import WAITING_COLUMNS, interval_departures, previous_row
+
+
+# Defaults mirrored from StaticSignalTimingSO / StaticSignalController
+NUM_OF_LEGS = 4
+# Phases of the 4-Way-Type-1 prefab's TrafficLightSetup
+NUM_OF_PHASES = 3
+DEFAULT_PHASE_TIMINGS = (40.0, 20.0, 30.0)
+DEFAULT_FIXED_CYCLE_TIME = 120.0
+LOGGING_INTERVAL = 10.0
+EPISODE_LENGTH = 30.0
+DEFAULT_DURATION = 10_800.0
+# Fallbacks when no interval log is available (veh/s)
+DEFAULT_ARRIVAL_RATE = 0.12
+DEFAULT_SATURATION_RATE = 0.5
+SATURATION_PERCENTILE = 95
+# Lost time per phase (s): yellow from SignalSettingsSO.defautYellowTime plus an
+# all-red clearance, and the startup delay before a queue begins to discharge
+YELLOW_TIME = 3.0
+ALL_RED_TIME = 1.0
+STARTUP_LOST_TIME = 2.0
+
+INTERVAL_COLUMNS = ['SimulationTime', 'Episode', 'TotalVehicles', 'VehiclesWaiting', 'QueueLength',
+                    'AverageWaitTime', 'Throughput', 'CurrentPhase', 'PhaseGreenTime',
+                    'PhaseDuration', 'FuelConsumed', 'VehiclesDeparted', 'TrafficDensity']
+
+
+def plan_durations(phase_timings, use_fixed_cycle_time=False, fixed_cycle_time=DEFAULT_FIXED_CYCLE_TIME):
+    """
+    Green time of every phase, as StaticSignalTimingSO.GetNextPhase hands them out
+
+    Args:
+        phase_timings: (n_plans, n_phases) or (n_phases,) green times in seconds
+        use_fixed_cycle_time: Split fixed_cycle_time equally over the phases instead
+        fixed_cycle_time: Scalar or (n_plans,) cycle lengths
+
+    Returns:
+        (n_plans, n_phases) float array
+    """
+    timings = np.atleast_2d(np.asarray(phase_timings, dtype=np.float64))
+    if use_fixed_cycle_time:
+        cycle = np.broadcast_to(np.asarray(fixed_cycle_time, dtype=np.float64), (len(timings),))
+        timings = np.repeat(cycle[:, None] / timings.shape[1], timings.shape[1], axis=1)
+    if np.any(timings <= 0):
+        raise ValueError("Phase timings must be positive")
+    return timings
+
+
+def calibrate(csv_path='static_interval_data.csv', n_legs=NUM_OF_LEGS, intersection=None):
+    """
+    Estimate arrival and saturation rates from an interval log
+
+    Arrivals come from the TotalVehicles counter, split evenly over the legs
+    since the logs do not record per-leg counts. The saturation rate is a high
+    percentile of the departure rate over intervals that started with a queue,
+    i.e. how fast the intersection clears when demand is not the limit. The
+    queue is QueueLength (VehiclesWaiting in older logs). A run with several
+    intersections is read from its intersection_<id>/ files next to csv_path
+    and calibrated per approach, i.e. rates are averaged over intersections.
+
+    Args:
+        intersection: Only calibrate from this IntersectionId
+
+    Returns:
+        Dict with 'arrival_rates' (n_legs,) and 'saturation_rate' in veh/s
+
+    Raises:
+        ValueError: When the log lacks SimulationTime, TotalVehicles or a queue column
+    """
+    csv_path = Path(csv_path)
+    df = read_log(csv_path.parent, csv_path.name, ['SimulationTime', 'TotalVehicles'] + WAITING_COLUMNS,
+                  intersection=intersection)
+    waiting = next((c for c in WAITING_COLUMNS if c in df.columns), None)
+    missing = [c for c in ('SimulationTime', 'TotalVehicles') if c not in df.columns]
+    if waiting is None:
+        missing.append(' or '.join(WAITING_COLUMNS))
+    if missing:
+        raise ValueError(f"{csv_path} cannot calibrate the surrogate: missing {', '.join(missing)}")
+    times = df['SimulationTime'].to_numpy(dtype=np.float64)
+    arrivals = df['TotalVehicles'].to_numpy(dtype=np.float64)
+    previous = previous_row(df, arrivals)
+    d_arrivals = np.where(np.isnan(previous), 0.0, arrivals - previous)
+    d_arrivals = np.where(d_arrivals < 0, arrivals, d_arrivals)
+    departed, elapsed = interval_departures(df)
+
+    # elapsed sums over intersections, so this is the rate of one intersection
+    total_time = elapsed.sum()
+    arrival_rate = d_arrivals.sum() / total_time if total_time > 0 else DEFAULT_ARRIVAL_RATE
+
+    queued = np.nan_to_num(previous_row(df, df[waiting].to_numpy()), nan=0.0) > 0
+    mask = queued & (elapsed > 0)
+    saturation = (np.percentile(departed[mask] / elapsed[mask], SATURATION_PERCENTILE)
+                  if mask.any() else DEFAULT_SATURATION_RATE)
+    if not saturation > 0:
+        saturation = DEFAULT_SATURATION_RATE
+
+    print(f"📊 Calibrated from {csv_path}: {arrival_rate * 60:.2f} arrivals/min over "
+          f"{times[-1] - times[0]:.0f}s, saturation {saturation:.2f} veh/s per green leg")
+    return {'arrival_rates': np.full(n_legs, arrival_rate / n_legs), 'saturation_rate': float(saturation)}
+
+
+def arrival_scenarios(base_rates, scales=(1.0,)):
+    """(n_scenarios, n_legs) arrival rates: base_rates scaled by each factor"""
+    return np.asarray(scales, dtype=np.float64)[:, None] * np.asarray(base_rates, dtype=np.float64)[None, :]
+
+
+class SurrogateResult:
+    """
+    Batched outcome of SurrogateSimulator.run
+
+    Summary arrays are shaped (n_plans, n_scenarios); traces, when recorded,
+    add a trailing axis with one entry per logging interval.
+    """
+
+    def __init__(self, durations, arrival_rates, duration, summary, traces, clearance_time=0.0):
+        self.durations = durations
+        self.clearance_time = clearance_time
+        self.arrival_rates = arrival_rates
+        self.duration = duration
+        self.summary = summary
+        self.traces = traces
+
+    def to_frame(self):
+        """One row per (plan, scenario) with the timing plan and its KPIs"""
+        n_plans, n_scenarios = self.summary['MeanQueueLength'].shape
+        plan, scenario = np.meshgrid(np.arange(n_plans), np.arange(n_scenarios), indexing='ij')
+        table = pd.DataFrame({'Plan': plan.ravel(), 'Scenario': scenario.ravel()})
+        for p in range(self.durations.shape[1]):
+            table[f'Phase{p}Green'] = self.durations[plan.ravel(), p]
+        table['CycleTime'] = (self.durations + self.clearance_time).sum(axis=1)[plan.ravel()]
+        table['ArrivalRate'] = self.arrival_rates.sum(axis=1)[scenario.ravel()]
+        for name, values in self.summary.items():
+            table[name] = values.ravel()
+        return table
+
+    def interval_frame(self, plan=0, scenario=0):
+        """
+        One simulated run in the static_interval_data.csv layout
+
+        Throughput follows StaticSignalController.CalculateThroughput (vehicles
+        so far over the current episode's elapsed time) so the file can be fed
+        straight into analyze_stats.py.
+        """
+        if self.traces is None:
+            raise ValueError("Run the simulator with record=True to export interval data")
+        times = self.traces['SimulationTime']
+        total = self.traces['TotalVehicles'][plan, scenario]
+        waiting = self.traces['VehiclesWaiting'][plan, scenario]
+        departed = self.traces['VehiclesDeparted'][plan, scenario]
+        phase = self.traces['CurrentPhase'][plan]
+        green = self.durations[plan][phase]
+        delay = self.traces['QueueSeconds'][plan, scenario]
+
+        episode_elapsed = times % EPISODE_LENGTH
+        episode_elapsed = np.where(episode_elapsed > 0, episode_elapsed, EPISODE_LENGTH)
+        return pd.DataFrame({
+            'SimulationTime': times,
+            'Episode': (times // EPISODE_LENGTH).astype(np.int32) + 1,
+            'TotalVehicles': total,
+            'VehiclesWaiting': waiting,
+            'QueueLength': waiting,
+            'AverageWaitTime': np.divide(delay, departed, out=np.zeros(len(times)), where=departed > 0),
+            'Throughput': total / episode_elapsed,
+            'CurrentPhase': phase,
+            'PhaseGreenTime': green,
+            'PhaseDuration': green,
+            'FuelConsumed': 0.0,
+            'VehiclesDeparted': departed,
+            'TrafficDensity': total,
+        }, columns=INTERVAL_COLUMNS)
+
+
+class SurrogateSimulator:
+    """
+    Headless queueing model of the four-leg intersection
+
+    Each leg is a vertical queue fed by Poisson arrivals; while a leg's phase
+    is green it discharges up to a Poisson number of vehicles at the saturation
+    rate per second. Each phase loses time: nothing discharges during the first
+    startup_lost_time seconds of green, nor during the clearance interval
+    (yellow + all-red) that follows it, so the cycle is the sum of the green
+    times plus one clearance per phase and short phases pay proportionally
+    more. Every timing plan and arrival scenario is simulated at
+    once as (n_plans, n_scenarios, n_legs) arrays, one 1-second tick at a time
+    like TrafficLightSetup.Tick. Random draws are shared across plans (common
+    random numbers), so plan differences are not drowned by sampling noise.
+
+    Args:
+        saturation_rate: Vehicles per second a green leg can discharge
+        phase_legs: (n_phases, n_legs) bool matrix of legs each phase serves
+                    (defaults to leg i on phase i % n_phases)
+        seed: Random seed
+        clearance_time: Seconds after each green with no service (yellow + all-red)
+        startup_lost_time: Seconds at the start of each green with no service
+    """
+
+    def __init__(self, saturation_rate=DEFAULT_SATURATION_RATE, phase_legs=None, seed=0,
+                 clearance_time=YELLOW_TIME + ALL_RED_TIME, startup_lost_time=STARTUP_LOST_TIME):
+        if clearance_time < 0 or startup_lost_time < 0:
+            raise ValueError("Lost times must be non-negative")
+        self.saturation_rate = saturation_rate
+        self.phase_legs = None if phase_legs is None else np.asarray(phase_legs, dtype=bool)
+        self.seed = seed
+        self.clearance_time = clearance_time
+        self.startup_lost_time = startup_lost_time
+
+    def run(self, durations, arrival_rates, duration=DEFAULT_DURATION, record=False,
+            logging_interval=LOGGING_INTERVAL):
+        """
+        Simulate every plan under every arrival scenario
+
+        Args:
+            durations: (n_plans, n_phases) green times, see plan_durations
+            arrival_rates: (n_scenarios, n_legs) arrivals per second per leg
+            duration: Simulated seconds
+            record: Keep per-interval traces for interval_frame
+            logging_interval: Seconds between recorded rows
+
+        Returns:
+            SurrogateResult
+        """
+        durations = np.atleast_2d(np.asarray(durations, dtype=np.float64))
+        arrival_rates = np.atleast_2d(np.asarray(arrival_rates, dtype=np.float64))
+        n_plans, n_phases = durations.shape
+        n_scenarios, n_legs = arrival_rates.shape
+        phase_legs = self.phase_legs
+        if phase_legs is None:
+            phase_legs = np.arange(n_legs)[None, :] % n_phases == np.arange(n_phases)[:, None]
+        if phase_legs.shape != (n_phases, n_legs):
+            raise ValueError(f"phase_legs must be {(n_phases, n_legs)}, got {phase_legs.shape}")
+
+        rng = np.random.default_rng(self.seed)
+        slots = durations + self.clearance_time
+        phase_ends = np.cumsum(slots, axis=1)
+        phase_starts = phase_ends - slots
+        cycle = phase_ends[:, -1]
+        plans = np.arange(n_plans)
+        steps = int(duration)
+        record_every = max(1, int(round(logging_interval)))
+
+        queue = np.zeros((n_plans, n_scenarios, n_legs), dtype=np.int64)
+        arrived = np.zeros((n_scenarios,), dtype=np.int64)
+        departed = np.zeros((n_plans, n_scenarios), dtype=np.int64)
+        queue_seconds = np.zeros((n_plans, n_scenarios))
+        max_queue = np.zeros((n_plans, n_scenarios), dtype=np.int64)
+
+        traces = None
+        if record:
+            n_rows = steps // record_every
+            traces = {
+                'SimulationTime': np.arange(1, n_rows + 1, dtype=np.float64) * record_every,
+                'TotalVehicles': np.empty((n_plans, n_scenarios, n_rows), dtype=np.int64),
+                'VehiclesWaiting': np.empty((n_plans, n_scenarios, n_rows), dtype=np.int64),
+                'VehiclesDeparted': np.empty((n_plans, n_scenarios, n_rows), dtype=np.int64),
+                'QueueSeconds': np.empty((n_plans, n_scenarios, n_rows)),
+                'CurrentPhase': np.empty((n_plans, n_rows), dtype=np.int32),
+            }
+
+        for t in range(steps):
+            position = t % cycle
+            phase = (position[:, None] >= phase_ends).sum(axis=1)
+            into_phase = position - phase_starts[plans, phase]
+            serving = (into_phase >= self.startup_lost_time) & (into_phase < durations[plans, phase])
+            green = (phase_legs[phase] & serving[:, None])[:, None, :]
+
+            arrivals = rng.poisson(arrival_rates)
+            capacity = rng.poisson(self.saturation_rate, size=(n_scenarios, n_legs))
+            queue += arrivals
+            arrived += arrivals.sum(axis=1)
+            served = np.where(green, np.minimum(queue, capacity), 0)
+            queue -= served
+            departed += served.sum(axis=2)
+
+            waiting = queue.sum(axis=2)
+            queue_seconds += waiting
+            np.maximum(max_queue, waiting, out=max_queue)
+
+            if record and (t + 1) % record_every == 0:
+                row = (t + 1) // record_every - 1
+                traces['TotalVehicles'][..., row] = arrived
+                traces['VehiclesWaiting'][..., row] = waiting
+                traces['VehiclesDeparted'][..., row] = departed
+                traces['QueueSeconds'][..., row] = queue_seconds
+                traces['CurrentPhase'][:, row] = phase
+
+        summary = {
+            'MeanQueueLength': queue_seconds / max(steps, 1),
+            'MaxQueueLength': max_queue,
+            'VehiclesPerMinute': departed / max(steps, 1) * 60,
+            # Little's law: total time spent queueing per served vehicle
+            'MeanDelay': np.divide(queue_seconds, departed, out=np.full(departed.shape, np.nan),
+                                   where=departed > 0),
+            'FinalQueue': queue.sum(axis=2),
+        }
+        return SurrogateResult(durations, arrival_rates, duration, summary, traces, self.clearance_time)
+
+
+def grid_plans(green_times, n_phases=NUM_OF_PHASES):
+    """Every combination of per-phase green times: (len(green_times) ** n_phases, n_phases)"""
+    return np.array(list(itertools.product(green_times, repeat=n_phases)), dtype=np.float64)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Grid-search static signal plans on a surrogate queueing model')
+    parser.add_argument('--calibrate', default='static_interval_data.csv',
+                        help='Interval log to calibrate arrival and saturation rates from')
+    parser.add_argument('--intersection', type=int, default=None,
+                        help='Calibrate from one IntersectionId of a multi-intersection run')
+    parser.add_argument('--green', type=float, nargs='+', default=[10, 20, 30, 40, 50],
+                        help='Candidate green times per phase (every combination is simulated)')
+    parser.add_argument('--phases', type=int, default=NUM_OF_PHASES)
+    parser.add_argument('--clearance', type=float, default=YELLOW_TIME + ALL_RED_TIME,
+                        help='Yellow + all-red seconds after every green')
+    parser.add_argument('--startup-lost', type=float, default=STARTUP_LOST_TIME,
+                        help='Seconds at the start of every green before the queue discharges')
+    parser.add_argument('--fixed-cycle', type=float, nargs='*', default=None,
+                        help='Search fixed cycle lengths split equally instead (useFixedCycleTime)')
+    parser.add_argument('--scales', type=float, nargs='+', default=[0.5, 1.0, 1.5],
+                        help='Arrival-rate multipliers, one scenario each')
+    parser.add_argument('--duration', type=float, default=DEFAULT_DURATION)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='surrogate_plan_search.csv')
+    parser.add_argument('--export-best', default=None,
+                        help='Write the best plan at scale 1.0 in the static_interval_data.csv layout')
+    args = parser.parse_args()
+
+    try:
+        rates = calibrate(args.calibrate, intersection=args.intersection)
+    except FileNotFoundError:
+        print(f"⚠️ {args.calibrate} not found, using default rates")
+        rates = {'arrival_rates': np.full(NUM_OF_LEGS, DEFAULT_ARRIVAL_RATE / NUM_OF_LEGS),
+                 'saturation_rate': DEFAULT_SATURATION_RATE}
+
+    if args.fixed_cycle:
+        durations = plan_durations(np.ones((len(args.fixed_cycle), args.phases)), True, args.fixed_cycle)
+    else:
+        durations = plan_durations(grid_plans(args.green, args.phases))
+    scenarios = arrival_scenarios(rates['arrival_rates'], args.scales)
+    simulator = SurrogateSimulator(rates['saturation_rate'], seed=args.seed,
+                                   clearance_time=args.clearance, startup_lost_time=args.startup_lost)
+
+    print(f"🚀 Simulating {len(durations)} plans x {len(scenarios)} scenarios for {args.duration:.0f}s...")
+    result = simulator.run(durations, scenarios, args.duration)
+    table = result.to_frame()
+    table.to_csv(args.output, index=False)
+
+    ranking = (table.groupby('Plan')[['MeanDelay', 'MeanQueueLength', 'VehiclesPerMinute']].mean()
+               .sort_values('MeanDelay'))
+    print("\nBest plans (averaged over scenarios):")
+    best = ranking.head(10).join(table.drop_duplicates('Plan').set_index('Plan').filter(like='Phase'))
+    print(best.to_string(float_format='%.2f'))
+    baseline = np.flatnonzero((durations == np.asarray(DEFAULT_PHASE_TIMINGS)).all(axis=1)
+                              if durations.shape[1] == len(DEFAULT_PHASE_TIMINGS) else [])
+    if len(baseline):
+        rank = ranking.index.get_loc(baseline[0]) + 1
+        print(f"\nDefault plan {DEFAULT_PHASE_TIMINGS} ranks {rank} of {len(ranking)} "
+              f"(mean delay {ranking.loc[baseline[0], 'MeanDelay']:.2f}s)")
+    print(f"\n📊 Plan search saved to {args.output}")
+
+    if args.export_best:
+        scale = np.asarray(args.scales)
+        scenario = int(np.argmin(np.abs(scale - 1.0)))
+        best_plan = ranking.index[0]
+        single = simulator.run(durations[best_plan], scenarios[scenario], args.duration, record=True)
+        single.interval_frame().to_csv(args.export_best, index=False)
+        print(f"✅ Best plan's interval data saved to {args.export_best}")
+
+
+if __name__ == "__main__":
+    main()
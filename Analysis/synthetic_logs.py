@@ -0,0 +1,361 @@
+import argparse
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:  # falls back to pandas.to_csv, several times slower
+    pa = None
+    pa_csv = None
+
+
+SYNTHETIC_META = '.synthetic.json'
+LOGGING_INTERVAL = 10.0
+# Phase green times of the 4-Way-Type-1 prefab and the ML agent's +-offset around them
+PHASE_GREEN_TIMES = np.array([40, 20, 30])
+GREEN_OFFSET = 10
+STATIC_EPISODE_SECONDS = 30.0
+# Vehicles per second, modulated by +-DEMAND_SWING over DEMAND_PERIOD seconds
+ARRIVAL_RATE = 0.14
+DEMAND_SWING = 0.3
+DEMAND_PERIOD = 3600.0
+# Mean vehicles waiting at the intersection, per controller
+MEAN_WAITING = {'ml': 3.4, 'static': 3.7}
+# Agent decisions per simulated second (StepCount in the interval log)
+DECISIONS_PER_SECOND = 0.5
+DEFAULT_CHUNK_ROWS = 1_000_000
+
+# Headers exactly as the CsvLogger constructors in TrafficSignalMlAgent.cs and
+# StaticSignalController.cs write them; the reward logs have no CsvLogger, so
+# their headers are those of the checked-in sample files.
+CSVLOGGER_HEADERS = {
+    'episode_results.csv': ['IntersectionId', 'Episode', 'TotalVehicles', 'VehiclesWaiting', 'EpisodeDuration',
+                            'CurrentReward', 'CurrentPhase', 'GreenLightTime'],
+    'interval_data.csv': ['IntersectionId', 'SimulationTime', 'Episode', 'Step', 'TotalVehicles', 'QueueLength',
+                          'CurrentReward', 'CurrentPhase', 'GreenLightTime'],
+    'reward_progress.csv': ['Step', 'Episode', 'Reward', 'CumulativeReward'],
+    'static_episode_results.csv': ['IntersectionId', 'Episode', 'TotalVehicles', 'VehiclesWaiting',
+                                   'EpisodeDuration', 'Throughput', 'CurrentPhase', 'PhaseGreenTime'],
+    'static_interval_data.csv': ['IntersectionId', 'SimulationTime', 'Episode', 'TotalVehicles', 'QueueLength',
+                                 'Throughput', 'CurrentPhase', 'PhaseGreenTime'],
+    'static_reward_progress.csv': ['Step', 'Episode', 'TotalVehicles', 'VehiclesWaiting', 'SimulationTime'],
+}
+# Headers of the sample CSVs in this directory, written by an earlier logger version
+SAMPLE_HEADERS = {
+    'episode_results.csv': ['Episode', 'TotalVehicles', 'VehiclesWaiting', 'EpisodeDuration',
+                            'CumulativeReward', 'CurrentReward', 'CurrentPhase', 'GreenLightTime',
+                            'FuelConsumed'],
+    'interval_data.csv': ['SimulationTime', 'Episode', 'Step', 'TotalVehicles', 'VehiclesWaiting',
+                          'QueueLength', 'CumulativeReward', 'CurrentReward', 'CurrentPhase',
+                          'GreenLightTime', 'FuelConsumed', 'AverageWaitTime'],
+    'reward_progress.csv': CSVLOGGER_HEADERS['reward_progress.csv'],
+    'static_episode_results.csv': ['Episode', 'TotalVehicles', 'VehiclesWaiting', 'EpisodeDuration',
+                                   'AverageWaitTime', 'Throughput', 'CurrentPhase', 'PhaseGreenTime',
+                                   'FuelConsumed'],
+    'static_interval_data.csv': ['SimulationTime', 'Episode', 'TotalVehicles', 'VehiclesWaiting',
+                                 'QueueLength', 'AverageWaitTime', 'Throughput', 'CurrentPhase',
+                                 'PhaseGreenTime', 'PhaseDuration', 'FuelConsumed', 'VehiclesDeparted',
+                                 'TrafficDensity'],
+    'static_reward_progress.csv': CSVLOGGER_HEADERS['static_reward_progress.csv'],
+}
+SCHEMAS = {'csvlogger': CSVLOGGER_HEADERS, 'sample': SAMPLE_HEADERS}
+INT_COLUMNS = {'IntersectionId', 'Episode', 'Step', 'TotalVehicles', 'VehiclesWaiting', 'QueueLength', 'CurrentPhase',
+               'VehiclesDeparted', 'TrafficDensity'}
+
+
+def total_vehicles(t):
+    """Vehicles spawned by simulation time t: the integral of the modulated arrival rate"""
+    omega = 2 * np.pi / DEMAND_PERIOD
+    return np.floor(ARRIVAL_RATE * (t + DEMAND_SWING / omega * (1 - np.cos(omega * t)))).astype(np.int64)
+
+
+def _g7(values):
+    """Round to the 7 significant digits C# float.ToString() prints"""
+    values = np.asarray(values, dtype=np.float64)
+    with np.errstate(divide='ignore'):
+        exponent = np.floor(np.log10(np.abs(values)))
+    scale = 10.0 ** (6 - np.where(np.isfinite(exponent), exponent, 0))
+    return np.round(values * scale) / scale
+
+
+def _demand(t):
+    return 1 + DEMAND_SWING * np.sin(2 * np.pi * t / DEMAND_PERIOD)
+
+
+class _CsvWriter:
+    """Append column chunks to a CSV whose header line is written up front"""
+
+    def __init__(self, path, header):
+        self.header = header
+        self.rows = 0
+        self.file = open(path, 'wb')
+        self.file.write((','.join(header) + '\n').encode())
+
+    def write(self, columns):
+        columns = {name: columns[name] for name in self.header}
+        n = len(next(iter(columns.values())))
+        if n == 0:
+            return
+        # CsvLogger writes ints and C# floats with 7 significant digits
+        columns = {name: values.astype(np.int32) if name in INT_COLUMNS else _g7(values).astype(np.float32)
+                   for name, values in columns.items()}
+        if pa_csv is not None:
+            pa_csv.write_csv(pa.table(columns), self.file, pa_csv.WriteOptions(include_header=False))
+        else:
+            pd.DataFrame(columns).to_csv(self.file, header=False, index=False, float_format='%.7g')
+        self.rows += n
+
+    def close(self):
+        self.file.close()
+
+
+class _Controller:
+    """
+    Episode schedule and sampled state of one controller
+
+    ML episodes are single decisions: the next phase with its green time
+    offset by the action. Static episodes are the fixed 30 s blocks the
+    LogMetrics coroutine writes, over a fixed 40/20/30 s cycle.
+    """
+
+    def __init__(self, kind, rng, intersection_id=0):
+        self.kind = kind
+        self.rng = rng
+        self.intersection_id = intersection_id
+        self.episode = 0
+        self.start = 0.0
+        self.log_time = 0.0
+        self.reward_time = 0.0
+        self.reward_step = 0
+
+    def episodes(self, n):
+        """Next n episodes: index, start, duration, phase and green time"""
+        index = self.episode + np.arange(n)
+        if self.kind == 'ml':
+            phase = (index + 1) % len(PHASE_GREEN_TIMES)
+            green = PHASE_GREEN_TIMES[phase] + self.rng.integers(-GREEN_OFFSET, GREEN_OFFSET + 1, n)
+            duration = green + self.rng.uniform(0, 1.5, n)
+        else:
+            duration = STATIC_EPISODE_SECONDS + self.rng.uniform(0, 1.0, n)
+            phase = green = None
+        start = self.start + np.concatenate(([0.0], np.cumsum(duration)[:-1]))
+        self.episode += n
+        self.start = start[-1] + duration[-1]
+        return index + 1, start, duration, phase, green
+
+    def static_phase(self, t):
+        """Phase index and green time of the fixed cycle at times t"""
+        ends = np.cumsum(PHASE_GREEN_TIMES)
+        phase = np.searchsorted(ends, np.mod(t, ends[-1]), side='right')
+        return phase, PHASE_GREEN_TIMES[phase]
+
+    def log_times(self, end, jitter):
+        """Logging times up to end: each LOGGING_INTERVAL after the last, plus frame lag"""
+        n = max(int((end - self.log_time) / LOGGING_INTERVAL) + 2, 1)
+        times = self.log_time + np.cumsum(LOGGING_INTERVAL + self.rng.uniform(0, jitter, n))
+        times = times[times < end]
+        if len(times):
+            self.log_time = times[-1]
+        return times
+
+    def waiting(self, t):
+        return self.rng.poisson(MEAN_WAITING[self.kind] * _demand(t))
+
+
+def _ml_chunk(ctrl, n_episodes):
+    rng = ctrl.rng
+    episode, start, duration, phase, green = ctrl.episodes(n_episodes)
+    end = start + duration
+    waiting = ctrl.waiting(end)
+    reward = np.minimum(75.0, 75.0 - 4.0 * waiting + rng.normal(0, 3, len(episode)))
+    episodes = {
+        'IntersectionId': np.full(len(episode), ctrl.intersection_id),
+        'Episode': episode, 'TotalVehicles': total_vehicles(end), 'VehiclesWaiting': waiting,
+        'EpisodeDuration': duration, 'CumulativeReward': reward, 'CurrentReward': reward,
+        'CurrentPhase': phase, 'GreenLightTime': green, 'FuelConsumed': np.zeros(len(episode)),
+    }
+    rewards = {
+        'Step': np.floor(duration * DECISIONS_PER_SECOND), 'Episode': episode, 'Reward': reward,
+        'CumulativeReward': np.zeros(len(episode)),
+    }
+
+    t = ctrl.log_times(end[-1], jitter=0.6)
+    k = np.maximum(np.searchsorted(start, t, side='right') - 1, 0)
+    queue = ctrl.waiting(t)
+    # The interval row shows the decision in force: the previous episode's reward and green time
+    prev = np.maximum(k - 1, 0)
+    intervals = {
+        'IntersectionId': np.full(len(t), ctrl.intersection_id),
+        'SimulationTime': t, 'Episode': episode[k], 'Step': np.floor((t - start[k]) * DECISIONS_PER_SECOND),
+        'TotalVehicles': total_vehicles(t), 'VehiclesWaiting': queue, 'QueueLength': queue,
+        'CumulativeReward': np.zeros(len(t)), 'CurrentReward': reward[prev], 'CurrentPhase': phase[k],
+        'GreenLightTime': green[prev], 'FuelConsumed': np.zeros(len(t)), 'AverageWaitTime': np.zeros(len(t)),
+    }
+    return episodes, intervals, rewards
+
+
+def _static_chunk(ctrl, n_episodes, max_reward_rows):
+    rng = ctrl.rng
+    episode, start, duration, _, _ = ctrl.episodes(n_episodes)
+    end = start + duration
+    vehicles = total_vehicles(end)
+    phase, green = ctrl.static_phase(end)
+    episodes = {
+        'IntersectionId': np.full(len(episode), ctrl.intersection_id),
+        'Episode': episode, 'TotalVehicles': vehicles, 'VehiclesWaiting': ctrl.waiting(end),
+        'EpisodeDuration': duration, 'AverageWaitTime': np.zeros(len(episode)),
+        'Throughput': vehicles / np.maximum(end, 1.0), 'CurrentPhase': phase, 'PhaseGreenTime': green,
+        'FuelConsumed': np.zeros(len(episode)),
+    }
+
+    t = ctrl.log_times(end[-1], jitter=1.0)
+    k = np.maximum(np.searchsorted(start, t, side='right') - 1, 0)
+    vehicles = total_vehicles(t)
+    queue = ctrl.waiting(t)
+    phase, green = ctrl.static_phase(t)
+    intervals = {
+        'IntersectionId': np.full(len(t), ctrl.intersection_id),
+        'SimulationTime': t, 'Episode': episode[k], 'TotalVehicles': vehicles, 'VehiclesWaiting': queue,
+        'QueueLength': queue, 'AverageWaitTime': np.zeros(len(t)),
+        'Throughput': np.maximum(ARRIVAL_RATE * _demand(t) + rng.normal(0, 0.05, len(t)), 0.0),
+        'CurrentPhase': phase, 'PhaseGreenTime': green, 'PhaseDuration': green,
+        'FuelConsumed': np.zeros(len(t)), 'VehiclesDeparted': np.maximum(vehicles - queue, 0),
+        'TrafficDensity': vehicles,
+    }
+
+    # Written every second by LogMetrics
+    n = int(min(max(end[-1] - ctrl.reward_time, 0), max_reward_rows))
+    seconds = ctrl.reward_time + 1 + np.arange(n)
+    ctrl.reward_time += n
+    steps = ctrl.reward_step + 1 + np.arange(n)
+    ctrl.reward_step += n
+    k = np.maximum(np.searchsorted(start, seconds, side='right') - 1, 0)
+    rewards = {
+        'Step': steps, 'Episode': episode[k], 'TotalVehicles': total_vehicles(seconds),
+        'VehiclesWaiting': ctrl.waiting(seconds), 'SimulationTime': seconds + rng.uniform(0, 0.05, n),
+    }
+    return episodes, intervals, rewards
+
+
+def _write_intersection(output_dir, rows, headers, rng, intersection_id, chunk_rows):
+    """Write the six logs of one intersection; returns file name -> rows written"""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    writers = {name: _CsvWriter(output_dir / name, header) for name, header in headers.items()}
+    try:
+        for kind, prefix in (('ml', ''), ('static', 'static_')):
+            ctrl = _Controller(kind, rng, intersection_id)
+            episode_seconds = PHASE_GREEN_TIMES.mean() if kind == 'ml' else STATIC_EPISODE_SECONDS
+            intervals_written = 0
+            while intervals_written < rows:
+                remaining = rows - intervals_written
+                n_episodes = max(int(min(remaining, chunk_rows) * LOGGING_INTERVAL / episode_seconds), 1)
+                if kind == 'ml':
+                    chunk = _ml_chunk(ctrl, n_episodes)
+                else:
+                    reward_rows = rows - writers['static_reward_progress.csv'].rows
+                    chunk = _static_chunk(ctrl, n_episodes, reward_rows)
+                episodes, intervals, rewards = chunk
+                if len(intervals['SimulationTime']) > remaining:
+                    # Stop exactly at `rows`; the episode still running then has not been logged
+                    last = intervals['SimulationTime'][remaining - 1]
+                    intervals = {k: v[:remaining] for k, v in intervals.items()}
+                    keep = episodes['Episode'] < intervals['Episode'][-1]
+                    episodes = {k: v[keep] for k, v in episodes.items()}
+                    if kind == 'ml':
+                        keep_rewards = rewards['Episode'] < intervals['Episode'][-1]
+                    else:
+                        keep_rewards = rewards['SimulationTime'] <= last
+                    rewards = {k: v[keep_rewards] for k, v in rewards.items()}
+                writers[f'{prefix}episode_results.csv'].write(episodes)
+                writers[f'{prefix}interval_data.csv'].write(intervals)
+                writers[f'{prefix}reward_progress.csv'].write(rewards)
+                intervals_written += len(intervals['SimulationTime'])
+    finally:
+        for writer in writers.values():
+            writer.close()
+    return {name: writer.rows for name, writer in writers.items()}
+
+
+def generate_logs(output_dir, rows, schema='csvlogger', seed=0, chunk_rows=DEFAULT_CHUNK_ROWS, intersections=1):
+    """
+    Write synthetic ML and static logs with `rows` rows per interval log
+
+    Both controllers run over the same demand curve. Episode and reward logs
+    keep their Unity cadence relative to the interval log (an ML episode per
+    decision, a static episode per 30 s), except the static reward log,
+    written every second in Unity, which is capped at `rows` rows. Files are
+    generated and written chunk by chunk, so memory stays flat at any size.
+
+    Args:
+        output_dir: Directory for the six CSVs
+        rows: Interval rows per controller (e.g. 10**3 to 10**8)
+        schema: 'csvlogger' for the current CsvLogger headers, 'sample' for
+            the wider headers of the checked-in sample CSVs
+        seed: Seed for every random draw
+        chunk_rows: Interval rows generated per chunk
+        intersections: With more than one, each intersection gets its own
+            intersection_<id>/ directory of `rows`-row logs, as Unity writes them
+
+    Returns:
+        Dict of file path (relative to output_dir) -> rows written
+    """
+    if schema not in SCHEMAS:
+        raise ValueError(f"schema must be one of {sorted(SCHEMAS)}")
+    output_dir = Path(output_dir)
+    headers = SCHEMAS[schema]
+
+    if intersections == 1:
+        counts = _write_intersection(output_dir, rows, headers, np.random.default_rng(seed), 0, chunk_rows)
+    else:
+        counts = {}
+        for intersection_id in range(intersections):
+            directory = f'intersection_{intersection_id}'
+            written = _write_intersection(output_dir / directory, rows, headers,
+                                          np.random.default_rng([seed, intersection_id]), intersection_id,
+                                          chunk_rows)
+            counts.update({f'{directory}/{name}': n for name, n in written.items()})
+
+    with open(output_dir / SYNTHETIC_META, 'w') as f:
+        json.dump({'rows': rows, 'schema': schema, 'seed': seed, 'intersections': intersections,
+                   'files': counts}, f, indent=2)
+    return counts
+
+
+def existing_logs(output_dir, rows, schema='csvlogger', seed=0, intersections=1):
+    """Row counts of logs already generated with these settings, None otherwise"""
+    try:
+        with open(Path(output_dir) / SYNTHETIC_META) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    settings = (meta.get('rows'), meta.get('schema'), meta.get('seed'), meta.get('intersections', 1))
+    if settings != (rows, schema, seed, intersections):
+        return None
+    if not all((Path(output_dir) / name).exists() for name in meta.get('files', {})):
+        return None
+    return meta['files']
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate synthetic ML and static logs at scale')
+    parser.add_argument('--rows', type=float, default=1e6, help='Interval rows per controller, e.g. 1e8')
+    parser.add_argument('--output-dir', default='synthetic')
+    parser.add_argument('--schema', choices=sorted(SCHEMAS), default='csvlogger')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument('--intersections', type=int, default=1, help='Intersections, each in its own directory')
+    args = parser.parse_args()
+
+    counts = generate_logs(args.output_dir, int(args.rows), args.schema, args.seed, args.chunk_rows,
+                           args.intersections)
+    for name, n in counts.items():
+        print(f"  {name}: {n} rows")
+    print(f"✅ Synthetic logs written to {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The analysis scripts import each other as flat siblings
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
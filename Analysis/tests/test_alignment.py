@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from alignment import resample
+
+
+@pytest.fixture
+def run():
+    return pd.DataFrame({'SimulationTime': [10.0, 20.0, 30.0, 50.0], 'QueueLength': [2.0, 4.0, 1.0, 3.0]})
+
+
+def test_asof_takes_the_last_row_at_or_before(run):
+    out = resample(run, np.array([5.0, 10.0, 15.0, 29.9, 30.0, 45.0, 60.0]), 'asof')
+    np.testing.assert_array_equal(out[:, 1], [np.nan, 2.0, 2.0, 4.0, 1.0, 1.0, 3.0])
+    np.testing.assert_array_equal(out[1:, 0], [10.0, 10.0, 20.0, 30.0, 30.0, 50.0])
+
+
+def test_linear_interpolates_between_neighbours(run):
+    out = resample(run, np.array([5.0, 15.0, 40.0, 50.0, 55.0]), 'linear')
+    np.testing.assert_allclose(out[:, 1], [np.nan, 3.0, 2.0, 3.0, np.nan])
+    np.testing.assert_allclose(out[1:4, 0], [15.0, 40.0, 50.0])
+
+
+def test_tolerance_blanks_points_far_from_their_row(run):
+    grid = np.array([12.0, 45.0])
+    np.testing.assert_array_equal(resample(run, grid, 'asof', tolerance=10.0)[:, 1], [2.0, np.nan])
+    np.testing.assert_array_equal(resample(run, grid, 'nearest', tolerance=10.0)[:, 1], [2.0, 3.0])
+
+
+def test_unknown_method_is_rejected(run):
+    with pytest.raises(ValueError, match='method must be one of'):
+        resample(run, np.array([10.0]), 'cubic')
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from binary_log import _HEADER, read_binary_log, write_binary_log
+from streaming_stats import stream_csvs
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({
+        'Episode': np.arange(50, dtype=np.int32),
+        'SimulationTime': np.linspace(0, 490, 50, dtype=np.float32),
+        'CurrentReward': np.linspace(-1, 1, 50),
+    })
+
+
+def test_round_trip(tmp_path, frame):
+    log = read_binary_log(write_binary_log(frame, tmp_path / 'interval_data.tslog'))
+    assert log.columns == list(frame.columns)
+    assert len(log) == len(frame)
+    pd.testing.assert_frame_equal(log.to_frame(copy=True), frame)
+
+
+def test_to_frame_selects_columns_without_copying(tmp_path, frame):
+    log = read_binary_log(write_binary_log(frame, tmp_path / 'interval_data.tslog'))
+    df = log.to_frame(['SimulationTime', 'Missing'])
+    assert list(df.columns) == ['SimulationTime']
+    assert np.shares_memory(df['SimulationTime'].to_numpy(), log['SimulationTime'])
+    assert not np.shares_memory(log.to_frame(copy=True)['Episode'].to_numpy(), log['Episode'])
+
+
+def test_wrapped_ring_buffer_is_chronological(tmp_path):
+    capacity, written = 8, 13
+    # Record i of the simulation sits in slot i % capacity
+    slots = np.empty(capacity, dtype=np.int32)
+    for i in range(written):
+        slots[i % capacity] = i
+    path = write_binary_log(pd.DataFrame({'Episode': slots}), tmp_path / 'ring.tslog')
+    with open(path, 'r+b') as f:
+        header = bytearray(f.read(_HEADER.size))
+        fields = list(_HEADER.unpack_from(header))
+        fields[-2:] = [capacity, written]
+        _HEADER.pack_into(header, 0, *fields)
+        f.seek(0)
+        f.write(header)
+
+    log = read_binary_log(path)
+    assert log.wrapped
+    np.testing.assert_array_equal(log['Episode'], np.arange(written - capacity, written))
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / 'interval_data.tslog'
+    path.write_bytes(b'SimulationTime,QueueLength\n' * 4)
+    with pytest.raises(ValueError):
+        read_binary_log(path)
+
+
+def test_stream_csvs_reads_binary_only_logs(tmp_path, frame):
+    write_binary_log(frame, tmp_path / 'interval_data.tslog')
+    summary = stream_csvs([tmp_path / 'interval_data.csv'], ['CurrentReward'], chunksize=7)
+    assert summary.rows == len(frame)
+    assert summary.stats['CurrentReward'].mean == pytest.approx(frame['CurrentReward'].mean())
+    assert summary.stats['CurrentReward'].std == pytest.approx(frame['CurrentReward'].std())
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from convergence import ConvergenceDetector
+
+
+def test_slope_matches_polyfit_over_the_window():
+    rng = np.random.default_rng(0)
+    rewards = 0.05 * np.arange(300) + rng.normal(size=300)
+    detector = ConvergenceDetector(window=50)
+    for reward in rewards:
+        detector.update(reward)
+
+    expected = np.polyfit(np.arange(251, 301), rewards[-50:], 1)[0]
+    assert detector.slope() == pytest.approx(expected, rel=1e-6)
+
+
+def test_slope_needs_three_points():
+    detector = ConvergenceDetector()
+    detector.update(1.0)
+    detector.update(2.0)
+    assert np.isnan(detector.slope())
+
+
+def test_cusum_flags_a_level_shift():
+    rng = np.random.default_rng(1)
+    rewards = np.concatenate([rng.normal(0, 1, 300), rng.normal(5, 1, 100)])
+    detector = ConvergenceDetector(window=50)
+    changes = [update['Episode'] for update in map(detector.update, rewards) if update['Changepoint']]
+    assert changes
+    assert 300 < changes[0] <= 320
+
+
+def test_stationary_noise_plateaus_and_stops():
+    rng = np.random.default_rng(2)
+    detector = ConvergenceDetector(window=100, tolerance=1.0, patience=50, min_episodes=100)
+    updates = [detector.update(reward) for reward in rng.normal(3, 1, 400)]
+    assert not any(update['Changepoint'] for update in updates)
+    # First full window at episode 100, then 50 plateau episodes of patience
+    assert next(update['Episode'] for update in updates if update['Stop']) == 149
+    assert detector.state()['stop']
+
+
+def test_trending_rewards_do_not_stop():
+    detector = ConvergenceDetector(window=50, patience=20, min_episodes=50)
+    for episode in range(400):
+        detector.update(0.5 * episode + np.sin(episode))
+    assert not detector.stop
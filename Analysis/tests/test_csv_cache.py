@@ -0,0 +1,52 @@
+import os
+
+import pandas as pd
+
+from csv_cache import _cached_key, cache_path_for, clear_cache, read_csv_cached, source_key
+
+
+def _write(path, rows):
+    pd.DataFrame({'Episode': range(1, rows + 1), 'QueueLength': [r % 4 for r in range(rows)]}).to_csv(
+        path, index=False)
+
+
+def test_cache_is_written_typed_and_reused(tmp_path):
+    csv = tmp_path / 'interval_data.csv'
+    _write(csv, 5)
+    df = read_csv_cached(csv)
+    assert cache_path_for(csv).exists()
+    assert _cached_key(cache_path_for(csv)) == source_key(csv)
+    assert str(df['Episode'].dtype) == 'int32'
+
+    cached = read_csv_cached(csv, ['QueueLength', 'Missing'])
+    assert list(cached.columns) == ['QueueLength']
+    pd.testing.assert_series_equal(cached['QueueLength'], df['QueueLength'])
+
+
+def test_changed_csv_rebuilds_the_cache(tmp_path):
+    csv = tmp_path / 'interval_data.csv'
+    _write(csv, 5)
+    read_csv_cached(csv)
+    _write(csv, 8)
+    assert len(read_csv_cached(csv)) == 8
+    assert _cached_key(cache_path_for(csv)) == source_key(csv)
+
+
+def test_same_size_rewrite_is_detected_by_mtime(tmp_path):
+    csv = tmp_path / 'interval_data.csv'
+    _write(csv, 5)
+    read_csv_cached(csv)
+    stat = os.stat(csv)
+    csv.write_text(csv.read_text().replace('1,0', '1,3'))
+    os.utime(csv, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert os.stat(csv).st_size == stat.st_size
+    assert read_csv_cached(csv)['QueueLength'].iloc[0] == 3
+
+
+def test_clear_cache_removes_cache_files(tmp_path):
+    csv = tmp_path / 'interval_data.csv'
+    _write(csv, 3)
+    read_csv_cached(csv)
+    assert clear_cache(tmp_path) == 1
+    assert not cache_path_for(csv).exists()
+    assert csv.exists()
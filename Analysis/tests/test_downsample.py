@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from downsample import lttb_downsample, minmax_downsample
+
+
+def _series(n=10_000, seed=0):
+    rng = np.random.default_rng(seed)
+    x = np.sort(rng.uniform(0, 1000, n))
+    return x, np.cumsum(rng.normal(size=n))
+
+
+def test_minmax_keeps_every_bucket_extreme():
+    x, y = _series()
+    n_buckets = 100
+    dx, dy = minmax_downsample(x, y, n_buckets)
+
+    bucket = np.clip(np.floor((x - x.min()) * n_buckets / (x.max() - x.min())), 0, n_buckets - 1)
+    extremes = pd.Series(y).groupby(bucket).agg(['min', 'max'])
+    kept = set(zip(dx, dy))
+    for b, row in extremes.iterrows():
+        in_bucket = bucket == b
+        assert (x[in_bucket][y[in_bucket].argmin()], row['min']) in kept
+        assert (x[in_bucket][y[in_bucket].argmax()], row['max']) in kept
+    assert len(dx) <= 2 * n_buckets + 2
+    assert (dx[0], dx[-1]) == (x[0], x[-1])
+    assert np.all(np.diff(dx) >= 0)
+
+
+def test_minmax_buckets_on_x_not_row_count():
+    # Dense samples in the first 1% of x must not take most of the buckets
+    x = np.concatenate([np.linspace(0, 10, 9000), np.linspace(10, 1000, 1000)[1:]])
+    y = np.sin(x)
+    dx, _ = minmax_downsample(x, y, 50)
+    assert (dx > 10).sum() > (dx <= 10).sum()
+
+
+def test_minmax_uses_the_given_x_range():
+    x, y = _series()
+    dx, _ = minmax_downsample(x, y, 10, x_range=(0, 10_000))
+    # The data covers only the first of ten equal-width buckets of the range
+    assert len(dx) <= 4
+
+
+def test_minmax_returns_short_series_unchanged_without_nan():
+    x = np.array([0.0, 1.0, np.nan, 3.0])
+    dx, dy = minmax_downsample(x, x * 2, 10)
+    np.testing.assert_array_equal(dx, [0.0, 1.0, 3.0])
+    np.testing.assert_array_equal(dy, [0.0, 2.0, 6.0])
+
+
+@pytest.mark.parametrize('n_out', [3, 50, 999])
+def test_lttb_point_count_and_endpoints(n_out):
+    x, y = _series(1000)
+    dx, dy = lttb_downsample(x, y, n_out)
+    assert len(dx) == n_out
+    assert (dx[0], dy[0], dx[-1], dy[-1]) == (x[0], y[0], x[-1], y[-1])
+    assert np.all(np.diff(dx) > 0)
+    assert set(dx) <= set(x)
+
+
+def test_lttb_keeps_a_spike():
+    x = np.arange(1000, dtype=np.float64)
+    y = np.zeros(1000)
+    y[437] = 100.0
+    _, dy = lttb_downsample(x, y, 20)
+    assert dy.max() == 100.0
@@ -0,0 +1,49 @@
+import pandas as pd
+
+from incremental import TailReader
+
+
+HEADER = 'SimulationTime,QueueLength\n'
+
+
+def test_only_appended_complete_rows_are_parsed(tmp_path):
+    csv = tmp_path / 'interval_data.csv'
+    csv.write_text(HEADER + '10.0,2\n20.0,3\n')
+    reader = TailReader(csv)
+    assert reader.read_new_rows()['QueueLength'].tolist() == [2, 3]
+
+    # CsvLogger rewrites the whole file with the new rows appended
+    csv.write_text(HEADER + '10.0,2\n20.0,3\n30.0,1\n40.0,')
+    rows = reader.read_new_rows()
+    assert not reader.rewritten
+    assert rows['SimulationTime'].tolist() == [30.0]
+
+    csv.write_text(HEADER + '10.0,2\n20.0,3\n30.0,1\n40.0,5\n')
+    assert reader.read_new_rows()['QueueLength'].tolist() == [5]
+    assert reader.read_new_rows().empty
+
+
+def test_changed_prefix_restarts_from_the_top(tmp_path):
+    csv = tmp_path / 'interval_data.csv'
+    csv.write_text(HEADER + '10.0,2\n20.0,3\n')
+    reader = TailReader(csv)
+    reader.read_new_rows()
+
+    # A new session: the file grew, but its first rows changed
+    csv.write_text(HEADER + '10.0,7\n20.0,8\n30.0,9\n')
+    rows = reader.read_new_rows()
+    assert reader.rewritten
+    assert rows['QueueLength'].tolist() == [7, 8, 9]
+
+    csv.write_text(HEADER + '10.0,1\n')
+    rows = reader.read_new_rows()
+    assert reader.rewritten
+    assert rows['QueueLength'].tolist() == [1]
+
+
+def test_intersection_id_is_attached(tmp_path):
+    csv = tmp_path / 'interval_data.csv'
+    csv.write_text(HEADER + '10.0,2\n')
+    rows = TailReader(csv, intersection_id=3).read_new_rows()
+    assert rows['IntersectionId'].tolist() == [3]
+    pd.testing.assert_index_equal(rows.columns, pd.Index(['SimulationTime', 'QueueLength', 'IntersectionId']))
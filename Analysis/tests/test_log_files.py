@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from incremental import IncrementalAnalysis
+from log_files import log_path, read_log
+from throughput import interval_departures
+
+
+def _intervals(intersection=0, offset=0.0):
+    return pd.DataFrame({
+        'IntersectionId': intersection,
+        'SimulationTime': np.array([10.0, 20.0, 30.0, 40.0, 50.0]) + offset,
+        'TotalVehicles': [5, 9, 12, 3, 8],
+        'QueueLength': [2, 4, 1, 1, 2],
+    })
+
+
+def test_pooled_intersections_are_differenced_separately():
+    single, _ = interval_departures(_intervals())
+    pooled = pd.concat([_intervals(0), _intervals(1, offset=0.5)], ignore_index=True)
+    pooled = pooled.sort_values('SimulationTime', kind='stable', ignore_index=True)
+    departed, elapsed = interval_departures(pooled)
+    for intersection in (0, 1):
+        rows = (pooled['IntersectionId'] == intersection).to_numpy()
+        np.testing.assert_array_equal(departed[rows], single)
+        np.testing.assert_array_equal(elapsed[rows], [0, 10, 10, 10, 10])
+
+
+def test_read_log_finds_intersection_directories(tmp_path):
+    for intersection in (0, 1):
+        directory = tmp_path / f'intersection_{intersection}'
+        directory.mkdir()
+        _intervals(intersection, intersection / 2).drop(columns='IntersectionId').to_csv(
+            directory / 'interval_data.csv', index=False)
+
+    pooled = read_log(tmp_path, 'interval_data.csv', use_cache=False)
+    assert len(pooled) == 10
+    assert pooled['SimulationTime'].is_monotonic_increasing
+    assert sorted(pooled['IntersectionId'].unique()) == [0, 1]
+
+    only = read_log(tmp_path, 'interval_data.csv', ['QueueLength'], use_cache=False, intersection=1)
+    assert set(only.columns) == {'IntersectionId', 'QueueLength'}
+    assert (only['IntersectionId'] == 1).all()
+    assert log_path(tmp_path, 'interval_data.csv') == tmp_path / 'intersection_0' / 'interval_data.csv'
+    with pytest.raises(FileNotFoundError):
+        read_log(tmp_path, 'episode_results.csv')
+
+
+def test_incremental_analysis_pools_intersection_directories(tmp_path):
+    for intersection in (0, 1):
+        directory = tmp_path / f'intersection_{intersection}'
+        directory.mkdir()
+        _intervals(intersection).to_csv(directory / 'interval_data.csv', index=False)
+
+    pooled = IncrementalAnalysis(tmp_path, ['interval_data.csv'])
+    assert pooled.refresh() == {'interval_data.csv': 10}
+    assert pooled.summary('interval_data.csv').stats['QueueLength'].count == 10
+
+    only_one = IncrementalAnalysis(tmp_path, ['interval_data.csv'], intersection=1)
+    assert only_one.refresh() == {'interval_data.csv': 5}
+    assert only_one.summary('interval_data.csv').stats['QueueLength'].mean == pytest.approx(2.0)
@@ -0,0 +1,62 @@
+import pandas as pd
+import pytest
+
+from metrics_graph import MetricsGraph
+
+
+@pytest.fixture
+def inputs():
+    return {'ml': pd.DataFrame({'QueueLength': [1.0, 2.0, 3.0]}),
+            'static': pd.DataFrame({'QueueLength': [2.0, 4.0]})}
+
+
+@pytest.fixture
+def graph(inputs):
+    def mean(graph, name):
+        return graph.input(name)['QueueLength'].mean()
+
+    def difference(graph):
+        return graph.get('mean', 'ml') - graph.get('mean', 'static')
+
+    return MetricsGraph({'mean': mean, 'difference': difference}, inputs.__getitem__, max_entries=8)
+
+
+def test_values_are_memoized(graph):
+    assert graph.get('difference') == pytest.approx(-1.0)
+    assert graph.get('difference') == pytest.approx(-1.0)
+    assert graph.counts['misses'] == 3
+    assert graph.counts['hits'] == 1
+
+
+def test_changed_input_recomputes_only_its_dependents(graph, inputs):
+    graph.get('difference')
+    inputs['static'] = pd.DataFrame({'QueueLength': [1.0, 1.0]})
+    misses = graph.counts['misses']
+    assert graph.get('difference') == pytest.approx(1.0)
+    # 'difference' and the static mean are recomputed, the ML mean is reused
+    assert graph.counts['misses'] - misses == 2
+    assert graph.get('mean', 'ml') == pytest.approx(2.0)
+    assert graph.counts['misses'] - misses == 2
+
+
+def test_reread_identical_input_keeps_the_cache(graph, inputs):
+    graph.get('difference')
+    inputs['ml'] = inputs['ml'].copy()
+    misses = graph.counts['misses']
+    graph.get('difference')
+    assert graph.counts['misses'] == misses
+
+
+def test_invalidate_drops_dependents(graph):
+    graph.get('difference')
+    graph.invalidate('ml')
+    assert len(graph) == 1
+    graph.invalidate()
+    assert len(graph) == 0
+
+
+def test_least_recently_used_values_are_evicted(graph):
+    graph.max_entries = 2
+    graph.get('difference')
+    assert len(graph) == 2
+    assert graph.counts['evictions'] == 1
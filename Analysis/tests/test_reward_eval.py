@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from reward_eval import FEATURES, evaluate_rewards, kpi_proxy
+
+
+@pytest.fixture
+def features():
+    rng = np.random.default_rng(0)
+    table = pd.DataFrame(rng.uniform(0, 5, (6, len(FEATURES))), columns=FEATURES)
+    table.loc[[1, 4], 'Throughput'] = np.nan
+    return table
+
+
+def test_nan_feature_only_voids_candidates_weighting_it(features):
+    candidates = {'queue': {'QueueLength': -1.0},
+                  'throughput': {'Throughput': 2.0, 'QueueLength': -1.0},
+                  'custom': lambda f: f['DepartureRate'] * 60}
+    rewards = evaluate_rewards(features, candidates)
+
+    assert list(rewards.columns) == list(candidates)
+    np.testing.assert_allclose(rewards['queue'], -features['QueueLength'])
+    np.testing.assert_allclose(rewards['custom'], features['DepartureRate'] * 60)
+    expected = 2 * features['Throughput'] - features['QueueLength']
+    assert rewards['throughput'].isna().tolist() == expected.isna().tolist()
+    np.testing.assert_allclose(rewards['throughput'].dropna(), expected.dropna())
+
+
+def test_unknown_feature_is_rejected(features):
+    with pytest.raises(ValueError, match='Unknown reward features'):
+        evaluate_rewards(features, {'bad': {'Speed': 1.0}})
+
+
+def test_kpi_proxies_include_restated_features():
+    assert kpi_proxy({'QueueLength': -2.0}) == 'NegQueueLength'
+    assert kpi_proxy({'WaitRate': -1.0}) == 'NegQueueLength'
+    assert kpi_proxy({'DepartureRate': 60.0, 'QueueLength': -1.0}) == ''
+    assert kpi_proxy(lambda f: f['QueueLength']) == ''
@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+
+from significance import (MIN_OBSERVATIONS, bootstrap_means, compare_metric, effect_sizes, mann_whitney,
+                          moments, welch_test)
+
+
+def _improvement(metric, ml_mean, static_mean):
+    return (ml_mean - static_mean) / static_mean * 100
+
+
+@pytest.fixture
+def samples():
+    rng = np.random.default_rng(0)
+    return rng.normal(10.0, 2.0, 80), rng.normal(9.0, 3.0, 120)
+
+
+def test_bootstrap_means_centre_and_spread(samples):
+    a, _ = samples
+    means = bootstrap_means(a, 20_000, np.random.default_rng(1))
+    assert means.mean() == pytest.approx(a.mean(), abs=0.02)
+    assert means.std() == pytest.approx(a.std(ddof=0) / np.sqrt(len(a)), rel=0.05)
+
+
+def test_bootstrap_means_is_reproducible_and_batched(samples, monkeypatch):
+    a, _ = samples
+    reference = bootstrap_means(a, 1000, np.random.default_rng(5))
+    monkeypatch.setattr('significance.MAX_BATCH_ELEMENTS', len(a) * 7)
+    np.testing.assert_array_equal(bootstrap_means(a, 1000, np.random.default_rng(5)), reference)
+
+
+@pytest.mark.parametrize('n', range(MIN_OBSERVATIONS))
+def test_too_few_observations_give_nan(n):
+    assert np.isnan(bootstrap_means(np.ones(n), 10)).all()
+    row = compare_metric('QueueLength', np.arange(n, dtype=float), [1.0, 2.0, 3.0], _improvement, 100)
+    for column in ('ML_Mean_CI_Low', 'ML_Mean_CI_High', 'Improvement_CI_Low', 'Welch_p', 'Cohens_d'):
+        assert np.isnan(row[column])
+    assert row['Static_Mean_CI_Low'] <= 2.0 <= row['Static_Mean_CI_High']
+
+
+def test_welch_matches_formula(samples):
+    a, b = samples
+    t, dof, p = welch_test(a, b)
+    va, vb = a.var(ddof=1) / len(a), b.var(ddof=1) / len(b)
+    assert t == pytest.approx((a.mean() - b.mean()) / np.sqrt(va + vb))
+    assert dof == pytest.approx((va + vb) ** 2 / (va ** 2 / (len(a) - 1) + vb ** 2 / (len(b) - 1)))
+    assert 0 < p < 0.05
+
+
+def test_mann_whitney_u_counts_pairs():
+    a = np.array([1.0, 2.0, 2.0, 5.0, 7.0])
+    b = np.array([2.0, 3.0, 4.0, 4.0])
+    u, p = mann_whitney(a, b)
+    pairs = (a[:, None] > b[None, :]).sum() + 0.5 * (a[:, None] == b[None, :]).sum()
+    assert u == pytest.approx(pairs)
+    assert 0 < p <= 1
+
+
+def test_effect_sizes_match_pooled_formula(samples):
+    a, b = samples
+    d, g, rank_biserial = effect_sizes(a, b)
+    pooled = np.sqrt(((len(a) - 1) * a.var(ddof=1) + (len(b) - 1) * b.var(ddof=1)) / (len(a) + len(b) - 2))
+    assert d == pytest.approx((a.mean() - b.mean()) / pooled)
+    assert g == pytest.approx(d * (1 - 3 / (4 * (len(a) + len(b)) - 9)))
+    assert -1 <= rank_biserial <= 1
+
+
+def test_compare_metric_interval_covers_the_means(samples):
+    a, b = samples
+    row = compare_metric('TotalVehicles', a, b, _improvement, 2000, seed=3)
+    assert row['ML_Mean_CI_Low'] < a.mean() < row['ML_Mean_CI_High']
+    assert row['Static_Mean_CI_Low'] < b.mean() < row['Static_Mean_CI_High']
+    assert row['Improvement_CI_Low'] < _improvement(None, a.mean(), b.mean()) < row['Improvement_CI_High']
+
+
+def test_exact_moments_drive_welch_and_cohens_d(samples):
+    a, b = samples
+    row = compare_metric('QueueLength', a[::4], b[::4], _improvement, 2000, seed=3,
+                         ml_moments=moments(a), static_moments=moments(b))
+    t, dof, p = welch_test(a, b)
+    assert (row['Welch_t'], row['Welch_df'], row['Welch_p']) == pytest.approx((t, dof, p))
+    d, g, _ = effect_sizes(a, b)
+    assert (row['Cohens_d'], row['Hedges_g']) == pytest.approx((-d, -g))
+    assert row['Sampled']
+
+    full = compare_metric('QueueLength', a, b, _improvement, 2000, seed=3)
+    assert not full['Sampled']
+    width = row['ML_Mean_CI_High'] - row['ML_Mean_CI_Low']
+    assert row['ML_Mean_CI_Low'] < a.mean() < row['ML_Mean_CI_High']
+    assert width == pytest.approx(full['ML_Mean_CI_High'] - full['ML_Mean_CI_Low'], rel=0.25)
+
+
+def test_effect_sizes_are_positive_when_ml_is_better(samples):
+    a, b = samples
+    lower = compare_metric('QueueLength', b - 5, b, _improvement, 100)
+    higher = compare_metric('TotalVehicles', b + 5, b, _improvement, 100, higher_is_better=True)
+    for row in (lower, higher):
+        assert row['Cohens_d'] > 0 and row['Hedges_g'] > 0 and row['Rank_Biserial'] > 0
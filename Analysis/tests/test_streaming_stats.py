@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from streaming_stats import RunningStats, TimeBuckets, stream_csv, stream_csvs
+
+
+def test_running_stats_matches_numpy_across_chunks():
+    rng = np.random.default_rng(1)
+    values = rng.normal(1e6, 3.0, 10_001)
+    stats = RunningStats()
+    for chunk in np.array_split(values, 7):
+        stats.update(chunk)
+
+    assert stats.count == len(values)
+    assert stats.mean == pytest.approx(values.mean(), rel=1e-12)
+    assert stats.var == pytest.approx(values.var(ddof=1), rel=1e-9)
+    assert (stats.min, stats.max) == (values.min(), values.max())
+
+
+def test_running_stats_skips_nan_and_bounds_the_sample():
+    stats = RunningStats(reservoir_size=100)
+    stats.update([1.0, np.nan, 3.0])
+    stats.update(np.arange(1000, dtype=np.float64))
+
+    reference = pd.Series([1.0, np.nan, 3.0, *range(1000)])
+    assert stats.count == reference.count()
+    assert stats.std == pytest.approx(reference.std())
+    assert len(stats.sample) == 100
+
+
+def test_single_value_has_no_std():
+    stats = RunningStats()
+    stats.update([5.0])
+    assert stats.summary()['mean'] == 5.0
+    assert np.isnan(stats.std)
+
+
+def test_time_buckets_match_groupby_after_coarsening():
+    rng = np.random.default_rng(2)
+    times = np.sort(rng.uniform(0, 500, 2000))
+    values = rng.normal(size=len(times))
+    buckets = TimeBuckets(max_buckets=64, initial_width=1.0)
+    for t, v in zip(np.array_split(times, 5), np.array_split(values, 5)):
+        buckets.update(t, v)
+
+    assert buckets.width == 8.0
+    centres, means, mins, maxs = buckets.series()
+    grouped = pd.Series(values).groupby(times // buckets.width).agg(['mean', 'min', 'max'])
+    np.testing.assert_allclose(centres, (grouped.index + 0.5) * buckets.width)
+    np.testing.assert_allclose(means, grouped['mean'])
+    np.testing.assert_array_equal(mins, grouped['min'])
+    np.testing.assert_array_equal(maxs, grouped['max'])
+
+
+def test_stream_csv_matches_pandas(tmp_path):
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame({'SimulationTime': np.arange(1000) * 10.0, 'Episode': np.arange(1000) // 100,
+                       'QueueLength': rng.integers(0, 20, 1000)})
+    path = tmp_path / 'interval_data.csv'
+    df.to_csv(path, index=False)
+
+    summary = stream_csv(path, chunksize=128)
+    assert len(summary) == len(df)
+    stats = summary.summary('QueueLength')
+    assert stats['mean'] == pytest.approx(df['QueueLength'].mean())
+    assert stats['std'] == pytest.approx(df['QueueLength'].std())
+    episodes = summary.episode_reductions()
+    np.testing.assert_allclose(episodes['mean']['QueueLength'], df.groupby('Episode')['QueueLength'].mean())
+
+
+def test_stream_csvs_pools_and_selects_intersections(tmp_path):
+    paths = []
+    for intersection in (0, 1):
+        df = pd.DataFrame({'IntersectionId': intersection, 'SimulationTime': [10.0, 20.0],
+                           'QueueLength': [intersection, intersection + 2]})
+        paths.append(tmp_path / f'{intersection}.csv')
+        df.to_csv(paths[-1], index=False)
+
+    assert stream_csvs(paths).summary('QueueLength')['mean'] == pytest.approx(1.5)
+    only = stream_csvs(paths, ['QueueLength'], intersection=1)
+    assert len(only) == 2
+    assert only.summary('QueueLength')['mean'] == pytest.approx(2.0)
+    assert only.summary('QueueLength')['min'] == 1
@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from throughput import cumulative_departures, interval_departures
+
+
+def _intervals(intersection=0, offset=0.0):
+    # Current interval header: no VehiclesDeparted, waiting logged as QueueLength
+    return pd.DataFrame({
+        'IntersectionId': intersection,
+        'SimulationTime': np.array([10.0, 20.0, 30.0, 40.0, 50.0]) + offset,
+        'TotalVehicles': [5, 9, 12, 3, 8],
+        'QueueLength': [2, 4, 1, 1, 2],
+    })
+
+
+def test_departures_from_total_minus_queue():
+    np.testing.assert_array_equal(cumulative_departures(_intervals()), [3, 5, 11, 2, 6])
+
+
+def test_missing_columns_are_named():
+    with pytest.raises(ValueError, match='VehiclesDeparted'):
+        cumulative_departures(pd.DataFrame({'SimulationTime': [1.0]}))
+
+
+def test_restart_counts_from_zero():
+    departed, elapsed = interval_departures(_intervals())
+    # TotalVehicles drops at the fourth row: the logger restarted
+    np.testing.assert_array_equal(departed, [0, 2, 6, 2, 4])
+    np.testing.assert_array_equal(elapsed, [0, 10, 10, 10, 10])
+
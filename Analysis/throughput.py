@@ -1,32 +1,219 @@
+import argparse
+from pathlib import Path
+
+import numpy as np
 import pandas as pd
 
-def safe_divide(a, b):
-    # Avoid division by zero and infinite values
-    res = a / b
-    return res.replace([float('inf'), -float('inf')], pd.NA)
-
-# Filenames
-ml_csv = 'episode_results.csv'
-static_csv = 'static_episode_results.csv'
-time_cols = ['GreenLightTime', 'PhaseGreenTime']
-
-def calc_avg_throughput(csv_path):
-    df = pd.read_csv(csv_path)
-    denom_col = None
-    for col in time_cols:
-        if col in df.columns:
-            denom_col = col
-            break
-    if denom_col is None or 'VehiclesWaiting' not in df.columns:
-        print(f"❌ Required columns missing in {csv_path}")
-        return None
-    throughput = safe_divide(df['VehiclesWaiting'], df[denom_col])
-    avg_throughput = throughput.mean(skipna=True) * 60 # Convert to per minute
-    print(f"{csv_path} average throughput ({denom_col}): {avg_throughput:.4f}")
-    return avg_throughput
-
-# Run calculation for both CSVs
-ml_avg = calc_avg_throughput(ml_csv)
-static_avg = calc_avg_throughput(static_csv)
-improvement = (ml_avg - static_avg) / static_avg if static_avg else None
-print(f"Improvement: {improvement:.4%}" if improvement is not None else "Improvement: N/A")
\ No newline at end of file
+from log_files import read_log
+
+
+# Default inputs: the ML and static interval logs
+DEFAULT_CSVS = ['interval_data.csv', 'static_interval_data.csv']
+THROUGHPUT_COLUMNS = ['SimulationTime', 'Episode', 'CurrentPhase', 'TotalVehicles',
+                      'VehiclesWaiting', 'QueueLength', 'VehiclesDeparted', 'PhaseDuration',
+                      'GreenLightTime', 'PhaseGreenTime']
+# Columns that hold the active phase's green time, in order of preference
+PHASE_TIME_COLUMNS = ['PhaseDuration', 'PhaseGreenTime', 'GreenLightTime']
+# Vehicles still in the intersection: episode logs call it VehiclesWaiting,
+# interval logs QueueLength (both IntersectionDataCalculator.TotalNumberOfVehiclesWaitingInIntersection)
+WAITING_COLUMNS = ['VehiclesWaiting', 'QueueLength']
+DEFAULT_WINDOW = 300.0
+
+
+def _waiting_column(df):
+    return next((c for c in WAITING_COLUMNS if c in df.columns), None)
+
+
+def cumulative_departures(df):
+    """
+    Cumulative number of vehicles that cleared the intersection
+
+    Vehicles that entered (TotalVehicles) minus those still waiting, which
+    both controllers log, so ML and static runs are measured the same way.
+    VehiclesDeparted is only used for logs without those columns.
+    """
+    waiting = _waiting_column(df)
+    if 'TotalVehicles' in df.columns and waiting:
+        return (df['TotalVehicles'] - df[waiting]).to_numpy(dtype=np.float64)
+    if 'VehiclesDeparted' in df.columns:
+        return df['VehiclesDeparted'].to_numpy(dtype=np.float64)
+    raise ValueError(f"Need TotalVehicles and one of {WAITING_COLUMNS}, or VehiclesDeparted; "
+                     f"got {list(df.columns)}")
+
+
+def previous_row(df, values):
+    """
+    values shifted one row within each IntersectionId, NaN on an
+    intersection's first row
+
+    Logs concatenated across intersection_<id>/ files interleave
+    intersections, so a row's predecessor is the previous row of the same
+    intersection, not the row above it.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if 'IntersectionId' in df.columns and df['IntersectionId'].nunique() > 1:
+        return pd.Series(values).groupby(df['IntersectionId'].to_numpy(), dropna=False).shift().to_numpy()
+    return np.concatenate([[np.nan], values[:-1]])
+
+
+def _step(df, values):
+    values = np.asarray(values, dtype=np.float64)
+    previous = previous_row(df, values)
+    return np.where(np.isnan(previous), 0.0, values - previous)
+
+
+def interval_departures(df):
+    """
+    Per-row departures and elapsed seconds since the previous row
+
+    Differences are taken per IntersectionId; an intersection's first row
+    has none. A counter that goes backwards (logger restarted) counts from
+    zero again. For TotalVehicles minus waiting only a drop in TotalVehicles
+    is a restart: a queue growing faster than arrivals gives a negative
+    step, which is kept so that sums over any span stay exact.
+    """
+    departed = cumulative_departures(df)
+    d_departed = _step(df, departed)
+    if 'TotalVehicles' in df.columns and _waiting_column(df):
+        restarted = _step(df, df['TotalVehicles']) < 0
+    else:
+        restarted = d_departed < 0
+    d_departed = np.where(restarted, departed, d_departed)
+    d_time = _step(df, df['SimulationTime'])
+    d_time = np.where(d_time < 0, 0.0, d_time)
+    return d_departed, d_time
+
+
+def prepare(df):
+    """Add Departed and Elapsed columns to an interval DataFrame"""
+    df = df.copy()
+    df['Departed'], df['Elapsed'] = interval_departures(df)
+    phase_col = next((c for c in PHASE_TIME_COLUMNS if c in df.columns), None)
+    df['PhaseTime'] = df[phase_col] if phase_col else np.nan
+    return df
+
+
+def _per_minute(grouped):
+    table = grouped.agg(Departed=('Departed', 'sum'), Elapsed=('Elapsed', 'sum'),
+                        Intervals=('Departed', 'size'), MeanPhaseTime=('PhaseTime', 'mean'))
+    table['VehiclesPerMinute'] = (table['Departed'] / table['Elapsed'].replace(0, np.nan)) * 60
+    return table.reset_index()
+
+
+def overall_throughput(data):
+    """Vehicles per minute over the whole log, one row per run"""
+    return _per_minute(data.groupby('Run', sort=False))
+
+
+def phase_throughput(data):
+    """Vehicles per minute while each phase was active, per run"""
+    return _per_minute(data.groupby(['Run', 'CurrentPhase'], sort=False))
+
+
+def episode_throughput(data):
+    """Vehicles per minute within each episode, per run"""
+    return _per_minute(data.groupby(['Run', 'Episode'], sort=False))
+
+
+def rolling_throughput(df, window=DEFAULT_WINDOW):
+    """
+    Vehicles per minute over a trailing time window at every row
+
+    Vectorized with searchsorted on the cumulative departure counter, so it is
+    O(n log n) regardless of window size.
+    """
+    times = df['SimulationTime'].to_numpy(dtype=np.float64)
+    departed = np.cumsum(df['Departed'].to_numpy(dtype=np.float64))
+    start = np.searchsorted(times, times - window, side='left')
+    span = times - times[start]
+    rate = np.divide(departed - departed[start], span, out=np.full(len(times), np.nan), where=span > 0)
+    return pd.Series(rate * 60, index=df.index, name='RollingVehiclesPerMinute')
+
+
+def load_runs(csv_paths, intersection=None):
+    """
+    Load any number of interval CSVs into one DataFrame keyed by 'Run'
+
+    Runs are labelled by file stem, or parent/stem when stems collide. A
+    path that a multi-intersection scene wrote as intersection_<id>/<name>
+    reads every intersection (or only `intersection`), so rates are per
+    intersection.
+    """
+    paths = [Path(p) for p in csv_paths]
+    stems = [p.stem for p in paths]
+    frames = []
+    for path in paths:
+        label = f'{path.parent.name}/{path.stem}' if stems.count(path.stem) > 1 else path.stem
+        df = prepare(read_log(path.parent, path.name, THROUGHPUT_COLUMNS, intersection=intersection))
+        df['Run'] = label
+        frames.append(df)
+    return pd.concat(frames, ignore_index=True)
+
+
+def throughput_report(csv_paths, window=DEFAULT_WINDOW, intersection=None):
+    """
+    Compute overall, per-phase, per-episode and rolling throughput for many runs
+
+    Returns:
+        Dict of DataFrames: 'overall', 'phase', 'episode' and 'rolling'
+    """
+    data = load_runs(csv_paths, intersection)
+    keys = ['Run', 'IntersectionId'] if 'IntersectionId' in data.columns else ['Run']
+    rolling = data.groupby(keys, sort=False, group_keys=False, dropna=False).apply(
+        lambda run: rolling_throughput(run, window))
+    return {
+        'overall': overall_throughput(data),
+        'phase': phase_throughput(data),
+        'episode': episode_throughput(data),
+        'rolling': data[keys + ['SimulationTime']].assign(RollingVehiclesPerMinute=rolling),
+    }
+
+
+def print_report(report, output=None):
+    """
+    Print a throughput_report and optionally save its tables
+
+    Args:
+        report: Dict returned by throughput_report
+        output: Prefix for CSV outputs (<prefix>_overall.csv, _phase.csv, ...)
+    """
+    overall = report['overall']
+
+    print("\nOverall throughput (vehicles/min):")
+    print(overall.to_string(index=False, float_format='%.4f'))
+    print("\nPer-phase throughput (vehicles/min):")
+    print(report['phase'].sort_values(['Run', 'CurrentPhase']).to_string(index=False, float_format='%.4f'))
+
+    per_episode = report['episode'].groupby('Run', sort=False)['VehiclesPerMinute']
+    print("\nPer-episode throughput (vehicles/min):")
+    print(per_episode.describe()[['mean', 'std', 'min', 'max']].to_string(float_format='%.4f'))
+
+    if len(overall) >= 2:
+        ml_avg = overall['VehiclesPerMinute'].iloc[0]
+        static_avg = overall['VehiclesPerMinute'].iloc[-1]
+        improvement = (ml_avg - static_avg) / static_avg if static_avg else None
+        print(f"\nImprovement: {improvement:.4%}" if improvement is not None else "\nImprovement: N/A")
+
+    if output:
+        for name, table in report.items():
+            table.to_csv(f'{output}_{name}.csv', index=False)
+        print(f"\n📊 Throughput tables saved with prefix '{output}'")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Vehicles-per-minute throughput from interval logs')
+    parser.add_argument('csvs', nargs='*', default=DEFAULT_CSVS,
+                        help='Interval CSVs; the improvement compares the first against the last')
+    parser.add_argument('--window', type=float, default=DEFAULT_WINDOW,
+                        help='Rolling window in simulation seconds')
+    parser.add_argument('--output', default=None,
+                        help='Prefix for CSV outputs (<prefix>_overall.csv, _phase.csv, ...)')
+    parser.add_argument('--intersection', type=int, default=None,
+                        help='Only this IntersectionId (default: every intersection)')
+    args = parser.parse_args()
+
+    print_report(throughput_report(args.csvs, args.window, args.intersection), args.output)
+
+
+if __name__ == "__main__":
+    main()
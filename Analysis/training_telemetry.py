@@ -0,0 +1,206 @@
+import argparse
+import hashlib
+import json
+from pathlib import Path
+
+import pandas as pd
+
+from csv_cache import pq
+
+TIMERS_FILE = 'timers.json'
+TRAINING_STATUS_FILE = 'training_status.json'
+RUN_CONFIG = 'configuration.yaml'
+DEFAULT_ROOT = '../Assets/results'
+INDEX = ['Run', 'Source', 'Name', 'Statistic']
+
+# Trainer stages, keyed by the ML-Agents timer that starts them. The first
+# match going down the tree claims the whole subtree, so nothing is counted twice.
+STAGE_TIMERS = {
+    'run_training.setup': 'setup',
+    'TrainerController._reset_env': 'env_reset',
+    'TorchPolicy.evaluate': 'policy_inference',
+    'communicator.exchange': 'env_step',
+    'env_step': 'env_step',
+    'process_trajectory': 'trajectory_processing',
+    '_update_policy': 'policy_update',
+    'TrainerController._save_models': 'model_save',
+    'RLTrainer._checkpoint': 'model_save',
+}
+STAGES = ['setup', 'env_reset', 'env_step', 'policy_inference', 'trajectory_processing',
+          'policy_update', 'model_save', 'other']
+
+
+def config_hash(run_dir):
+    """Short hash of the run's ML-Agents configuration.yaml, if present"""
+    path = Path(run_dir) / RUN_CONFIG
+    if not path.exists():
+        return ''
+    return hashlib.sha1(path.read_bytes()).hexdigest()[:10]
+
+
+def discover_runs(root=DEFAULT_ROOT):
+    """Run directories below root: any directory with a run_logs/timers.json"""
+    return sorted(path.parent.parent for path in Path(root).rglob(f'run_logs/{TIMERS_FILE}'))
+
+
+def flatten_timers(node, path='root', depth=0):
+    """
+    Yield (path, depth, node) for every timer in an ML-Agents timer tree
+
+    Subtrees marked is_parallel ran in worker processes and overlap the main
+    thread's time, so callers usually skip them when summing wall time.
+    """
+    yield path, depth, node
+    for name, child in node.get('children', {}).items():
+        yield from flatten_timers(child, f'{path}/{name}', depth + 1)
+
+
+def stage_seconds(tree):
+    """
+    Wall time per trainer stage for one timer tree
+
+    Walks the main-thread tree; a node named in STAGE_TIMERS claims its total.
+    env_step claims whatever its children (policy inference) do not. Whatever
+    the root spends outside every stage is 'other'.
+    """
+    seconds = dict.fromkeys(STAGES, 0.0)
+
+    def claim(node, name):
+        stage = STAGE_TIMERS.get(name)
+        if name == 'env_step':
+            inner = sum(claim(child, child_name) for child_name, child in node.get('children', {}).items()
+                        if not child.get('is_parallel'))
+            seconds['env_step'] += node.get('total', 0.0) - inner
+            return node.get('total', 0.0)
+        if stage is not None:
+            seconds[stage] += node.get('total', 0.0)
+            return node.get('total', 0.0)
+        return sum(claim(child, child_name) for child_name, child in node.get('children', {}).items()
+                   if not child.get('is_parallel'))
+
+    claimed = claim(tree, tree.get('name', 'root'))
+    seconds['other'] = max(tree.get('total', 0.0) - claimed, 0.0)
+    return seconds
+
+
+def _rows(run, source, name, stats, behavior=''):
+    return [{'Run': run, 'Source': source, 'Behavior': behavior, 'Name': name,
+             'Statistic': stat, 'Value': float(value)}
+            for stat, value in stats.items() if value is not None]
+
+
+def ingest_run(run_dir):
+    """
+    Flatten one run's timers.json and training_status.json into long rows
+
+    Sources: 'timer' (total/self/count per tree path), 'stage' (seconds and
+    fraction of wall time), 'gauge' (value/min/max/count), 'checkpoint'
+    (reward/creation_time per step count) and 'derived' (steps per second).
+
+    Returns:
+        DataFrame with Run, Source, Behavior, Name, Statistic and Value columns
+    """
+    run_dir = Path(run_dir)
+    run = run_dir.name
+    with open(run_dir / 'run_logs' / TIMERS_FILE) as f:
+        timers = json.load(f)
+    gauges = timers.pop('gauges', {})
+    metadata = timers.pop('metadata', {})
+
+    rows = []
+    for path, depth, node in flatten_timers(timers):
+        rows += _rows(run, 'timer', path, {'total': node.get('total'), 'self': node.get('self'),
+                                           'count': node.get('count'), 'depth': depth,
+                                           'is_parallel': node.get('is_parallel', False)})
+
+    wall = timers.get('total', 0.0)
+    for stage, seconds in stage_seconds(timers).items():
+        rows += _rows(run, 'stage', stage, {'seconds': seconds,
+                                            'fraction': seconds / wall if wall else None})
+
+    steps = {}
+    for name, gauge in gauges.items():
+        behavior, _, metric = name.partition('.')
+        rows += _rows(run, 'gauge', metric, {k: gauge.get(k) for k in ('value', 'min', 'max', 'count')},
+                      behavior)
+        if metric == 'Step.mean':
+            # Step is absolute; a resumed run starts at its checkpoint's step
+            steps[behavior] = gauge.get('value', 0) - gauge.get('min', 0)
+
+    status_path = run_dir / 'run_logs' / TRAINING_STATUS_FILE
+    if status_path.exists():
+        with open(status_path) as f:
+            status = json.load(f)
+        for behavior, entry in status.items():
+            if behavior == 'metadata':
+                continue
+            for checkpoint in entry.get('checkpoints', []):
+                rows += _rows(run, 'checkpoint', str(checkpoint['steps']),
+                              {'reward': checkpoint.get('reward'),
+                               'creation_time': checkpoint.get('creation_time')}, behavior)
+
+    for behavior, step in steps.items():
+        rows += _rows(run, 'derived', 'steps_per_second', {'value': step / wall if wall and step > 0 else None}, behavior)
+
+    table = pd.DataFrame(rows)
+    table['StartTime'] = pd.to_numeric(metadata.get('start_time_seconds'), errors='coerce')
+    table['MLAgentsVersion'] = metadata.get('mlagents_version', '')
+    table['Config'] = config_hash(run_dir)
+    return table
+
+
+def ingest_runs(root=DEFAULT_ROOT):
+    """
+    One long telemetry table for every run below root, indexed by
+    (Run, Source, Name, Statistic) and sorted so index slices are cheap
+    """
+    frames = [ingest_run(run_dir) for run_dir in discover_runs(root)]
+    if not frames:
+        raise FileNotFoundError(f"No run_logs/{TIMERS_FILE} found under {root}")
+    table = pd.concat(frames, ignore_index=True)
+    for col in ('Run', 'Source', 'Behavior', 'Statistic', 'Config', 'MLAgentsVersion'):
+        table[col] = table[col].astype('category')
+    return table.set_index(INDEX).sort_index()
+
+
+def stage_breakdown(table):
+    """Seconds and share of wall time per stage, one row per run (wide)"""
+    stages = table.xs('stage', level='Source')['Value'].unstack('Statistic')
+    seconds = stages['seconds'].unstack('Name').reindex(columns=STAGES)
+    fraction = stages['fraction'].unstack('Name').reindex(columns=STAGES)
+    seconds['Dominant'] = fraction.idxmax(axis=1)
+    seconds['DominantShare'] = fraction.max(axis=1)
+    return seconds
+
+
+def save_table(table, path):
+    """Write the table as parquet when pyarrow is available, CSV otherwise"""
+    path = Path(path)
+    if pq is None and path.suffix == '.parquet':
+        path = path.with_suffix('.csv')
+    if path.suffix == '.parquet':
+        table.to_parquet(path)
+    else:
+        table.to_csv(path)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Flatten ML-Agents run telemetry across runs')
+    parser.add_argument('--root', default=DEFAULT_ROOT, help='Directory searched for run_logs/timers.json')
+    parser.add_argument('--output', default='training_telemetry.parquet')
+    args = parser.parse_args()
+
+    table = ingest_runs(args.root)
+    breakdown = stage_breakdown(table)
+    path = save_table(table, args.output)
+
+    print("\nWall time per trainer stage (seconds):")
+    print(breakdown.to_string(float_format='%.2f'))
+    for run, row in breakdown.iterrows():
+        print(f"⚠️ {run}: {row['Dominant']} takes {row['DominantShare']:.1%} of wall time")
+    print(f"\n📊 Telemetry for {len(breakdown)} runs saved to {path}")
+
+
+if __name__ == "__main__":
+    main()
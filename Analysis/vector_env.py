@@ -0,0 +1,362 @@
+import argparse
+import multiprocessing as mp
+import time
+
+import numpy as np
+
+from surrogate_sim import DEFAULT_ARRIVAL_RATE, DEFAULT_SATURATION_RATE, calibrate
+
+try:
+    import gymnasium
+    from gymnasium import spaces
+    _VectorEnvBase = gymnasium.vector.VectorEnv
+except ImportError:  # the environment still works, just without space objects
+    gymnasium = None
+    spaces = None
+    _VectorEnvBase = object
+
+
+# ML_DATA and phase settings from Assets/Prefabs/Roads/4-Way-Type-1.prefab
+OFSET = 1
+NUM_OF_LEGS = 4
+NUM_OF_VEHICLES_PER_LEG = 15
+NUM_OF_OBSERVATIONS_PER_VEHICLE = 2
+MINIMUM_GREEN_LIGHT_OFSET = 10.0
+MAXIMUM_GREEN_LIGHT_OFSET = 10.0
+PHASE_GREEN_TIMES = (40.0, 20.0, 30.0)
+# MLSignalTimingOptimizationSO
+REWARD_MULTIPLYER = 500
+OBSERVATION_SIZE = OFSET + NUM_OF_LEGS * NUM_OF_VEHICLES_PER_LEG * NUM_OF_OBSERVATIONS_PER_VEHICLE
+# time_horizon in Assets/configs/fourWay1.yaml
+DEFAULT_EPISODE_STEPS = 64
+
+# Geometry of a queued vehicle: distance to the intersection centre
+STOP_LINE_DISTANCE = 12.0
+VEHICLE_SPACING = 7.5
+QUEUE_CAPACITY = 128
+# Length of pre-drawn traffic when scenarios are shared (wraps around)
+SCENARIO_SECONDS = 10_800
+LAYOUTS = ('unity', 'dense')
+
+
+class TrafficVectorEnv(_VectorEnvBase):
+    """
+    N four-leg intersections stepped in lockstep with NumPy
+
+    One step is one decision of TrafficSignalMlAgent: the action in [-1, 1]
+    picks the next phase's green time exactly like ChangeToNextPhaseWithTimeInterpolate,
+    the intersections run for that many 1-second ticks, and the observation and
+    reward are built the way MLSignalTimingOptimizationSO.CalculateRewards does
+    at the end of the green. Vehicles queue per leg (FIFO ring buffers of arrival
+    times) with Poisson arrivals and a Poisson saturation discharge while green.
+
+    Args:
+        num_envs: Intersections stepped together
+        arrival_rates: (n_legs,) or (num_envs, n_legs) arrivals per second per leg
+        saturation_rate: Vehicles per second a green leg can discharge
+        phase_legs: (n_phases, n_legs) bool matrix of legs each phase serves
+        layout: 'unity' reproduces the agent's observation indexing exactly
+                (including its overlapping writes) so policies transfer;
+                'dense' gives every leg its own distance and wait block
+        max_episode_steps: Decisions per episode; episodes are cut without
+                           resetting traffic, like the agent's EndEpisode
+        scenarios: Pre-draw this many traffic scenarios and run env i on
+                   scenario i % scenarios, so policies compared on the same
+                   scenario see identical arrivals (common random numbers)
+        seed: Random seed
+    """
+
+    def __init__(self, num_envs=1, arrival_rates=None, saturation_rate=DEFAULT_SATURATION_RATE,
+                 phase_legs=None, phase_green_times=PHASE_GREEN_TIMES, layout='unity',
+                 max_episode_steps=DEFAULT_EPISODE_STEPS, queue_capacity=QUEUE_CAPACITY,
+                 scenarios=None, seed=None):
+        if layout not in LAYOUTS:
+            raise ValueError(f"layout must be one of {LAYOUTS}")
+        self.num_envs = num_envs
+        self.layout = layout
+        self.max_episode_steps = max_episode_steps
+        self.saturation_rate = saturation_rate
+        self.queue_capacity = queue_capacity
+        self.scenarios = scenarios
+        self.phase_green_times = np.asarray(phase_green_times, dtype=np.float64)
+        n_phases = len(self.phase_green_times)
+        if arrival_rates is None:
+            arrival_rates = np.full(NUM_OF_LEGS, DEFAULT_ARRIVAL_RATE / NUM_OF_LEGS)
+        self.arrival_rates = np.broadcast_to(np.asarray(arrival_rates, dtype=np.float64),
+                                             (num_envs, NUM_OF_LEGS)).copy()
+        if phase_legs is None:
+            phase_legs = np.arange(NUM_OF_LEGS)[None, :] % n_phases == np.arange(n_phases)[:, None]
+        self.phase_legs = np.asarray(phase_legs, dtype=bool)
+        if self.phase_legs.shape != (n_phases, NUM_OF_LEGS):
+            raise ValueError(f"phase_legs must be {(n_phases, NUM_OF_LEGS)}, got {self.phase_legs.shape}")
+
+        if spaces is not None:
+            self.single_observation_space = spaces.Box(-1.0, np.inf, (OBSERVATION_SIZE,), np.float32)
+            self.single_action_space = spaces.Box(-1.0, 1.0, (1,), np.float32)
+            self.observation_space = spaces.Box(-1.0, np.inf, (num_envs, OBSERVATION_SIZE), np.float32)
+            self.action_space = spaces.Box(-1.0, 1.0, (num_envs, 1), np.float32)
+
+        self._rng = np.random.default_rng(seed)
+        self._allocate()
+
+    def _draw_scenarios(self):
+        """Arrival and discharge draws per (scenario, second, leg), indexed by each env's clock"""
+        scenario = np.arange(self.num_envs) % self.scenarios
+        shape = (self.scenarios, SCENARIO_SECONDS, NUM_OF_LEGS)
+        rates = self.arrival_rates[np.arange(self.scenarios) % self.num_envs]
+        self._scenario = scenario
+        self._arrival_table = self._rng.poisson(rates[:, None, :], size=shape)
+        self._capacity_table = self._rng.poisson(self.saturation_rate, size=shape)
+
+    def _allocate(self):
+        shape = (self.num_envs, NUM_OF_LEGS)
+        self.arrival_times = np.zeros(shape + (self.queue_capacity,))
+        self.head = np.zeros(shape, dtype=np.int64)
+        self.count = np.zeros(shape, dtype=np.int64)
+        self.total_vehicles = np.zeros(self.num_envs, dtype=np.int64)
+        self.clock = np.zeros(self.num_envs)
+        self.phase = np.zeros(self.num_envs, dtype=np.int64)
+        self.green_time = self.phase_green_times[self.phase].copy()
+        self.last_total = np.zeros(self.num_envs, dtype=np.int64)
+        self.last_time = np.zeros(self.num_envs)
+        self.episode_steps = np.zeros(self.num_envs, dtype=np.int64)
+        self.observations = np.zeros((self.num_envs, OBSERVATION_SIZE), dtype=np.float32)
+        if self.scenarios:
+            self._draw_scenarios()
+
+    def reset(self, seed=None, options=None):
+        if seed is not None:
+            self._rng = np.random.default_rng(seed)
+        self._allocate()
+        self._observe()
+        return self.observations.copy(), {}
+
+    def green_light_time(self, actions):
+        """Green time for the next phase from actions in [-1, 1] (Mathf.Lerp clamps)"""
+        t = np.clip((np.asarray(actions, dtype=np.float64).reshape(self.num_envs) + 1) / 2, 0, 1)
+        base = self.phase_green_times[(self.phase + 1) % len(self.phase_green_times)]
+        low = base - MINIMUM_GREEN_LIGHT_OFSET
+        high = base + MAXIMUM_GREEN_LIGHT_OFSET
+        return np.floor(low + (high - low) * t)
+
+    def step(self, actions):
+        self.green_time = np.maximum(self.green_light_time(actions), 1)
+        self.phase = (self.phase + 1) % len(self.phase_green_times)
+        green = self.phase_legs[self.phase]
+        for tick in range(int(self.green_time.max())):
+            self._tick(green & (tick < self.green_time)[:, None], tick < self.green_time)
+
+        rewards = self._calculate_rewards()
+        self.episode_steps += 1
+        truncations = self.episode_steps >= self.max_episode_steps
+        self.episode_steps[truncations] = 0
+        terminations = np.zeros(self.num_envs, dtype=bool)
+        infos = {'green_time': self.green_time.copy(), 'phase': self.phase.copy(),
+                 'vehicles_waiting': self.count.sum(axis=1)}
+        return self.observations.copy(), rewards, terminations, truncations, infos
+
+    def _tick(self, green, active):
+        """Advance the active intersections by one second"""
+        if self.scenarios:
+            second = self.clock.astype(np.int64) % SCENARIO_SECONDS
+            arrivals = self._arrival_table[self._scenario, second]
+            capacity = self._capacity_table[self._scenario, second]
+        else:
+            arrivals = self._rng.poisson(self.arrival_rates)
+            capacity = self._rng.poisson(self.saturation_rate, size=self.count.shape)
+        self.clock += active
+        arrivals = np.where(active[:, None], arrivals, 0)
+        arrivals = np.minimum(arrivals, self.queue_capacity - self.count)
+        for k in range(int(arrivals.max(initial=0))):
+            adding = arrivals > k
+            slot = (self.head + self.count) % self.queue_capacity
+            env, leg = np.nonzero(adding)
+            self.arrival_times[env, leg, slot[adding]] = self.clock[env]
+            self.count += adding
+        self.total_vehicles += arrivals.sum(axis=1)
+
+        served = np.where(green, np.minimum(self.count, capacity), 0)
+        self.head = (self.head + served) % self.queue_capacity
+        self.count -= served
+
+    def _queued(self):
+        """Distances and waits of the first NUM_OF_VEHICLES_PER_LEG vehicles, -1 padded"""
+        j = np.arange(NUM_OF_VEHICLES_PER_LEG)
+        slots = (self.head[..., None] + j) % self.queue_capacity
+        present = j < self.count[..., None]
+        waits = self.clock[:, None, None] - np.take_along_axis(self.arrival_times, slots, axis=2)
+        distances = np.broadcast_to(STOP_LINE_DISTANCE + VEHICLE_SPACING * j, present.shape)
+        return (np.where(present, distances, -1).astype(np.float32),
+                np.where(present, waits, -1).astype(np.float32), present)
+
+    def _observe(self):
+        distances, waits, present = self._queued()
+        obs = self.observations
+        V = NUM_OF_VEHICLES_PER_LEG
+        if self.layout == 'dense':
+            obs[:, 0] = self.phase
+            blocks = np.concatenate([distances, waits], axis=2)
+            obs[:, OFSET:] = blocks.reshape(self.num_envs, -1)
+            return
+
+        # CheckVehicles indexes with (legIndex * observationIndex) + j + OFSET, so legs
+        # overwrite each other; replay its writes in order. Within one letIndex pass
+        # a slot written by both branches keeps the value from the larger j.
+        for leg in range(NUM_OF_LEGS):
+            obs[:, OFSET:OFSET + V] = distances[:, leg]
+            for let in range(NUM_OF_LEGS):
+                valid = obs[:, OFSET + leg:OFSET + leg + V]
+                pad = obs[:, OFSET + let:OFSET + let + V]
+                if let < leg:
+                    valid[...] = np.where(present[:, leg], waits[:, leg], valid)
+                    pad[...] = np.where(present[:, leg], pad, -1)
+                else:
+                    pad[...] = np.where(present[:, leg], pad, -1)
+                    valid[...] = np.where(present[:, leg], waits[:, leg], valid)
+
+    def _calculate_rewards(self):
+        elapsed = self.clock - self.last_time
+        throughput = np.divide(self.total_vehicles - self.last_total, elapsed,
+                               out=np.zeros(self.num_envs), where=elapsed > 0)
+        self.last_time = self.clock.copy()
+        self.last_total = self.total_vehicles.copy()
+        self._observe()
+
+        V = NUM_OF_VEHICLES_PER_LEG
+        if self.layout == 'dense':
+            waits = self.observations[:, OFSET:].reshape(self.num_envs, NUM_OF_LEGS, 2, V)[:, :, 1]
+        else:
+            # The reward loop reads the same overlapping (legIndex * 1) + j + OFSET slots
+            waits = np.stack([self.observations[:, OFSET + leg:OFSET + leg + V]
+                              for leg in range(NUM_OF_LEGS)], axis=1)
+        penalty = np.where(waits >= 0, waits, 0).sum(axis=(1, 2))
+        return (throughput * REWARD_MULTIPLYER - penalty).astype(np.float32)
+
+    def close(self, **kwargs):
+        pass
+
+
+def _worker(conn, num_envs, kwargs):
+    env = TrafficVectorEnv(num_envs, **kwargs)
+    try:
+        while True:
+            command, data = conn.recv()
+            if command == 'step':
+                conn.send(env.step(data))
+            elif command == 'reset':
+                conn.send(env.reset(seed=data))
+            elif command == 'close':
+                break
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        conn.close()
+
+
+class SubprocVectorEnv:
+    """
+    TrafficVectorEnv split over worker processes, one lockstep batch per core
+
+    Actions are sent to every worker before any result is collected, so the
+    workers step their batches concurrently.
+
+    Args:
+        num_envs: Total intersections
+        workers: Worker processes (defaults to all cores, at most num_envs)
+        seed: Base seed; worker i uses seed + i
+        **kwargs: TrafficVectorEnv options
+    """
+
+    def __init__(self, num_envs, workers=None, seed=0, **kwargs):
+        workers = min(workers or mp.cpu_count() or 1, num_envs)
+        self.num_envs = num_envs
+        self.sizes = [len(part) for part in np.array_split(np.arange(num_envs), workers)]
+        self.splits = np.cumsum(self.sizes)[:-1]
+        ctx = mp.get_context('spawn')
+        self.conns, self.processes = [], []
+        for i, size in enumerate(self.sizes):
+            parent, child = ctx.Pipe()
+            process = ctx.Process(target=_worker, args=(child, size, dict(kwargs, seed=seed + i)),
+                                  daemon=True)
+            process.start()
+            child.close()
+            self.conns.append(parent)
+            self.processes.append(process)
+
+    def reset(self, seed=None, options=None):
+        for i, conn in enumerate(self.conns):
+            conn.send(('reset', None if seed is None else seed + i))
+        results = [conn.recv() for conn in self.conns]
+        return np.concatenate([obs for obs, _ in results]), {}
+
+    def step(self, actions):
+        parts = np.split(np.asarray(actions).reshape(self.num_envs, -1), self.splits)
+        for conn, part in zip(self.conns, parts):
+            conn.send(('step', part))
+        results = [conn.recv() for conn in self.conns]
+        obs, rewards, terminations, truncations, infos = zip(*results)
+        merged = {key: np.concatenate([info[key] for info in infos]) for key in infos[0]}
+        return (np.concatenate(obs), np.concatenate(rewards), np.concatenate(terminations),
+                np.concatenate(truncations), merged)
+
+    def close(self):
+        for conn in self.conns:
+            try:
+                conn.send(('close', None))
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self.processes:
+            process.join(timeout=5)
+
+
+def make_env(num_envs=1, workers=1, calibrate_csv=None, **kwargs):
+    """
+    Build an in-process or multi-process environment
+
+    Args:
+        num_envs: Total intersections
+        workers: 1 keeps everything in this process
+        calibrate_csv: Interval log to take arrival and saturation rates from
+        **kwargs: TrafficVectorEnv options
+    """
+    if calibrate_csv:
+        rates = calibrate(calibrate_csv, NUM_OF_LEGS)
+        kwargs.setdefault('arrival_rates', rates['arrival_rates'])
+        kwargs.setdefault('saturation_rate', rates['saturation_rate'])
+    if workers == 1:
+        return TrafficVectorEnv(num_envs, **kwargs)
+    return SubprocVectorEnv(num_envs, workers, **kwargs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the batched traffic signal environment')
+    parser.add_argument('--envs', type=int, default=64)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--steps', type=int, default=500, help='Decisions per intersection')
+    parser.add_argument('--layout', choices=LAYOUTS, default='unity')
+    parser.add_argument('--calibrate', default=None, help='Interval log to calibrate rates from')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    env = make_env(args.envs, args.workers, args.calibrate, layout=args.layout, seed=args.seed)
+    rng = np.random.default_rng(args.seed)
+    env.reset(seed=args.seed)
+    simulated = 0.0
+    rewards = []
+    start = time.perf_counter()
+    for _ in range(args.steps):
+        actions = rng.uniform(-1, 1, size=(args.envs, 1)).astype(np.float32)
+        _, reward, _, _, info = env.step(actions)
+        simulated += info['green_time'].sum()
+        rewards.append(reward.mean())
+    elapsed = time.perf_counter() - start
+    env.close()
+
+    decisions = args.envs * args.steps
+    print(f"🚀 {decisions} decisions in {elapsed:.2f}s: {decisions / elapsed:,.0f} steps/s, "
+          f"{simulated / elapsed:,.0f} simulated seconds per wall second")
+    print(f"📊 Mean reward under random actions: {np.mean(rewards):.2f}")
+
+
+if __name__ == "__main__":
+    main()
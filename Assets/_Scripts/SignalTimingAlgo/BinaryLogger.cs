@@ -0,0 +1,136 @@
+using System;
+using System.IO;
+using System.Text;
+using UnityEngine;
+
+public enum BinaryColumnType : byte {
+    Float32 = (byte)'f',
+    Int32 = (byte)'i',
+    Float64 = (byte)'d'
+}
+
+// Fixed-record binary log read by Analysis/binary_log.py.
+//
+// Layout (little-endian):
+//   0   char[8]  magic "TSBLOG01"
+//   8   uint32   format version
+//   12  uint32   header size (records start here, multiple of 64)
+//   16  uint32   record size in bytes
+//   20  uint32   column count
+//   24  uint64   capacity in records (0 = append-only, otherwise ring buffer)
+//   32  uint64   records written so far
+//   64  column descriptors: 31-byte UTF-8 name (NUL padded) + 1-byte type code
+// Each row is appended as one packed record, so the history is never re-serialised.
+public class BinaryLogger : IDisposable {
+    public const int FixedHeaderSize = 64;
+    public const int ColumnDescriptorSize = 32;
+    public const uint FormatVersion = 1;
+    private static readonly byte[] Magic = Encoding.ASCII.GetBytes("TSBLOG01");
+    private const long RecordsWrittenOffset = 32;
+
+    private readonly string filePath;
+    private readonly FileStream stream;
+    private readonly BinaryColumnType[] columnTypes;
+    private readonly byte[] record;
+    private readonly BinaryWriter recordWriter;
+    private readonly int headerSize;
+    private readonly long capacity;
+    private long recordsWritten;
+
+    public BinaryLogger(string fileName, string[] columnNames, BinaryColumnType[] columnTypes, long capacity = 0) {
+        if (columnNames.Length != columnTypes.Length) {
+            throw new ArgumentException("Every column needs exactly one type");
+        }
+
+        filePath = Path.Combine(Application.persistentDataPath, fileName);
+        Directory.CreateDirectory(Path.GetDirectoryName(filePath));
+        this.columnTypes = columnTypes;
+        this.capacity = capacity;
+
+        int recordSize = 0;
+        foreach (var type in columnTypes) {
+            recordSize += type == BinaryColumnType.Float64 ? 8 : 4;
+        }
+        record = new byte[recordSize];
+        recordWriter = new BinaryWriter(new MemoryStream(record));
+
+        int rawHeaderSize = FixedHeaderSize + ColumnDescriptorSize * columnNames.Length;
+        headerSize = (rawHeaderSize + 63) / 64 * 64;
+
+        // FileShare.Read lets the Python reader map the file while we keep appending
+        stream = new FileStream(filePath, FileMode.Create, FileAccess.ReadWrite, FileShare.Read);
+        WriteHeader(columnNames, recordSize);
+    }
+
+    private void WriteHeader(string[] columnNames, int recordSize) {
+        var header = new byte[headerSize];
+        using (var writer = new BinaryWriter(new MemoryStream(header))) {
+            writer.Write(Magic);
+            writer.Write(FormatVersion);
+            writer.Write((uint)headerSize);
+            writer.Write((uint)recordSize);
+            writer.Write((uint)columnNames.Length);
+            writer.Write((ulong)capacity);
+            writer.Write((ulong)0);
+
+            for (int i = 0; i < columnNames.Length; i++) {
+                writer.Seek(FixedHeaderSize + i * ColumnDescriptorSize, SeekOrigin.Begin);
+                byte[] name = Encoding.UTF8.GetBytes(columnNames[i]);
+                writer.Write(name, 0, Math.Min(name.Length, ColumnDescriptorSize - 1));
+                writer.Seek(FixedHeaderSize + (i + 1) * ColumnDescriptorSize - 1, SeekOrigin.Begin);
+                writer.Write((byte)columnTypes[i]);
+            }
+        }
+        stream.Write(header, 0, header.Length);
+        stream.Flush();
+    }
+
+    public void LogRow(params object[] values) {
+        recordWriter.Seek(0, SeekOrigin.Begin);
+        for (int i = 0; i < columnTypes.Length; i++) {
+            switch (columnTypes[i]) {
+                case BinaryColumnType.Float32:
+                    recordWriter.Write(Convert.ToSingle(values[i]));
+                    break;
+                case BinaryColumnType.Int32:
+                    recordWriter.Write(Convert.ToInt32(values[i]));
+                    break;
+                case BinaryColumnType.Float64:
+                    recordWriter.Write(Convert.ToDouble(values[i]));
+                    break;
+            }
+        }
+
+        long slot = capacity > 0 ? recordsWritten % capacity : recordsWritten;
+        stream.Position = headerSize + slot * record.Length;
+        stream.Write(record, 0, record.Length);
+        recordsWritten++;
+
+        // The ring buffer reader needs the write count to find the oldest record
+        if (capacity > 0) {
+            WriteRecordCount();
+        }
+    }
+
+    private void WriteRecordCount() {
+        stream.Position = RecordsWrittenOffset;
+        stream.Write(BitConverter.GetBytes((ulong)recordsWritten), 0, 8);
+    }
+
+    public void Flush() {
+        WriteRecordCount();
+        stream.Flush();
+    }
+
+    public void SaveToFile() {
+        var stopwatch = System.Diagnostics.Stopwatch.StartNew();
+        Flush();
+        Debug.Log($"Binary log flushed to: {filePath} in {stopwatch.Elapsed.TotalMilliseconds:F1} ms");
+    }
+
+    public void Dispose() {
+        Flush();
+        recordWriter.Dispose();
+        stream.Dispose();
+    }
+}
@@ -9,6 +9,7 @@ public class CsvLogger {
 
     public CsvLogger(string fileName, params string[] columnNames) {
         filePath = Path.Combine(Application.persistentDataPath, fileName);
+        Directory.CreateDirectory(Path.GetDirectoryName(filePath));
         csvContent = new StringBuilder();
 
         // Write headers
@@ -25,8 +26,10 @@ public class CsvLogger {
     }
 
     public void SaveToFile() {
+        // The write time is logged because Player.log has no timestamps (read by Analysis/player_log.py)
+        var stopwatch = System.Diagnostics.Stopwatch.StartNew();
         File.WriteAllText(filePath, csvContent.ToString());
-        Debug.Log($"CSV saved to: {filePath}");
+        Debug.Log($"CSV saved to: {filePath} in {stopwatch.Elapsed.TotalMilliseconds:F1} ms");
     }
 
     public void Clear() {
@@ -7,15 +7,21 @@ public class StaticSignalController : MonoBehaviour {
     
     [Header("CSV Logging")]
     public bool enableLogging = true;
+    [Tooltip("Also append rows to fixed-record .tslog files; Analysis/analyze_stats.py then reads them instead of the CSVs")]
+    public bool enableBinaryLogging = false;
     
     [Header("Interval Logging Configuration")]
     [SerializeField] private float loggingInterval = 10f;  // Adjustable interval in seconds
+    [Tooltip("Log every interval to Player.log so Analysis/player_log.py can split it into segments")]
+    [SerializeField] private bool verboseLogging = false;
     
     [Header("Static Timing Configuration")]
     public StaticSignalTimingSO staticSignalAlgorithm;
     
     private CsvLogger episodeLogger;
     private CsvLogger intervalLogger;
+    private BinaryLogger episodeBinaryLogger;
+    private BinaryLogger intervalBinaryLogger;
     private TrafficLightSetup trafficLightSetup;
     private IntersectionDataCalculator intersectionDataCalculator;
     
@@ -43,7 +49,8 @@ public class StaticSignalController : MonoBehaviour {
     
     void InitializeLoggers() {
         // Initialize interval logger
-        episodeLogger = new CsvLogger("static_episode_results.csv", 
+        episodeLogger = new CsvLogger(trafficLightSetup.LogFileName("static_episode_results.csv"), 
+            "IntersectionId",
             "Episode", 
             "TotalVehicles", 
             "VehiclesWaiting", 
@@ -53,7 +60,8 @@ public class StaticSignalController : MonoBehaviour {
             "PhaseGreenTime");
             
         // Initialize interval logger
-        intervalLogger = new CsvLogger("static_interval_data.csv",
+        intervalLogger = new CsvLogger(trafficLightSetup.LogFileName("static_interval_data.csv"),
+            "IntersectionId",
             "SimulationTime",
             "Episode",
             "TotalVehicles",
@@ -63,6 +71,20 @@ public class StaticSignalController : MonoBehaviour {
             "PhaseGreenTime");
             // "VehiclesDeparted",
             // "TrafficDensity");
+
+        if (enableBinaryLogging) {
+            episodeBinaryLogger = new BinaryLogger(trafficLightSetup.LogFileName("static_episode_results.tslog"),
+                new[] { "IntersectionId", "Episode", "TotalVehicles", "VehiclesWaiting", "EpisodeDuration",
+                        "Throughput", "CurrentPhase", "PhaseGreenTime" },
+                new[] { BinaryColumnType.Int32, BinaryColumnType.Int32, BinaryColumnType.Int32, BinaryColumnType.Int32,
+                        BinaryColumnType.Float32, BinaryColumnType.Float32, BinaryColumnType.Int32, BinaryColumnType.Float32 });
+
+            intervalBinaryLogger = new BinaryLogger(trafficLightSetup.LogFileName("static_interval_data.tslog"),
+                new[] { "IntersectionId", "SimulationTime", "Episode", "TotalVehicles", "QueueLength",
+                        "Throughput", "CurrentPhase", "PhaseGreenTime" },
+                new[] { BinaryColumnType.Int32, BinaryColumnType.Float32, BinaryColumnType.Int32, BinaryColumnType.Int32,
+                        BinaryColumnType.Int32, BinaryColumnType.Float32, BinaryColumnType.Int32, BinaryColumnType.Float32 });
+        }
     }
     
     void StartEpisode() {
@@ -103,7 +125,8 @@ public class StaticSignalController : MonoBehaviour {
         // int vehiclesDeparted = CalculateVehiclesDeparted();
         // float trafficDensity = CalculateTrafficDensity();
         
-        intervalLogger?.LogRow(
+        object[] row = {
+            trafficLightSetup.IntersectionId,
             currentSimulationTime,
             episodeCounter,
             intersectionDataCalculator.TotalNumberOfVehicles,
@@ -113,9 +136,13 @@ public class StaticSignalController : MonoBehaviour {
             trafficLightSetup.Phases[trafficLightSetup.CurrentPhaseIndex].greenLightTime
             // vehiclesDeparted,
             // trafficDensity
-        );
+        };
+        intervalLogger?.LogRow(row);
+        intervalBinaryLogger?.LogRow(row);
         
-        // Debug.Log($"Interval data logged at simulation time: {currentSimulationTime:F1}s");
+        // Read by Analysis/player_log.py to split Player.log into simulation-time segments
+        if (verboseLogging)
+            Debug.Log($"Interval data logged at simulation time: {currentSimulationTime:F1}s (wall {Time.realtimeSinceStartup:F1}s)");
     }
 
     void LogEpisodeData() {
@@ -123,7 +150,8 @@ public class StaticSignalController : MonoBehaviour {
         float throughput = CalculateThroughput();
         // float fuel = intersectionDataCalculator.totalFuelConsumed;
 
-        episodeLogger?.LogRow(
+        object[] row = {
+            trafficLightSetup.IntersectionId,
             episodeCounter,
             intersectionDataCalculator.TotalNumberOfVehicles,
             intersectionDataCalculator.TotalNumberOfVehiclesWaitingInIntersection,
@@ -131,7 +159,9 @@ public class StaticSignalController : MonoBehaviour {
             throughput,
             trafficLightSetup.CurrentPhaseIndex,
             trafficLightSetup.Phases[trafficLightSetup.CurrentPhaseIndex].greenLightTime
-        );
+        };
+        episodeLogger?.LogRow(row);
+        episodeBinaryLogger?.LogRow(row);
         
         episodeCounter += 1;
         episodeStartTime = Time.time; // optional: reset episode clock
@@ -175,11 +205,17 @@ public class StaticSignalController : MonoBehaviour {
     
     void OnDestroy() {
         SaveAllData();
+        episodeBinaryLogger?.Dispose();
+        intervalBinaryLogger?.Dispose();
+        episodeBinaryLogger = null;
+        intervalBinaryLogger = null;
     }
     
     void SaveAllData() {
         episodeLogger?.SaveToFile();
         intervalLogger?.SaveToFile();
+        episodeBinaryLogger?.SaveToFile();
+        intervalBinaryLogger?.SaveToFile();
     }
     
     [ContextMenu("Save Static CSV Data")]
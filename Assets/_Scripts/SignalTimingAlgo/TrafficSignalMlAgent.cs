@@ -29,11 +29,17 @@ public class TrafficSignalMlAgent : Agent {
         // CSV Logger
         private CsvLogger episodeLogger;
         private CsvLogger intervalLogger;
+        private BinaryLogger episodeBinaryLogger;
+        private BinaryLogger intervalBinaryLogger;
+        [Tooltip("Also append rows to fixed-record .tslog files; Analysis/analyze_stats.py then reads them instead of the CSVs")]
+        [SerializeField] private bool enableBinaryLogging = false;
         private int episodeCounter = 0;
         private float episodeStartTime;
 
         // Interval logging variables
         [SerializeField] private float loggingInterval = 10f;  // Adjustable in inspector
+        [Tooltip("Log every interval to Player.log so Analysis/player_log.py can split it into segments")]
+        [SerializeField] private bool verboseLogging = false;
         private float lastLogTime = 0f;
         private float simulationStartTime;
 
@@ -60,7 +66,8 @@ public class TrafficSignalMlAgent : Agent {
             Ml_data.observations = new float[Ml_data.OFSET + (Ml_data.NUM_OF_LEGS * Ml_data.NUM_OF_VEHICLES_PER_LEG * Ml_data.NUM_OF_OBSERVATIONS_PER_VEHICLE)];
             Debug.Log("I am PPO Agent");
             // INITIALIZE LOGGERS
-            episodeLogger = new CsvLogger("episode_results.csv",
+            episodeLogger = new CsvLogger(trafficLightSetup.LogFileName("episode_results.csv"),
+                "IntersectionId",
                 "Episode",
                 "TotalVehicles",
                 "VehiclesWaiting",
@@ -70,7 +77,8 @@ public class TrafficSignalMlAgent : Agent {
                 "GreenLightTime");
 
             // Initialize interval logger
-            intervalLogger = new CsvLogger("interval_data.csv",
+            intervalLogger = new CsvLogger(trafficLightSetup.LogFileName("interval_data.csv"),
+                "IntersectionId",
                 "SimulationTime",
                 "Episode",
                 "Step",
@@ -80,6 +88,21 @@ public class TrafficSignalMlAgent : Agent {
                 "CurrentPhase",
                 "GreenLightTime");
 
+            if (enableBinaryLogging) {
+                episodeBinaryLogger = new BinaryLogger(trafficLightSetup.LogFileName("episode_results.tslog"),
+                    new[] { "IntersectionId", "Episode", "TotalVehicles", "VehiclesWaiting", "EpisodeDuration",
+                            "CurrentReward", "CurrentPhase", "GreenLightTime" },
+                    new[] { BinaryColumnType.Int32, BinaryColumnType.Int32, BinaryColumnType.Int32, BinaryColumnType.Int32,
+                            BinaryColumnType.Float32, BinaryColumnType.Float32, BinaryColumnType.Int32, BinaryColumnType.Float32 });
+
+                intervalBinaryLogger = new BinaryLogger(trafficLightSetup.LogFileName("interval_data.tslog"),
+                    new[] { "IntersectionId", "SimulationTime", "Episode", "Step", "TotalVehicles", "QueueLength",
+                            "CurrentReward", "CurrentPhase", "GreenLightTime" },
+                    new[] { BinaryColumnType.Int32, BinaryColumnType.Float32, BinaryColumnType.Int32, BinaryColumnType.Int32,
+                            BinaryColumnType.Int32, BinaryColumnType.Int32, BinaryColumnType.Float32, BinaryColumnType.Int32,
+                            BinaryColumnType.Float32 });
+            }
+
             episodeStartTime = Time.time;
             simulationStartTime = Time.time;  // Track simulation start time
             lastLogTime = 0f;  // Initialize last log time
@@ -104,7 +127,8 @@ public class TrafficSignalMlAgent : Agent {
 
                 if (intersectionData != null) {
 
-                    intervalLogger.LogRow(
+                    object[] row = {
+                        trafficLightSetup.IntersectionId,
                         currentSimulationTime,
                         episodeCounter,
                         StepCount,
@@ -114,11 +138,15 @@ public class TrafficSignalMlAgent : Agent {
                         Ml_data.rewards,
                         trafficLightSetup.CurrentPhaseIndex,
                         greenLightTime
-                    );
+                    };
+                    intervalLogger.LogRow(row);
+                    intervalBinaryLogger?.LogRow(row);
                 }
 
                 lastLogTime = currentSimulationTime;
-                // Debug.Log($"Interval data logged at simulation time: {currentSimulationTime:F1}s");
+                // Read by Analysis/player_log.py to split Player.log into simulation-time segments
+                if (verboseLogging)
+                    Debug.Log($"Interval data logged at simulation time: {currentSimulationTime:F1}s (wall {Time.realtimeSinceStartup:F1}s)");
             }
         }
 
@@ -166,7 +194,8 @@ public class TrafficSignalMlAgent : Agent {
             if (trafficLightSetup != null) {
                 var intersectionData = trafficLightSetup.GetComponent<IntersectionDataCalculator>();
                 if (intersectionData != null) {
-                    episodeLogger.LogRow(
+                    object[] row = {
+                        trafficLightSetup.IntersectionId,
                         episodeCounter,
                         intersectionData.TotalNumberOfVehicles,
                         intersectionData.TotalNumberOfVehiclesWaitingInIntersection,
@@ -174,7 +203,9 @@ public class TrafficSignalMlAgent : Agent {
                         Ml_data.rewards,
                         trafficLightSetup.CurrentPhaseIndex,
                         greenLightTime
-                    );
+                    };
+                    episodeLogger.LogRow(row);
+                    episodeBinaryLogger?.LogRow(row);
                 }
             }
 
@@ -218,11 +249,17 @@ public class TrafficSignalMlAgent : Agent {
 
         private void OnDestroy() {
             SaveAllData();
+            episodeBinaryLogger?.Dispose();
+            intervalBinaryLogger?.Dispose();
+            episodeBinaryLogger = null;
+            intervalBinaryLogger = null;
         }
 
         private void SaveAllData() {
             episodeLogger?.SaveToFile();
             intervalLogger?.SaveToFile();
+            episodeBinaryLogger?.SaveToFile();
+            intervalBinaryLogger?.SaveToFile();
         }
 
         // ADD THIS: Manual save method you can call from inspector
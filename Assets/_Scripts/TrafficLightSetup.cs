@@ -6,6 +6,8 @@
 using System;
 using System.Collections;
 using System.Collections.Generic;
+using System.IO;
+using System.Linq;
 using TMPro;
 using UnityEngine;
 
@@ -45,6 +47,8 @@ public class TrafficLightSetup : MonoBehaviour {
         [field: SerializeField] public Phase[] Phases { get; private set; }
         [field: SerializeField] public int CurrentPhaseIndex { get; private set; }
         [field: SerializeField] public int PreviousPhaseIndex { get; private set; }
+        [Tooltip("Key of this intersection in the CSV logs; -1 numbers intersections by hierarchy path")]
+        [SerializeField] private int intersectionId = -1;
 
         #endregion
 
@@ -273,5 +277,66 @@ public class TrafficLightSetup : MonoBehaviour {
             return totalTimeOfSimulation;
         }
 
+        /// <summary>
+        /// Intersection key written to every log row. Unless set in the inspector,
+        /// intersections are numbered in hierarchy-path order, which is stable for a scene.
+        /// </summary>
+        public int IntersectionId {
+            get {
+                if (intersectionId < 0) {
+                    AssignIntersectionIds();
+                }
+                return intersectionId;
+            }
+        }
+
+        /// <summary>
+        /// Log file name for this intersection: the plain name when the scene has one
+        /// intersection, otherwise under intersection_&lt;id&gt;/ so agents do not overwrite
+        /// each other's files (read by Analysis/log_files.py)
+        /// </summary>
+        public string LogFileName(string fileName) {
+            if (AllIntersections().Length <= 1) {
+                return fileName;
+            }
+            return Path.Combine($"intersection_{IntersectionId}", fileName);
+        }
+
+        // Inactive intersections are included, so disabling one does not shift the ids of the others
+        private static TrafficLightSetup[] AllIntersections() {
+            return FindObjectsByType<TrafficLightSetup>(FindObjectsInactive.Include, FindObjectsSortMode.None);
+        }
+
+        /// <summary>
+        /// Numbers every intersection without an inspector id in hierarchy-path order,
+        /// skipping the ids set in the inspector so no two intersections share a log directory
+        /// </summary>
+        private static void AssignIntersectionIds() {
+            var setups = AllIntersections();
+            var fixedIds = setups.Where(setup => setup.intersectionId >= 0).ToList();
+            foreach (var duplicate in fixedIds.GroupBy(setup => setup.intersectionId).Where(group => group.Count() > 1)) {
+                Debug.LogWarning($"Intersection id {duplicate.Key} is set on {duplicate.Count()} intersections; their logs will collide");
+            }
+
+            var taken = new HashSet<int>(fixedIds.Select(setup => setup.intersectionId));
+            int next = 0;
+            foreach (var setup in setups.Where(setup => setup.intersectionId < 0)
+                                        .OrderBy(setup => HierarchyPath(setup.transform), StringComparer.Ordinal)) {
+                while (taken.Contains(next)) {
+                    next++;
+                }
+                setup.intersectionId = next++;
+            }
+        }
+
+        private static string HierarchyPath(Transform node) {
+            // Sibling index keeps identically named objects apart
+            string path = $"{node.name}#{node.GetSiblingIndex()}";
+            for (var parent = node.parent; parent != null; parent = parent.parent) {
+                path = $"{parent.name}#{parent.GetSiblingIndex()}/{path}";
+            }
+            return path;
+        }
+
     }
 }
\ No newline at end of file